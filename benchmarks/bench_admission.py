@@ -0,0 +1,44 @@
+"""Admission cost versus total bay count across sharded facilities.
+
+Builds several facilities with the same per-type capacity, then times
+arrivals routed by ParkingSystem until every site is full. The per-arrival
+cost should not grow with the number of bays.
+
+    python benchmarks/bench_admission.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.facility import Facility, Level, Zone  # noqa: E402
+
+FACILITIES = 4
+BAYS_PER_SITE = [25, 1000, 10000, 50000]
+
+
+def build_facilities(bays):
+    return [
+        Facility(f"Site {i}", [Level("L1", [Zone("A", "Four-Wheeler", bays // 2)]),
+                               Level("L2", [Zone("B", "Four-Wheeler", bays - bays // 2)])])
+        for i in range(FACILITIES)
+    ]
+
+
+def main():
+    from cli_interface import ParkingSystem
+    print(f"Admission across {FACILITIES} facilities")
+    for bays in BAYS_PER_SITE:
+        system = ParkingSystem(build_facilities(bays))
+        total = bays * FACILITIES
+        start = time.perf_counter()
+        for i in range(total):
+            system.add_vehicle(f"V{i}", "Four-Wheeler", False)
+        elapsed = time.perf_counter() - start
+        loads = [lot.occupied() for lot in system.lots.values()]
+        print(f"  {total:>7} bays: {elapsed / total * 1e6:7.2f} us/arrival, per-site load {loads}")
+
+
+if __name__ == "__main__":
+    main()
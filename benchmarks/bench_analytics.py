@@ -0,0 +1,89 @@
+"""Analytics query times over a year of events.
+
+Synthesizes a year of journal events across several lots as NumPy columns.
+Arrivals follow a daily curve, and some queue before being promoted. The
+script then times each EventHistory query, plus saving the columns and
+loading them back, which keeps the per-vehicle ordering. Needs numpy.
+
+    python benchmarks/bench_analytics.py [vehicles_per_day]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.analytics import EventHistory, Tariff, _KIND_CODES  # noqa: E402
+from core.events import PARK, QUEUE, PROMOTE, REMOVE, EXPIRE  # noqa: E402
+
+PER_DAY = 5_000
+DAYS = 365
+LOTS = [f"Site {s}/{t}" for s in range(4) for t in ("Two-Wheeler", "Four-Wheeler", "Heavy Vehicle")]
+QUEUED_SHARE = 0.15
+
+
+def synthesize(np, per_day):
+    rng = np.random.default_rng(7)
+    n = per_day * DAYS
+    start = 1_700_000_000
+    # Arrival hour of day peaks around 9:00 and 18:00
+    hour = np.where(rng.random(n) < 0.5, rng.normal(9, 2, n), rng.normal(18, 2, n)) % 24
+    arrive = start + rng.integers(0, DAYS, n) * 86400 + hour * 3600
+    wait = np.where(rng.random(n) < QUEUED_SHARE, rng.exponential(600, n), 0.0)
+    dwell = rng.lognormal(np.log(5400), 0.8, n)
+    lot = rng.integers(0, len(LOTS), n)
+    vip = rng.random(n) < 0.1
+    queued = wait > 0
+    parked_at = arrive + wait
+    left_at = parked_at + dwell
+
+    # Every vehicle parks (or queues and is promoted) and leaves again
+    ts = np.concatenate([arrive, parked_at[queued], left_at])
+    kind = np.concatenate([np.where(queued, _KIND_CODES[QUEUE], _KIND_CODES[PARK]),
+                           np.full(queued.sum(), _KIND_CODES[PROMOTE]),
+                           np.where(rng.random(n) < 0.05, _KIND_CODES[EXPIRE], _KIND_CODES[REMOVE])])
+    vid = np.concatenate([np.arange(n), np.flatnonzero(queued), np.arange(n)])
+    lots = np.concatenate([lot, lot[queued], lot])
+    vips = np.concatenate([vip, vip[queued], vip])
+    order = np.argsort(ts, kind="stable")
+    return EventHistory(ts[order], kind[order], lots[order], vid[order], vips[order], LOTS,
+                        [f"V{i}" for i in range(n)])
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {label:<28} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    return result
+
+
+def main():
+    from core.analytics import _numpy
+    np = _numpy()
+    per_day = int(sys.argv[1]) if len(sys.argv) > 1 else PER_DAY
+    history = synthesize(np, per_day)
+    print(f"{len(history):,} events over {DAYS} days, {len(LOTS)} lots")
+    mid_year = history.ts.min() + 182 * 86400
+    timed("pair stays and waits (once)", lambda: (history.stays(), history.waits()))
+    timed("occupancy, hourly for a year", lambda: history.occupancy_series(3600))
+    timed("occupancy, one lot", lambda: history.occupancy_series(3600, lot=LOTS[0]))
+    timed("dwell distribution", history.dwell_distribution)
+    timed("dwell distribution, Q3", lambda: history.dwell_distribution(start=mid_year, end=mid_year + 91 * 86400))
+    timed("queue wait percentiles", history.wait_percentiles)
+    timed("peak hours (5 min samples)", history.peak_hours)
+    timed("revenue per lot", lambda: history.revenue(Tariff(daily_cap=400, vip_multiplier=1.5)))
+
+    directory = tempfile.mkdtemp(prefix="parking-analytics-")
+    try:
+        path = os.path.join(directory, "history.npz")
+        timed("save columns", lambda: history.save(path))
+        loaded = timed("load columns", lambda: EventHistory.load(path))
+        timed("pair stays after load", lambda: (loaded.stays(), loaded.waits()))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
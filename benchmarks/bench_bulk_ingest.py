@@ -0,0 +1,91 @@
+"""Bulk arrivals and departures versus one call per vehicle.
+
+Seeds a multi-facility system with a day of gate-camera arrivals, then
+removes most of them again, once through add_vehicle/remove_vehicle and
+once through add_vehicles/remove_vehicles, with and without an EventLog
+attached. The bulk run also reads its arrivals from a CSV file.
+
+    python benchmarks/bench_bulk_ingest.py [vehicles]
+"""
+import csv
+import gc
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cli_interface import ParkingSystem  # noqa: E402
+from core.facility import Facility, Level, Zone  # noqa: E402
+from core.journal import EventLog  # noqa: E402
+
+VEHICLES = 200_000
+FACILITIES = 4
+TYPES = ["Two-Wheeler", "Four-Wheeler", "Heavy Vehicle"]
+
+
+def build_facilities(vehicles):
+    # Room for about 80% of arrivals, so the rest exercise the waiting queues
+    per_lot = int(vehicles * 0.8) // (FACILITIES * len(TYPES))
+    return [Facility(f"Site {i}", [Level("L1", [Zone("A", vtype, per_lot) for vtype in TYPES])])
+            for i in range(FACILITIES)]
+
+
+def workload(vehicles):
+    rng = random.Random(5)
+    arrivals = [(f"G{i}", rng.choice(TYPES), rng.random() < 0.1) for i in range(vehicles)]
+    departures = [vid for vid, _, _ in arrivals if rng.random() < 0.7]
+    return arrivals, departures
+
+
+def per_call(system, arrivals, departures):
+    start = time.perf_counter()
+    for vid, vtype, vip in arrivals:
+        system.add_vehicle(vid, vtype, vip)
+    middle = time.perf_counter()
+    for vid in departures:
+        system.remove_vehicle(vid)
+    return middle - start, time.perf_counter() - middle
+
+
+def bulk(system, arrivals, departures):
+    start = time.perf_counter()
+    system.add_vehicles(arrivals)
+    middle = time.perf_counter()
+    system.remove_vehicles(departures)
+    return middle - start, time.perf_counter() - middle
+
+
+def main():
+    vehicles = int(sys.argv[1]) if len(sys.argv) > 1 else VEHICLES
+    arrivals, departures = workload(vehicles)
+    directory = tempfile.mkdtemp(prefix="parking-bulk-")
+    try:
+        csv_path = os.path.join(directory, "arrivals.csv")
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["vid", "type", "vip"])
+            writer.writerows(arrivals)
+
+        print(f"{len(arrivals):,} arrivals, {len(departures):,} departures")
+        for journaled in (False, True):
+            for label, run, source in (("per call", per_call, arrivals), ("bulk", bulk, arrivals),
+                                       ("bulk csv", bulk, csv_path)):
+                gc.collect()  # start each run without the previous run's garbage
+                system = ParkingSystem(build_facilities(vehicles))
+                log_dir = os.path.join(directory, f"log-{label}-{journaled}".replace(" ", "-"))
+                log = EventLog(system, log_dir) if journaled else None
+                add_s, remove_s = run(system, source, departures)
+                if log:
+                    log.close()
+                print(f"{'journaled' if journaled else 'in-memory':>9} {label:>9}: "
+                      f"add {len(arrivals) / add_s:>10,.0f}/s  remove {len(departures) / remove_s:>10,.0f}/s")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Bulk gate traffic through ParkingCluster at several worker counts.
+
+Builds a site of many facilities, then drives rounds of bulk arrivals and
+departures through one in-process ParkingSystem and through clusters of
+1, 2, 4... worker processes. Besides throughput it prints the CPU time
+spent in the router process and in the workers. The router's share bounds
+the speedup more workers can give, and the workers can only run in
+parallel if the machine has the cores for them.
+
+    python benchmarks/bench_cluster.py [vehicles] [max workers]
+"""
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cluster import ParkingCluster  # noqa: E402
+from core.facility import Facility, Level, Zone  # noqa: E402
+from core.parking import ParkingSystem  # noqa: E402
+
+VEHICLES = 200_000
+FACILITIES = 16
+ROUNDS = 4
+
+
+def make_site(count):
+    capacity = count // FACILITIES
+    return [Facility(f"F{f}", [Level("L1", [Zone("A", "Four-Wheeler", capacity)])]) for f in range(FACILITIES)]
+
+
+def drive(system, count):
+    vids = [f"KA{i:07d}" for i in range(count)]
+    chunk = count // ROUNDS
+    for r in range(ROUNDS):
+        system.add_vehicles((vid, "Four-Wheeler", False) for vid in vids[r * chunk:(r + 1) * chunk])
+        # Half of each round leaves again, so later rounds also promote
+        system.remove_vehicles(vids[r * chunk:(r + 1) * chunk:2])
+    return chunk * ROUNDS + chunk * ROUNDS // 2
+
+
+def children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run(label, system, count, baseline=None):
+    cpu, children, start = time.process_time(), children_cpu(), time.perf_counter()
+    ops = drive(system, count)
+    elapsed = time.perf_counter() - start
+    router = time.process_time() - cpu
+    if isinstance(system, ParkingCluster):
+        system.close()
+    workers = children_cpu() - children
+    speedup = f"  x{baseline / elapsed:4.2f}" if baseline else ""
+    print(f"  {label:<14} {elapsed * 1000:9.1f} ms  {ops / elapsed:10,.0f} ops/s  "
+          f"router cpu {router:6.2f} s  worker cpu {workers:6.2f} s{speedup}")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else VEHICLES
+    most = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    print(f"{count:,} vehicles over {FACILITIES} facilities, {os.cpu_count()} cores")
+    run("in process", ParkingSystem(make_site(count)), count)
+    workers = 1
+    baseline = None
+    while workers <= min(most, FACILITIES):
+        elapsed = run(f"{workers} workers", ParkingCluster(make_site(count), workers), count, baseline)
+        baseline = baseline or elapsed
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
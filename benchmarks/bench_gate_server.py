@@ -0,0 +1,124 @@
+"""Gate server throughput with pipelined and batched clients.
+
+Starts a GateServer on a free local port in a background thread, then
+drives it from several client connections that keep a window of park and
+remove requests in flight. A subscriber connection counts pushed events.
+Reports requests per second for single-line and batched traffic. Given a
+worker count, the server runs on a ParkingCluster of that many processes.
+
+    python benchmarks/bench_gate_server.py [clients] [requests_per_client] [window] [workers]
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.facility import default_facilities  # noqa: E402
+from gate_server import GateServer, ParkingCluster, ParkingSystem  # noqa: E402
+
+CLIENTS = 8
+REQUESTS = 20_000
+WINDOW = 64
+BATCH = 50
+BAYS = 500
+TYPES = ["Two-Wheeler", "Four-Wheeler", "Heavy Vehicle"]
+
+
+def start_server(workers=0):
+    ready = threading.Event()
+    holder = {}
+    # Workers are forked here, before the server thread exists
+    system = ParkingCluster(default_facilities(BAYS), workers) if workers else ParkingSystem(default_facilities(BAYS))
+
+    async def run():
+        holder["server"] = await GateServer(system, port=0).start()
+        holder["loop"] = asyncio.get_running_loop()
+        ready.set()
+        await holder["server"].server.serve_forever()
+
+    threading.Thread(target=lambda: asyncio.run(run()), daemon=True).start()
+    ready.wait()
+    return holder["server"]
+
+
+def requests_for(client, count):
+    rng = random.Random(client)
+    inside = []
+    for n in range(count):
+        if inside and rng.random() < 0.45:
+            vid = inside.pop(rng.randrange(len(inside)))
+            yield {"op": "remove", "vid": vid, "id": n}
+        else:
+            vid = f"C{client}-{n}"
+            inside.append(vid)
+            yield {"op": "park", "vid": vid, "type": rng.choice(TYPES), "vip": rng.random() < 0.1, "id": n}
+
+
+async def client(port, requests, window):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    sent = received = 0
+    lines = [json.dumps(r).encode() + b"\n" for r in requests]
+    while received < len(lines):
+        # Keep up to ``window`` requests in flight before waiting for answers
+        burst = lines[sent:min(len(lines), received + window)]
+        if burst:
+            writer.write(b"".join(burst))
+            sent += len(burst)
+        await reader.readline()
+        received += 1
+    writer.close()
+    await writer.wait_closed()
+
+
+async def subscriber(port, counter, stop):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b'{"op": "subscribe"}\n')
+    await reader.readline()
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(reader.readline(), 0.2)
+        except asyncio.TimeoutError:
+            continue
+        counter[0] += 1
+    writer.close()
+
+
+async def run(port, clients, count, window, batch):
+    loads = []
+    for c in range(clients):
+        items = list(requests_for(c + (1000 if batch else 0), count))
+        if batch:
+            items = [{"op": "batch", "requests": items[i:i + batch]} for i in range(0, len(items), batch)]
+        loads.append(items)
+    counter, stop = [0], asyncio.Event()
+    sub = asyncio.create_task(subscriber(port, counter, stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, items, window) for items in loads))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.2)
+    stop.set()
+    await sub
+    return elapsed, counter[0]
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else CLIENTS
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else REQUESTS
+    window = int(sys.argv[3]) if len(sys.argv) > 3 else WINDOW
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    server = start_server(workers)
+    total = clients * count
+    for label, batch in (("pipelined", 0), (f"batched x{BATCH}", BATCH)):
+        elapsed, events = asyncio.run(run(server.port, clients, count, window, batch))
+        print(f"{label:>12}: {total:,} requests over {clients} connections in {elapsed:.2f}s "
+              f"({total / elapsed:,.0f} req/s), {events:,} events pushed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""ParkingLotGUI startup time and memory for growing lot sizes.
+
+Builds the GUI for a single facility with the given bays per vehicle type,
+forces the first layout/draw pass, and reports wall time, traced Python
+memory and the number of Tk widgets created. Run it on a revision before
+the virtualized grid for the "before" numbers. Needs a display.
+
+    python benchmarks/bench_gui_startup.py [bays ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_SIZES = [25, 1000, 10000]
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def measure(bays):
+    import gui_main
+    from core.facility import default_facilities
+    system = gui_main.ParkingSystem(default_facilities(bays))
+    for i in range(bays // 2):
+        system.add_vehicle(f"S{i}", "Four-Wheeler", i % 7 == 0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    app = gui_main.ParkingLotGUI(system)
+    app.update()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    widgets = count_widgets(app)
+    app.on_close()
+    return elapsed, peak, widgets
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    for bays in sizes:
+        try:
+            elapsed, peak, widgets = measure(bays)
+        except Exception as e:  # no display, or the QR stack is missing
+            print(f"skipped: {e}")
+            return
+        print(f"{bays:>6} bays/type: startup {elapsed * 1000:8.1f} ms, peak {peak / 1e6:7.2f} MB, {widgets} widgets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Event log write throughput and recovery time at millions of events.
+
+Drives a ParkingSystem with random arrivals and exits while an EventLog
+journals every change, then measures startup recovery twice: from the
+latest snapshot plus the journal tail, and from a full journal replay.
+
+    python benchmarks/bench_journal.py [events]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cli_interface import ParkingSystem  # noqa: E402
+from core.facility import default_facilities  # noqa: E402
+from core.journal import EventLog, SNAPSHOT_FILE  # noqa: E402
+
+EVENTS = 1_000_000
+BAYS = 20_000
+TYPES = ["Two-Wheeler", "Four-Wheeler", "Heavy Vehicle"]
+
+
+def drive(system, events):
+    rng = random.Random(11)
+    ids = [f"J{i}" for i in range(BAYS * 4)]
+    counter = [0]
+    system.feed.subscribe(lambda e: counter.__setitem__(0, counter[0] + 1))
+    while counter[0] < events:
+        vid = rng.choice(ids)
+        if vid in system.index:
+            system.remove_vehicle(vid)
+        else:
+            system.add_vehicle(vid, rng.choice(TYPES), rng.random() < 0.1)
+    return counter[0]
+
+
+def recover_into_new_system(directory):
+    system = ParkingSystem(default_facilities(BAYS))
+    start = time.perf_counter()
+    log = EventLog(system, directory)
+    elapsed = time.perf_counter() - start
+    log.close()
+    return elapsed, log.replayed, len(system.index)
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else EVENTS
+    directory = tempfile.mkdtemp(prefix="parking-journal-")
+    try:
+        system = ParkingSystem(default_facilities(BAYS))
+        log = EventLog(system, directory, snapshot_every=events // 3)
+        start = time.perf_counter()
+        written = drive(system, events)
+        log.close()
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(log.journal_path)
+        print(f"wrote {written:,} events in {elapsed:.2f}s ({written / elapsed:,.0f} events/s, "
+              f"{size / 1e6:.1f} MB journal, group-commit fsync)")
+
+        elapsed, replayed, vehicles = recover_into_new_system(directory)
+        print(f"recovery from snapshot + tail: {elapsed:.2f}s, replayed {replayed:,} records, {vehicles:,} vehicles")
+
+        os.remove(os.path.join(directory, SNAPSHOT_FILE))
+        elapsed, replayed, vehicles = recover_into_new_system(directory)
+        print(f"recovery from full journal:    {elapsed:.2f}s, replayed {replayed:,} records, {vehicles:,} vehicles")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Exit/lookup cost versus lot size.
+
+Fills a lot to capacity (plus a short waiting queue), then times random
+exits followed by re-entry. With the vehicle index the per-operation cost
+should stay flat from 25 bays up to 50,000.
+
+    python benchmarks/bench_lookup.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SIZES = [25, 500, 5000, 50000]
+OPS = 20000
+
+
+def bench_front_end_system(module_name, capacity):
+    from core.facility import default_facilities
+    module = __import__(module_name)
+    system = module.ParkingSystem(default_facilities(capacity))
+    ids = [f"KA{i:07d}" for i in range(capacity + capacity // 10)]
+    for vid in ids:
+        system.add_vehicle(vid, "Four-Wheeler", False)
+    rng = random.Random(42)
+    picks = [rng.choice(ids) for _ in range(OPS)]
+    start = time.perf_counter()
+    for vid in picks:
+        system.remove_vehicle(vid)
+        system.add_vehicle(vid, "Four-Wheeler", False)
+    return (time.perf_counter() - start) / OPS
+
+
+def bench_stack_lot(capacity):
+    from parking_lot import ParkingLot
+    from core.models.vehicle import Vehicle
+    lot = ParkingLot(capacity)
+    vehicles = []
+    for i in range(capacity):
+        v = Vehicle(f"KA{i:07d}", "Four-Wheeler")
+        lot.park_vehicle(v)
+        vehicles.append(v)
+    rng = random.Random(42)
+    picks = [rng.choice(vehicles) for _ in range(OPS)]
+    start = time.perf_counter()
+    for v in picks:
+        lot.remove_vehicle(v.id)
+        lot.park_vehicle(v)
+    return (time.perf_counter() - start) / OPS
+
+
+def main():
+    cores = [
+        ("cli_interface.ParkingSystem", lambda n: bench_front_end_system("cli_interface", n)),
+        ("gui_main.ParkingSystem", lambda n: bench_front_end_system("gui_main", n)),
+        ("parking_lot.ParkingLot", bench_stack_lot),
+    ]
+    for name, bench in cores:
+        print(f"\n{name}: exit + re-entry, {OPS} ops")
+        for size in SIZES:
+            try:
+                per_op = bench(size)
+            except ImportError as e:
+                print(f"  skipped ({e})")
+                break
+            print(f"  {size:>6} bays: {per_op * 1e6:8.2f} us/op")
+
+
+if __name__ == "__main__":
+    main()
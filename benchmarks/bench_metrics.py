@@ -0,0 +1,60 @@
+"""Cost of live metrics on the gate hot path, and of a scrape.
+
+Times random arrivals and exits with and without ParkingMetrics attached,
+then times rendering the text exposition for a large multi-facility site.
+
+    python benchmarks/bench_metrics.py [operations]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.facility import default_facilities, Facility, Level, Zone  # noqa: E402
+from core.metrics import ParkingMetrics, Registry  # noqa: E402
+from core.parking import ParkingSystem  # noqa: E402
+
+OPS = 300_000
+BAYS = 5_000
+SCRAPE_FACILITIES = 200
+TYPES = ["Two-Wheeler", "Four-Wheeler", "Heavy Vehicle"]
+
+
+def drive(system, ops):
+    rng = random.Random(3)
+    ids = [f"M{i}" for i in range(BAYS * 4)]
+    start = time.perf_counter()
+    for _ in range(ops):
+        vid = rng.choice(ids)
+        if vid in system.index:
+            system.remove_vehicle(vid)
+        else:
+            system.add_vehicle(vid, rng.choice(TYPES), rng.random() < 0.1)
+    return time.perf_counter() - start
+
+
+def main():
+    ops = int(sys.argv[1]) if len(sys.argv) > 1 else OPS
+    plain = drive(ParkingSystem(default_facilities(BAYS)), ops)
+    system = ParkingSystem(default_facilities(BAYS))
+    ParkingMetrics(system, Registry())
+    instrumented = drive(system, ops)
+    print(f"{ops:,} gate operations: {plain / ops * 1e6:.2f} us/op plain, "
+          f"{instrumented / ops * 1e6:.2f} us/op with metrics ({(instrumented / plain - 1) * 100:+.0f}%)")
+
+    site = ParkingSystem([Facility(f"Site {i}", [Level("L1", [Zone("A", vtype, 100) for vtype in TYPES])])
+                          for i in range(SCRAPE_FACILITIES)])
+    registry = Registry()
+    metrics = ParkingMetrics(site, registry)
+    drive(site, ops // 10)
+    start = time.perf_counter()
+    text = registry.render()
+    elapsed = time.perf_counter() - start
+    print(f"scrape of {len(site.lots)} lots: {len(text.splitlines()):,} lines in {elapsed * 1000:.1f} ms")
+    metrics.close()
+
+
+if __name__ == "__main__":
+    main()
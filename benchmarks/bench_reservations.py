@@ -0,0 +1,67 @@
+"""Reservation booking and availability queries against a plain scan.
+
+Books a week of random reservations into one lot, then times availability
+queries answered by the segment tree against the same answer found by
+sweeping every booking that overlaps the window.
+
+    python benchmarks/bench_reservations.py [bookings] [queries]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.reservations import HORIZON, Reservation, ReservationBook  # noqa: E402
+
+BOOKINGS = 20_000
+QUERIES = 2_000
+START = 1_700_000_000
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<26} {elapsed * 1000:9.1f} ms  {count / elapsed:10,.0f}/s")
+    return result
+
+
+def window(rng):
+    start = START + rng.randrange(0, HORIZON - 8 * 3600, 300)
+    return start, start + rng.randrange(1800, 8 * 3600, 300)
+
+
+def scan_peak(book, start, end):
+    # Every overlapping booking, swept in start order
+    edges = []
+    for r in book._bookings.values():
+        lo, hi = book._slots(r.start, r.end)
+        edges += ((lo, 1), (hi, -1))
+    lo, hi = book._slots(start, end)
+    edges = sorted((max(at, lo), step) for at, step in edges if at < hi)
+    best = count = 0
+    for at, step in edges:
+        count += step
+        if at >= lo:
+            best = max(best, count)
+    return best
+
+
+def main():
+    bookings = int(sys.argv[1]) if len(sys.argv) > 1 else BOOKINGS
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else QUERIES
+    rng = random.Random(7)
+    book = ReservationBook(bookings)
+    windows = [window(rng) for _ in range(bookings)]
+    timed("book", bookings, lambda: [book.book(Reservation(f"R{i}", *w)) for i, w in enumerate(windows)])
+    asks = [window(rng) for _ in range(queries)]
+    tree = timed("availability (tree)", queries, lambda: [book.peak(*w) for w in asks])
+    scan = timed("availability (scan)", queries // 20, lambda: [scan_peak(book, *w) for w in asks[:queries // 20]])
+    assert tree[:len(scan)] == scan
+    timed("cancel", bookings, lambda: [book.cancel(f"R{i}") for i in range(bookings)])
+
+
+if __name__ == "__main__":
+    main()
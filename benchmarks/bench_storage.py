@@ -0,0 +1,74 @@
+"""Storage engine overhead on gate operations, bulk ingest and status reads.
+
+Runs the same arrivals and departures with no storage, the memory engine
+and SQLite, one call at a time and then in bulk. It then times status
+lookups served from the write-through cache against the same lookup as a
+SQL query, and history queries through the vid and entry-time indexes.
+
+    python benchmarks/bench_storage.py [vehicles]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.facility import Facility, Level, Zone  # noqa: E402
+from core.parking import ParkingSystem  # noqa: E402
+from core.storage import MemoryStorage, SQLiteStorage  # noqa: E402
+
+VEHICLES = 20_000
+READS = 100_000
+
+
+def make_system(count):
+    return ParkingSystem([Facility("Bench", [Level("L1", [Zone("A", "Four-Wheeler", count)])])])
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<30} {elapsed * 1000:9.1f} ms  {count / elapsed:12,.0f}/s")
+    return result
+
+
+def run_ops(label, storage, count):
+    system = make_system(count)
+    if storage is not None:
+        storage.attach(system)
+    vids = [f"V{i}" for i in range(count)]
+    print(label)
+    timed("add_vehicle", count, lambda: [system.add_vehicle(vid, "Four-Wheeler", False) for vid in vids])
+    timed("remove_vehicle", count, lambda: [system.remove_vehicle(vid) for vid in vids])
+    timed("add_vehicles (bulk)", count, lambda: system.add_vehicles((vid, "Four-Wheeler", False) for vid in vids))
+    return system
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else VEHICLES
+    directory = tempfile.mkdtemp(prefix="parking-storage-")
+    try:
+        run_ops("no storage", None, count)
+        run_ops("memory engine", MemoryStorage(), count)
+        storage = SQLiteStorage(os.path.join(directory, "parking.db"))
+        run_ops("sqlite engine", storage, count)
+
+        print("status reads")
+        vids = [f"V{i % count}" for i in range(READS)]
+        timed("vehicle() from cache", READS, lambda: [storage.vehicle(vid) for vid in vids])
+        sql = "SELECT lot, state, bay, vip, entry FROM vehicles WHERE vid = ?"
+        with storage.pool.connection() as conn:
+            timed("same lookup in SQL", READS, lambda: [conn.execute(sql, (vid,)).fetchone() for vid in vids])
+        timed("occupancy() from cache", READS, lambda: [storage.occupancy() for _ in range(READS)])
+        timed("events(vid) via index", 1_000, lambda: [storage.events(vid=vid) for vid in vids[:1_000]])
+        timed("overstays() via entry index", 100, lambda: [storage.overstays(time.time() - 60) for _ in range(100)])
+        storage.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
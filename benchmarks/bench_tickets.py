@@ -0,0 +1,62 @@
+"""Ticket throughput: signing, rendering, reprints from the cache and folder scans.
+
+Signs and verifies payloads, then renders tickets on the worker pool, cold
+and again as cached reprints. If pyzbar is available it also writes the
+tickets to a folder and times a bulk scan of it, as from an exit camera.
+Needs qrcode and Pillow.
+
+    python benchmarks/bench_tickets.py [tickets] [workers]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.models.vehicle import Vehicle  # noqa: E402
+from core.tickets import Ticket, TicketService, decode_ticket, encode_ticket, image_paths  # noqa: E402
+
+TICKETS = 2_000
+WORKERS = 4
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<24} {elapsed * 1000:9.1f} ms  {count / elapsed:10,.0f}/s")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else TICKETS
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else WORKERS
+    vehicles = [Vehicle(f"KA{i:02d}AB{i:04d}", "Four-Wheeler", i % 10 == 0, 1_700_000_000 + i) for i in range(count)]
+    service = TicketService(b"bench", workers, cache_size=count)
+    payloads = timed("sign payloads", count, lambda: [encode_ticket(Ticket.for_vehicle(v), service.key) for v in vehicles])
+    timed("verify payloads", count, lambda: [decode_ticket(p, service.key) for p in payloads])
+    issued = timed("render tickets", count, lambda: [f.result() for f in [service.issue(v) for v in vehicles]])
+    timed("reprint (cached)", count, lambda: [f.result() for f in [service.issue(v) for v in vehicles]])
+    print(f"  {service.cache_info()}")
+
+    directory = tempfile.mkdtemp(prefix="parking-tickets-")
+    try:
+        for ticket, png in issued:
+            with open(os.path.join(directory, f"{ticket.vid}.png"), "wb") as f:
+                f.write(png)
+        paths = image_paths(directory)
+        try:
+            scans = timed("scan folder", len(paths), lambda: [f.result() for f in service.read_many(paths)])
+        except RuntimeError as e:
+            print(f"  scan folder skipped: {e}")
+        else:
+            print(f"  {sum(1 for ticket, _ in scans if ticket is not None):,} of {len(scans):,} read back")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
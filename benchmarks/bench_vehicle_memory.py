@@ -0,0 +1,76 @@
+"""Memory held by a million parked and queued vehicles.
+
+Fills a ParkingSystem with 800k parked and 200k queued vehicles, once with
+the shared slotted Vehicle and once with the plain per-instance __dict__
+class the front-ends used to define, and reports traced bytes per vehicle
+for the vehicle objects alone and for the whole system.
+
+    python benchmarks/bench_vehicle_memory.py [vehicles]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.facility import Facility, Level, Zone  # noqa: E402
+from core.models.vehicle import Vehicle  # noqa: E402
+from core.parking import ParkingSystem  # noqa: E402
+
+VEHICLES = 1_000_000
+PARKED_SHARE = 0.8
+TYPES = ["Two-Wheeler", "Four-Wheeler", "Heavy Vehicle"]
+
+
+class DictVehicle:
+    def __init__(self, vid, vtype, vip=False, park_time=None):
+        self.id = vid
+        self.type = vtype
+        self.vip = vip
+        self.park_time = time.time() if park_time is None else park_time
+
+
+class DictParkingSystem(ParkingSystem):
+    vehicle_class = DictVehicle
+
+
+def arrivals(count):
+    return ((f"KA{i:08d}", TYPES[i % 3], i % 10 == 0) for i in range(count))
+
+
+def measure(system_class, count):
+    per_type = int(count * PARKED_SHARE) // len(TYPES)
+    facilities = [Facility("Main", [Level("L1", [Zone("A", vtype, per_type) for vtype in TYPES])])]
+    ids = [f"KA{i:08d}" for i in range(count)]
+
+    gc.collect()
+    tracemalloc.start()
+    vehicles = [system_class.vehicle_class(vid, TYPES[i % 3], i % 10 == 0) for i, vid in enumerate(ids)]
+    objects = tracemalloc.get_traced_memory()[0]
+    del vehicles
+    gc.collect()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    system = system_class(facilities)
+    system.add_vehicles(arrivals(count))
+    gc.collect()
+    total = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    parked = sum(lot.occupied() for lot in system.lots.values())
+    return objects, total, parked, len(system.index) - parked
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else VEHICLES
+    print(f"{count:,} vehicles (IDs are preallocated and excluded from object sizes)")
+    for label, system_class in (("__dict__", DictParkingSystem), ("__slots__", ParkingSystem)):
+        objects, total, parked, queued = measure(system_class, count)
+        print(f"{label:>9}: vehicles {objects / count:6.1f} B each, whole system {total / 2**20:8.1f} MiB "
+              f"({total / count:6.1f} B/vehicle, {parked:,} parked, {queued:,} queued)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""WaitingQueue throughput with 100,000 queued vehicles.
+
+Enqueues a VIP/normal mix, cancels a random tenth of them, then drains the
+queue, reporting operations per second for each phase.
+
+    python benchmarks/bench_waiting_queue.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from waiting_queue import WaitingQueue  # noqa: E402
+
+QUEUED = 100_000
+VIP_SHARE = 0.1
+CANCEL_SHARE = 0.1
+
+
+class QueuedVehicle:
+    __slots__ = ("id", "vip")
+
+    def __init__(self, vid, vip):
+        self.id = vid
+        self.vip = vip
+
+
+def report(phase, count, elapsed):
+    print(f"  {phase:<8} {count:>7} ops in {elapsed:6.3f}s  ({count / elapsed:>10,.0f} ops/s)")
+
+
+def main():
+    rng = random.Random(7)
+    vehicles = [QueuedVehicle(f"Q{i}", rng.random() < VIP_SHARE) for i in range(QUEUED)]
+    cancels = rng.sample([v.id for v in vehicles], int(QUEUED * CANCEL_SHARE))
+    # A virtual clock one second apart per arrival so aging actually matters
+    tick = iter(range(10**9))
+    queue = WaitingQueue(clock=lambda: next(tick))
+    print(f"WaitingQueue with {QUEUED} vehicles")
+
+    start = time.perf_counter()
+    for v in vehicles:
+        queue.add_vehicle(v)
+    report("enqueue", QUEUED, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for vid in cancels:
+        queue.remove(vid)
+    report("cancel", len(cancels), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    drained = 0
+    while queue.next_vehicle() is not None:
+        drained += 1
+    report("dequeue", drained, time.perf_counter() - start)
+    assert drained == QUEUED - len(cancels)
+
+
+if __name__ == "__main__":
+    main()
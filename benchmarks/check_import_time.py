@@ -0,0 +1,91 @@
+"""Import-time budget check for the entry points.
+
+Imports each entry module in a fresh interpreter under ``-X importtime``,
+keeping the best of a few runs. It fails when a module takes longer than
+its budget, or when it pulls in a heavy package it should not need: the
+headless core and the CLI must never load tkinter, the QR/imaging stack,
+numpy or asyncio. Exits non-zero on any failure. tests/test_import_time.py
+runs the forbidden-import checks under pytest, and the time budgets too
+when PARKING_IMPORT_BUDGET_SCALE is set.
+
+    python benchmarks/check_import_time.py [--runs 5] [--scale 1.0]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QR_STACK = ("qrcode", "pyzbar", "PIL")
+HEAVY = ("tkinter", "numpy", "asyncio", "http.server") + QR_STACK
+
+# (module, budget in ms, packages it must not import)
+BUDGETS = [
+    ("main", 25, HEAVY),
+    ("core.parking", 30, HEAVY),
+    ("core.journal", 25, HEAVY),
+    ("core.metrics", 30, HEAVY),
+    ("core.tickets", 30, HEAVY),
+    ("core.storage", 30, HEAVY),
+    ("core.cluster", 30, HEAVY + ("multiprocessing",)),
+    ("cli_interface", 45, HEAVY),
+    ("gate_server", 120, ("tkinter", "numpy", "http.server") + QR_STACK),
+    ("gui_main", 90, ("numpy", "asyncio", "http.server") + QR_STACK),
+]
+
+
+def measure(module):
+    """Return (cumulative microseconds for ``module``, set of modules imported)."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    total = None
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        name = name.strip()
+        loaded.add(name)
+        if name == module:
+            total = int(cumulative)
+    return total, loaded
+
+
+def check(module, forbidden, runs):
+    best = None
+    loaded = set()
+    for _ in range(runs):
+        total, loaded = measure(module)
+        best = total if best is None else min(best, total)
+    bad = sorted(name for name in loaded if name in forbidden or name.split(".")[0] in forbidden)
+    return best / 1000, bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget, for slow machines")
+    args = parser.parse_args()
+
+    failures = 0
+    for module, budget_ms, forbidden in BUDGETS:
+        budget_ms *= args.scale
+        try:
+            ms, bad = check(module, forbidden, args.runs)
+        except RuntimeError as e:
+            print(f"SKIP  {module:<14} {e}")
+            continue
+        ok = ms <= budget_ms and not bad
+        failures += not ok
+        note = f"  imports {', '.join(bad)}" if bad else ""
+        print(f"{'ok' if ok else 'FAIL':<5} {module:<14} {ms:7.1f} ms / {budget_ms:.0f} ms{note}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
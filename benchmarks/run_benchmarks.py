@@ -0,0 +1,131 @@
+"""Benchmark suite for the parking cores, for catching hot-path regressions.
+
+Runs the seeded simulator against every core at each lot size. Each case
+runs in its own subprocess, so peak memory is measured per case. The suite
+reports operations per second, p50/p99 latency per operation and peak RSS.
+Results can be saved as a baseline and later runs compared against it;
+the exit status is non-zero when a case slows down past the tolerance.
+
+    python benchmarks/run_benchmarks.py [--sizes 25,1000,100000,1000000] [--arrivals N]
+                                        [--cores core,cli,gui,stack] [--save FILE] [--compare FILE]
+                                        [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from simulator import Simulator, StackLotTarget, SystemTarget, VirtualClock, percentile  # noqa: E402
+
+SIZES = (25, 1_000, 100_000, 1_000_000)
+CORES = ("core", "cli", "gui", "stack")
+ARRIVALS = 200_000
+TOLERANCE = 0.25
+
+
+def make_target(core, capacity, clock):
+    if core == "stack":
+        return StackLotTarget(capacity, clock)
+    if core == "core":
+        from core.parking import ParkingSystem
+    elif core == "cli":
+        from cli_interface import ParkingSystem
+    else:
+        from gui_main import ParkingSystem
+    return SystemTarget(ParkingSystem, capacity, clock)
+
+
+def run_case(core, size, arrivals):
+    clock = VirtualClock()
+    sim = Simulator(make_target(core, size, clock), clock, size, seed=size)
+    sim.prefill()
+    start = time.perf_counter()
+    sim.run(arrivals)
+    elapsed = time.perf_counter() - start
+    every = [t for samples in sim.latencies.values() for t in samples]
+    result = {
+        "core": core,
+        "size": size,
+        "ops": len(every),
+        "ops_per_sec": len(every) / elapsed,
+        "p50_us": percentile(every, 50) * 1e6,
+        "p99_us": percentile(every, 99) * 1e6,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "counts": sim.counts,
+    }
+    for op, samples in sim.latencies.items():
+        if samples:
+            result[f"{op}_p99_us"] = percentile(samples, 99) * 1e6
+    return result
+
+
+def spawn_case(core, size, arrivals):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--case", core, str(size),
+                           "--arrivals", str(arrivals)], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"core": core, "size": size, "error": proc.stderr.strip().splitlines()[-1]}
+    return json.loads(proc.stdout)
+
+
+def compare(results, baseline, tolerance):
+    old = {(r["core"], r["size"]): r for r in baseline if "error" not in r}
+    regressions = []
+    for r in results:
+        before = old.get((r["core"], r["size"]))
+        if before is None or "error" in r:
+            continue
+        if r["ops_per_sec"] < before["ops_per_sec"] * (1 - tolerance):
+            regressions.append(f"{r['core']} @ {r['size']:,}: {before['ops_per_sec']:,.0f} -> "
+                               f"{r['ops_per_sec']:,.0f} ops/s")
+        if r["p99_us"] > before["p99_us"] * (1 + tolerance) * 1.5:
+            regressions.append(f"{r['core']} @ {r['size']:,}: p99 {before['p99_us']:.1f} -> {r['p99_us']:.1f} us")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    parser.add_argument("--cores", default=",".join(CORES))
+    parser.add_argument("--arrivals", type=int, default=ARRIVALS)
+    parser.add_argument("--save")
+    parser.add_argument("--compare")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--case", nargs=2, metavar=("CORE", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], int(args.case[1]), args.arrivals)))
+        return
+
+    results = []
+    print(f"{'core':<6} {'bays':>9} {'ops/s':>10} {'p50 us':>8} {'p99 us':>8} {'peak MB':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        for core in args.cores.split(","):
+            r = spawn_case(core, size, args.arrivals)
+            results.append(r)
+            if "error" in r:
+                print(f"{core:<6} {size:>9,} skipped: {r['error']}")
+            else:
+                print(f"{core:<6} {size:>9,} {r['ops_per_sec']:>10,.0f} {r['p50_us']:>8.1f} "
+                      f"{r['p99_us']:>8.1f} {r['peak_rss_mb']:>8.1f}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Seeded traffic simulator for the parking cores, on a virtual clock.
+
+Drives any of the cores through a small adapter: the shared ParkingSystem
+(and the front-end subclasses built on it) or parking_lot.ParkingLot with
+its WaitingQueues. Arrivals are Poisson, stays are log-normal, a share of
+arrivals are VIPs, and some queued drivers give up and leave (no-shows).
+The clock only moves when the simulator says so, so the same seed always
+produces the same run, however fast the machine is.
+
+    python benchmarks/simulator.py [arrivals] [capacity]
+"""
+import heapq
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.events import PROMOTE  # noqa: E402
+from core.facility import Facility, Level, Zone  # noqa: E402
+from core.vehicle_index import PARKED  # noqa: E402
+
+TYPES = ("Two-Wheeler", "Four-Wheeler", "Heavy Vehicle")
+START = 1_700_000_000.0
+
+# Scheduled event kinds
+DEPART = 0
+GIVE_UP = 1
+
+
+class VirtualClock:
+    def __init__(self, now=START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class SystemTarget:
+    """Adapter for core.parking.ParkingSystem and its front-end subclasses."""
+
+    def __init__(self, system_class, capacity, clock):
+        per_type = max(1, capacity // len(TYPES))
+        facilities = [Facility("Sim", [Level("L1", [Zone("A", vtype, per_type) for vtype in TYPES])])]
+        self.system = system_class(facilities, clock)
+        self._promoted = []
+        self.system.feed.subscribe(self._on_change)
+
+    def _on_change(self, event):
+        if event.kind == PROMOTE:
+            self._promoted.append(event.vid)
+
+    def prefill(self, vehicles):
+        self.system.add_vehicles(vehicles)
+
+    def arrive(self, vid, vtype, vip):
+        self.system.add_vehicle(vid, vtype, vip)
+        entry = self.system.index.get(vid)
+        return entry is not None and entry.state == PARKED
+
+    def depart(self, vid):
+        self._promoted.clear()
+        removed, _ = self.system.remove_vehicle(vid)
+        return removed, self._promoted[-1] if self._promoted else None
+
+    def waiting(self, vid):
+        entry = self.system.index.get(vid)
+        return entry is not None and entry.state != PARKED
+
+
+class StackLotTarget:
+    """Adapter for parking_lot.ParkingLot and its per-type WaitingQueues."""
+
+    def __init__(self, capacity, clock):
+        from parking_lot import ParkingLot
+        from core.models.vehicle import Vehicle
+        self.vehicle_class = Vehicle
+        self.clock = clock
+        self.lot = ParkingLot({vtype: max(1, capacity // len(TYPES)) for vtype in TYPES}, clock)
+
+    def prefill(self, vehicles):
+        for vid, vtype, vip in vehicles:
+            self.arrive(vid, vtype, vip)
+
+    def arrive(self, vid, vtype, vip):
+        vehicle = self.vehicle_class(vid, vtype, vip, self.clock())
+        if self.lot.park_vehicle(vehicle):
+            return True
+        self.lot.add_to_waiting(vehicle)
+        return False
+
+    def depart(self, vid):
+        entry = self.lot.index.get(vid)
+        if entry is None:
+            return False, None
+        self.lot.remove_vehicle(vid)
+        if entry.state != PARKED:
+            return True, None
+        # A freed bay goes straight to the head of the queue
+        promoted = self.lot.bays[entry.lot].get(entry.position)
+        return True, promoted.id if promoted is not None else None
+
+    def waiting(self, vid):
+        entry = self.lot.index.get(vid)
+        return entry is not None and entry.state != PARKED
+
+
+class Simulator:
+    """Replays seeded traffic against a target, timing every call it makes.
+
+    ``load`` is offered demand relative to capacity; above 1.0 queues build
+    up. Latencies are wall-clock seconds per operation, kept per kind.
+    """
+
+    def __init__(self, target, clock, capacity, seed=0, load=1.0, mean_stay=3600.0, vip_share=0.1,
+                 no_show_share=0.3, patience=900.0):
+        self.target = target
+        self.clock = clock
+        self.rng = random.Random(seed)
+        self.capacity = capacity
+        self.mean_stay = mean_stay
+        self.arrival_rate = load * capacity / mean_stay
+        self.vip_share = vip_share
+        self.no_show_share = no_show_share
+        self.patience = patience
+        self.latencies = {"arrive": [], "depart": [], "give_up": []}
+        self.counts = {"parked": 0, "queued": 0, "promoted": 0, "departed": 0, "no_shows": 0}
+        self._schedule = []
+        self._seq = 0
+        self._next_id = 0
+
+    def _stay(self):
+        # Log-normal with the requested mean and a long right tail
+        sigma = 0.8
+        return self.rng.lognormvariate(math.log(self.mean_stay) - sigma * sigma / 2, sigma)
+
+    def _new_vehicle(self):
+        self._next_id += 1
+        return f"S{self._next_id}", self.rng.choice(TYPES), self.rng.random() < self.vip_share
+
+    def _at(self, when, kind, vid):
+        self._seq += 1
+        heapq.heappush(self._schedule, (when, self._seq, kind, vid))
+
+    def prefill(self):
+        """Start at steady state: every bay taken, departures spread over one stay."""
+        vehicles = [self._new_vehicle() for _ in range(self.capacity)]
+        self.target.prefill(vehicles)
+        for vid, _, _ in vehicles:
+            self._at(self.clock.now + self.rng.uniform(0, self.mean_stay), DEPART, vid)
+
+    def run(self, arrivals):
+        """Feed ``arrivals`` new vehicles, handling every departure due in between."""
+        next_arrival = self.clock.now + self.rng.expovariate(self.arrival_rate)
+        for _ in range(arrivals):
+            while self._schedule and self._schedule[0][0] <= next_arrival:
+                when, _, kind, vid = heapq.heappop(self._schedule)
+                self.clock.now = when
+                self._scheduled(kind, vid)
+            self.clock.now = next_arrival
+            self._arrive()
+            next_arrival += self.rng.expovariate(self.arrival_rate)
+        return self
+
+    def _arrive(self):
+        vid, vtype, vip = self._new_vehicle()
+        start = time.perf_counter()
+        parked = self.target.arrive(vid, vtype, vip)
+        self.latencies["arrive"].append(time.perf_counter() - start)
+        if parked:
+            self.counts["parked"] += 1
+            self._at(self.clock.now + self._stay(), DEPART, vid)
+        else:
+            self.counts["queued"] += 1
+            if self.rng.random() < self.no_show_share:
+                self._at(self.clock.now + self.rng.uniform(0, 2 * self.patience), GIVE_UP, vid)
+
+    def _scheduled(self, kind, vid):
+        if kind == GIVE_UP:
+            # Promoted in the meantime, so not a no-show after all
+            if not self.target.waiting(vid):
+                return
+            start = time.perf_counter()
+            self.target.depart(vid)
+            self.latencies["give_up"].append(time.perf_counter() - start)
+            self.counts["no_shows"] += 1
+            return
+        start = time.perf_counter()
+        _, promoted = self.target.depart(vid)
+        self.latencies["depart"].append(time.perf_counter() - start)
+        self.counts["departed"] += 1
+        if promoted is not None:
+            self.counts["promoted"] += 1
+            self._at(self.clock.now + self._stay(), DEPART, promoted)
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def main():
+    from core.parking import ParkingSystem
+    arrivals = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    for name, make in (("ParkingSystem", lambda c: SystemTarget(ParkingSystem, capacity, c)),
+                       ("parking_lot.ParkingLot", lambda c: StackLotTarget(capacity, c))):
+        clock = VirtualClock()
+        sim = Simulator(make(clock), clock, capacity, seed=1)
+        sim.prefill()
+        start = time.perf_counter()
+        sim.run(arrivals)
+        elapsed = time.perf_counter() - start
+        hours = (clock.now - START) / 3600
+        print(f"{name}: {hours:.1f} simulated hours in {elapsed:.2f}s, {sim.counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Concurrent gate stress test for the shared ParkingSystem.
+
+Several gate threads park and remove vehicles at once, with a tiny thread
+switch interval to force interleavings, then the lots are checked for
+double-booked bays, leaked IDs and allocator drift. With --journal the run
+is also recovered from its event log and compared against the live state.
+Exits non-zero if any invariant is broken.
+
+    python benchmarks/stress_concurrency.py [threads] [ops_per_thread] [--journal]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cli_interface import ParkingSystem  # noqa: E402
+from core.facility import default_facilities  # noqa: E402
+from core.journal import EventLog  # noqa: E402
+from core.vehicle_index import PARKED, WAITING  # noqa: E402
+
+THREADS = 8
+OPS = 50_000
+BAYS = 40
+TYPES = ["Two-Wheeler", "Four-Wheeler", "Heavy Vehicle"]
+
+
+def gate(system, ids, shared, ops, seed, inside, errors):
+    # Each gate owns its own IDs, so it knows exactly which are inside; the
+    # shared pool is raced by every gate to exercise duplicate rejection.
+    rng = random.Random(seed)
+    try:
+        for _ in range(ops):
+            if rng.random() < 0.1:
+                system.add_vehicle(rng.choice(shared), rng.choice(TYPES), rng.random() < 0.2)
+                continue
+            vid = rng.choice(ids)
+            if vid in inside:
+                ok, _ = system.remove_vehicle(vid)
+                if not ok:
+                    errors.append(f"{vid}: remove failed for a vehicle this gate admitted")
+                inside.discard(vid)
+            else:
+                system.add_vehicle(vid, rng.choice(TYPES), rng.random() < 0.2)
+                if vid not in system.index:
+                    errors.append(f"{vid}: admitted but missing from the index")
+                inside.add(vid)
+    except Exception as exc:  # surfaced in the report instead of killing the thread silently
+        errors.append(f"gate crashed: {exc!r}")
+
+
+def check(system, expected):
+    problems = []
+    indexed = set()
+    for lot in system.lots.values():
+        parked = [v.id for v in lot.bays.values()]
+        if len(parked) != len(set(parked)):
+            problems.append(f"{lot.key}: a vehicle holds more than one bay")
+        if lot.allocator.in_use != len(lot.bays):
+            problems.append(f"{lot.key}: allocator has {lot.allocator.in_use} in use, bays hold {len(lot.bays)}")
+        if len(lot.waiting_queue) and lot.allocator.available():
+            problems.append(f"{lot.key}: vehicles wait while bays are free")
+        for bay, vehicle in lot.bays.items():
+            entry = system.index.get(vehicle.id)
+            if entry is None or entry.state != PARKED or entry.lot != lot.key or entry.position != bay:
+                problems.append(f"{lot.key}: bay {bay} and the index disagree about {vehicle.id}")
+        for vehicle in lot.waiting_queue:
+            entry = system.index.get(vehicle.id)
+            if entry is None or entry.state != WAITING or entry.lot != lot.key:
+                problems.append(f"{lot.key}: queue and the index disagree about {vehicle.id}")
+        indexed.update(parked)
+        indexed.update(v.id for v in lot.waiting_queue)
+    if len(system.index) != len(indexed):
+        problems.append(f"index holds {len(system.index)} IDs, lots hold {len(indexed)}")
+    missing = expected - indexed
+    if missing:
+        problems.append(f"{len(missing)} admitted vehicles vanished, e.g. {sorted(missing)[:3]}")
+    return problems
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    threads = int(args[0]) if args else THREADS
+    ops = int(args[1]) if len(args) > 1 else OPS
+    directory = tempfile.mkdtemp(prefix="parking-stress-") if "--journal" in sys.argv else None
+
+    system = ParkingSystem(default_facilities(BAYS))
+    log = EventLog(system, directory, snapshot_every=ops // 2) if directory else None
+    shared = [f"S{i}" for i in range(BAYS)]
+    insides = [set() for _ in range(threads)]
+    errors = []
+    workers = [
+        threading.Thread(target=gate, args=(system, [f"T{t}-{i}" for i in range(BAYS * 2)], shared,
+                                            ops, t, insides[t], errors))
+        for t in range(threads)
+    ]
+
+    sys.setswitchinterval(1e-6)
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    sys.setswitchinterval(0.005)
+
+    expected = set().union(*insides)
+    problems = errors + check(system, expected)
+    total = threads * ops
+    print(f"{threads} gates x {ops:,} ops: {elapsed:.2f}s ({total / elapsed:,.0f} ops/s), "
+          f"{len(system.index):,} vehicles inside")
+
+    if log is not None:
+        log.close()
+        recovered = ParkingSystem(default_facilities(BAYS))
+        EventLog(recovered, directory).close()
+        if recovered.snapshot_state() != system.snapshot_state():
+            problems.append("state recovered from the journal differs from the live state")
+        else:
+            print("journal recovery matches the live state")
+        shutil.rmtree(directory, ignore_errors=True)
+
+    for problem in problems[:20]:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+    print("all invariants hold")
+
+
+if __name__ == "__main__":
+    main()
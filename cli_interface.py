@@ -1,104 +1,78 @@
-import time
-
-MAX_CAPACITY = 25
-
-class Vehicle:
-    def __init__(self, vid, vtype, vip=False):
-        self.id = vid
-        self.type = vtype
-        self.vip = vip
-        self.park_time = time.time()
-
-    def parked_duration_str(self):
-        secs = int(time.time() - self.park_time)
-        return f"{secs // 3600:02d}:{(secs % 3600) // 60:02d}:{secs % 60:02d}"
-
-
-class ParkingLot:
-    def __init__(self, vtype):
-        self.type = vtype
-        self.capacity = MAX_CAPACITY
-        self.slots = []
-        self.waiting_queue = []
-
-    def park_vehicle(self, vehicle):
-        if len(self.slots) < self.capacity:
-            self.slots.append(vehicle)
-            return True, "✅ Vehicle Parked"
-        else:
-            self.waiting_queue.append(vehicle)
-            return False, "🕓 Parking Full: Added to Waiting Queue"
-
-    def remove_vehicle(self, vehicle_id):
-        for i, v in enumerate(self.slots):
-            if v.id == vehicle_id:
-                self.slots.pop(i)
-                if self.waiting_queue:
-                    next_v = self.waiting_queue.pop(0)
-                    self.slots.append(next_v)
-                return True, "🚗 Vehicle Removed from Parking"
-        for i, v in enumerate(self.waiting_queue):
-            if v.id == vehicle_id:
-                self.waiting_queue.pop(i)
-                return True, "⏳ Vehicle Removed from Waiting Queue"
-        return False, "❌ Vehicle Not Found"
+from core.facility import load_facilities
+from core.journal import open_event_log
+from core.metrics import open_metrics
+from core.parking import ParkingLot as BaseParkingLot, ParkingSystem as BaseParkingSystem
+from core.storage import open_storage
+from time_tracker import format_duration
+
+
+class ParkingLot(BaseParkingLot):
+    MESSAGES = {
+        "parked": "✅ Vehicle Parked at Bay {bay}",
+        "queued": "🕓 Parking Full: Added to Waiting Queue",
+        "not_found": "❌ Vehicle Not Found",
+        "removed": "🚗 Vehicle Removed from Parking (Bay {bay})",
+        "removed_waiting": "⏳ Vehicle Removed from Waiting Queue",
+        "reserved": "📅 Bay Reserved for {vid}",
+        "reservation_cancelled": "🗑️  Reservation Cancelled for {vid}",
+        "full": "❌ No Bays Left to Reserve in That Window",
+        "window_invalid": "❌ Reservation Must End After It Starts",
+        "window_range": "❌ That Window Is Over or Too Far Ahead",
+    }
 
     def list_vehicles(self):
-        print(f"\n== {self.type} Parking Lot ==")
-        print(f"Capacity: {len(self.slots)}/{self.capacity}")
-        if self.slots:
+        now = self.clock()
+        print(f"\n== {self.facility}: {self.type} Parking Lot ==")
+        print(f"Capacity: {self.occupied()}/{self.capacity}")
+        if self.reservations:
+            print(f"Reservations: {len(self.reservations)} ({self.reservations.held(now)} bays held now)")
+        if self.bays:
             print("\n🚘 Parked Vehicles:")
-            for v in self.slots:
+            for bay in sorted(self.bays):
+                v = self.bays[bay]
                 status = "VIP" if v.vip else "Normal"
-                print(f"  - ID: {v.id}, {status}, Time: {v.parked_duration_str()}")
+                print(f"  - Bay {bay}: ID: {v.id}, {status}, Time: {format_duration(now - v.park_time)}")
         else:
             print("No vehicles currently parked.")
         if self.waiting_queue:
             print("\n🕒 Waiting Queue:")
             for v in self.waiting_queue:
                 status = "VIP" if v.vip else "Normal"
-                print(f"  - ID: {v.id}, {status}, Waiting: {v.parked_duration_str()}")
+                print(f"  - ID: {v.id}, {status}, Waiting: {format_duration(now - v.park_time)}")
         print("")
 
 
-class ParkingSystem:
-    def __init__(self):
-        self.lots = {
-            "Two-Wheeler": ParkingLot("Two-Wheeler"),
-            "Four-Wheeler": ParkingLot("Four-Wheeler"),
-            "Heavy Vehicle": ParkingLot("Heavy Vehicle"),
-        }
-
-    def add_vehicle(self, vid, vtype, vip):
-        if vtype not in self.lots:
-            return False, "❌ Invalid Vehicle Type"
-        vehicle = Vehicle(vid, vtype, vip)
-        return self.lots[vtype].park_vehicle(vehicle)
-
-    def remove_vehicle(self, vid):
-        for lot in self.lots.values():
-            success, msg = lot.remove_vehicle(vid)
-            if success:
-                return True, msg
-        return False, "❌ Vehicle Not Found in Any Lot"
+class ParkingSystem(BaseParkingSystem):
+    MESSAGES = {
+        "invalid_type": "❌ Invalid Vehicle Type",
+        "duplicate": "❌ Vehicle Already Inside",
+        "not_found": "❌ Vehicle Not Found in Any Lot",
+        "reservation_exists": "❌ {vid} Already Has a Reservation",
+        "no_reservation": "❌ No Reservation for {vid}",
+    }
+    lot_class = ParkingLot
 
     def show_status(self):
         for lot in self.lots.values():
             lot.list_vehicles()
 
 
-def run_cli():
-    system = ParkingSystem()
+def run_cli(config_path=None, data_dir=None):
+    system = ParkingSystem(load_facilities(config_path))
+    event_log = open_event_log(system, data_dir)
+    storage = open_storage(system)
+    metrics = open_metrics(system)
     print("🅿️  Welcome to the Smart Parking System CLI")
     while True:
         print("\nMenu:")
         print("1. 🚙 Add Vehicle")
         print("2. ❌ Remove Vehicle")
         print("3. 📊 Show Parking Status")
-        print("4. 🚪 Exit")
+        print("4. 📅 Reserve a Bay")
+        print("5. 🚪 Exit")
 
-        choice = input("Enter choice (1-4): ").strip()
-        if choice == '1':
+        choice = input("Enter choice (1-5): ").strip()
+        if choice in ('1', '4'):
             vid = input("Enter Vehicle ID: ").strip()
             print("Select Vehicle Type:")
             print("1. Two-Wheeler\n2. Four-Wheeler\n3. Heavy Vehicle")
@@ -109,7 +83,17 @@ def run_cli():
                 continue
             vip_input = input("Is this a VIP vehicle? (y/n): ").strip().lower()
             vip = vip_input == 'y'
-            success, msg = system.add_vehicle(vid, vtype, vip)
+            if choice == '1':
+                success, msg = system.add_vehicle(vid, vtype, vip)
+                print(msg)
+                continue
+            try:
+                start = system.clock() + float(input("Arriving in how many minutes? ").strip()) * 60
+                end = start + float(input("Staying how many hours? ").strip()) * 3600
+            except ValueError:
+                print("❌ Please enter a number.")
+                continue
+            success, msg = system.reserve(vid, vtype, start, end, vip)
             print(msg)
 
         elif choice == '2':
@@ -120,12 +104,18 @@ def run_cli():
         elif choice == '3':
             system.show_status()
 
-        elif choice == '4':
+        elif choice == '5':
             print("👋 Exiting Smart Parking CLI. Goodbye!")
+            if metrics:
+                metrics.close()
+            if storage:
+                storage.close()
+            if event_log:
+                event_log.close()
             break
 
         else:
-            print("❌ Invalid choice. Please enter 1, 2, 3, or 4.")
+            print("❌ Invalid choice. Please enter 1, 2, 3, 4, or 5.")
 
 
 # Entry point if running directly
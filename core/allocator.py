@@ -0,0 +1,59 @@
+import heapq
+
+
+class BayAllocator:
+    """Hands out stable bay numbers 1..capacity, nearest the entrance first.
+
+    Bays are numbered from the entrance outwards, so the lowest free number
+    is always the nearest free bay. Released bays go on a min-heap and bays
+    that were never used are taken from a high-water mark, which keeps
+    allocate and release at O(log n) without pre-building a list of every
+    bay.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.in_use = 0
+        self._free = []
+        self._next = 1
+
+    def allocate(self):
+        if self._free:
+            bay = heapq.heappop(self._free)
+        elif self._next <= self.capacity:
+            bay = self._next
+            self._next += 1
+        else:
+            return None
+        self.in_use += 1
+        return bay
+
+    def claim(self, bay):
+        """Take a specific bay, e.g. when replaying a journal."""
+        if bay == self._next and (not self._free or self._free[0] > bay):
+            self._next += 1
+        elif self._free and self._free[0] == bay:
+            heapq.heappop(self._free)
+        elif bay >= self._next:
+            self._free.extend(range(self._next, bay))
+            heapq.heapify(self._free)
+            self._next = bay + 1
+        else:
+            self._free.remove(bay)
+            heapq.heapify(self._free)
+        self.in_use += 1
+
+    def restore(self, occupied):
+        """Reset to exactly the given set of occupied bays."""
+        occupied = set(occupied)
+        self._next = max(occupied, default=0) + 1
+        self._free = [bay for bay in range(1, self._next) if bay not in occupied]
+        heapq.heapify(self._free)
+        self.in_use = len(occupied)
+
+    def release(self, bay):
+        heapq.heappush(self._free, bay)
+        self.in_use -= 1
+
+    def available(self):
+        return self.capacity - self.in_use
@@ -0,0 +1,293 @@
+import time
+
+from core.events import PARK, QUEUE, PROMOTE, REMOVE, EXPIRE, CANCEL
+from core.export import to_epoch
+from core.journal import read_journal
+
+KINDS = (PARK, QUEUE, PROMOTE, REMOVE, EXPIRE, CANCEL)
+_KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+PERCENTILES = (50, 90, 95, 99)
+DWELL_BINS = (0, 900, 1800, 3600, 2 * 3600, 4 * 3600, 8 * 3600, 24 * 3600)
+
+# Per started hour, after the free period
+DEFAULT_RATES = {
+    "Two-Wheeler": 10.0,
+    "Four-Wheeler": 40.0,
+    "Heavy Vehicle": 100.0,
+}
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("Analytics needs numpy: pip install numpy") from None
+    return np
+
+
+class Tariff:
+    """Hourly rates per vehicle type, with a free period, daily cap and VIP multiplier."""
+
+    def __init__(self, rates=None, free_minutes=15, daily_cap=None, vip_multiplier=1.0):
+        self.rates = dict(DEFAULT_RATES if rates is None else rates)
+        self.free_minutes = free_minutes
+        self.daily_cap = daily_cap
+        self.vip_multiplier = vip_multiplier
+
+    def fees(self, np, duration, rate, vip):
+        """Vectorized fee for stays of ``duration`` seconds at per-stay ``rate``."""
+        billable = np.maximum(duration - self.free_minutes * 60, 0)
+        fee = np.ceil(billable / 3600) * rate
+        if self.daily_cap is not None:
+            days = np.maximum(np.ceil(duration / 86400), 1)
+            fee = np.minimum(fee, days * self.daily_cap)
+        if self.vip_multiplier != 1.0:
+            fee = np.where(vip, fee * self.vip_multiplier, fee)
+        return fee
+
+
+class EventHistory:
+    """Journaled change events as NumPy columns, for vectorized queries.
+
+    Vehicle IDs and lot keys are stored as integer codes (``vids`` and
+    ``lots`` map them back). Stays and queue waits are paired up once, by
+    sorting on vehicle, and every query after that is a handful of array
+    operations, so a year of events answers in milliseconds. Histories can
+    be cached with ``save`` and topped up from the journal tail on ``load``.
+    """
+
+    def __init__(self, ts, kind, lot, vid, vip, lots, vids, offset=0):
+        np = _numpy()
+        self.np = np
+        self.ts = np.asarray(ts, dtype=np.float64)
+        self.kind = np.asarray(kind, dtype=np.int8)
+        self.lot = np.asarray(lot, dtype=np.int32)
+        self.vid = np.asarray(vid, dtype=np.int64)
+        self.vip = np.asarray(vip, dtype=bool)
+        self.lots = list(lots)
+        self.vids = list(vids)
+        self.offset = offset
+        self._by_vehicle = None
+        self._stays = None
+        self._waits = None
+        self._timeline = None
+
+    def __len__(self):
+        return len(self.ts)
+
+    @classmethod
+    def from_records(cls, records, offset=0):
+        """Build from journal-style dicts with ts, kind, lot, vid and vip."""
+        return cls(*_columns(records, [], {}, [], {}), offset=offset)
+
+    @classmethod
+    def from_journal(cls, journal_path):
+        end = [0]
+
+        def records():
+            for record, end[0] in read_journal(journal_path):
+                yield record
+
+        columns = _columns(records(), [], {}, [], {})
+        return cls(*columns, offset=end[0])
+
+    def extend_from_journal(self, journal_path):
+        """Append journal records written after ``offset``; returns how many were added."""
+        np = self.np
+        end = [self.offset]
+
+        def records():
+            for record, end[0] in read_journal(journal_path, self.offset):
+                yield record
+
+        lot_codes = {key: code for code, key in enumerate(self.lots)}
+        vid_codes = {vid: code for code, vid in enumerate(self.vids)}
+        ts, kind, lot, vid, vip, self.lots, self.vids = _columns(records(), self.lots, lot_codes,
+                                                                 self.vids, vid_codes)
+        self.ts = np.concatenate([self.ts, np.asarray(ts, dtype=np.float64)])
+        self.kind = np.concatenate([self.kind, np.asarray(kind, dtype=np.int8)])
+        self.lot = np.concatenate([self.lot, np.asarray(lot, dtype=np.int32)])
+        self.vid = np.concatenate([self.vid, np.asarray(vid, dtype=np.int64)])
+        self.vip = np.concatenate([self.vip, np.asarray(vip, dtype=bool)])
+        self.offset = end[0]
+        if ts:
+            self._by_vehicle = self._stays = self._waits = self._timeline = None
+        return len(ts)
+
+    def save(self, path):
+        """Write the columns, and the costly per-vehicle ordering, to an .npz file.
+
+        Names are stored as fixed-width strings, so loading never unpickles.
+        """
+        np = self.np
+        with open(path, "wb") as f:
+            np.savez(f, ts=self.ts, kind=self.kind, lot=self.lot, vid=self.vid, vip=self.vip,
+                     lots=np.array(self.lots, dtype=str), vids=np.array(self.vids, dtype=str),
+                     offset=np.array(self.offset), by_vehicle=self.by_vehicle())
+
+    @classmethod
+    def load(cls, path, journal_path=None):
+        np = _numpy()
+        with np.load(path, allow_pickle=False) as data:
+            history = cls(data["ts"], data["kind"], data["lot"], data["vid"], data["vip"],
+                          data["lots"].tolist(), data["vids"].tolist(), int(data["offset"]))
+            history._by_vehicle = data["by_vehicle"]
+        if journal_path is not None:
+            history.extend_from_journal(journal_path)
+        return history
+
+    def by_vehicle(self):
+        """Event positions grouped by vehicle, each vehicle's events in journal order."""
+        if self._by_vehicle is None:
+            # The one expensive step; everything else is linear scans
+            self._by_vehicle = self.np.argsort(self.vid, kind="stable")
+        return self._by_vehicle
+
+    def _pairs(self, first_kinds, second_kinds):
+        """Index pairs of consecutive events of one vehicle matching the two kind sets."""
+        order = self.by_vehicle()
+        vid, kind = self.vid[order], self.kind[order]
+        match = (vid[:-1] == vid[1:]) & self._is(kind[:-1], first_kinds) & self._is(kind[1:], second_kinds)
+        before = order[:-1][match]
+        return before, order[1:][match]
+
+    def _is(self, kinds, wanted):
+        # Lookup table over the kind codes; much cheaper than np.isin
+        table = self.np.zeros(len(KINDS), dtype=bool)
+        table[[_KIND_CODES[k] for k in wanted]] = True
+        return table[kinds]
+
+    def stays(self):
+        """Completed stays as ``(lot, vip, start, end)`` arrays, from parking to exit."""
+        if self._stays is None:
+            entered, left = self._pairs((PARK, PROMOTE), (REMOVE, EXPIRE))
+            self._stays = (self.lot[left], self.vip[entered], self.ts[entered], self.ts[left])
+        return self._stays
+
+    def waits(self):
+        """Queue waits of promoted vehicles as ``(lot, vip, queued, promoted)`` arrays."""
+        if self._waits is None:
+            queued, promoted = self._pairs((QUEUE,), (PROMOTE,))
+            self._waits = (self.lot[promoted], self.vip[queued], self.ts[queued], self.ts[promoted])
+        return self._waits
+
+    def _window(self, lots, at, lot, start, end):
+        mask = self.np.ones(len(at), dtype=bool)
+        if lot is not None:
+            mask &= lots == self._lot_code(lot)
+        start, end = to_epoch(start), to_epoch(end)
+        if start is not None:
+            mask &= at >= start
+        if end is not None:
+            mask &= at < end
+        return mask
+
+    def _lot_code(self, lot):
+        # Accepts a lot key or a ParkingLot; unknown lots match nothing
+        key = lot if isinstance(lot, str) else lot.key
+        return self.lots.index(key) if key in self.lots else -1
+
+    def occupancy(self, times, lot=None):
+        """Parked vehicles at each of ``times`` (epoch seconds), site-wide or for one lot."""
+        np = self.np
+        if self._timeline is None:
+            order = np.argsort(self.ts, kind="stable")
+            kind = self.kind[order]
+            delta = self._is(kind, (PARK, PROMOTE)).astype(np.int32) - self._is(kind, (REMOVE, EXPIRE))
+            self._timeline = (self.ts[order], self.lot[order], delta, np.cumsum(delta))
+        ts, lots, delta, level = self._timeline
+        if lot is not None:
+            keep = lots == self._lot_code(lot)
+            ts, level = ts[keep], np.cumsum(delta[keep])
+        idx = np.searchsorted(ts, np.asarray(times, dtype=np.float64), side="right")
+        return np.where(idx > 0, level[np.maximum(idx - 1, 0)], 0)
+
+    def occupancy_series(self, step=3600, start=None, end=None, lot=None):
+        """``(times, occupancy)`` sampled every ``step`` seconds over the history."""
+        np = self.np
+        start = to_epoch(start) if start is not None else (self.ts.min() if len(self) else 0)
+        end = to_epoch(end) if end is not None else (self.ts.max() if len(self) else 0)
+        times = np.arange(start, end + step, step, dtype=np.float64)
+        return times, self.occupancy(times, lot)
+
+    def dwell_times(self, lot=None, start=None, end=None):
+        """Durations in seconds of stays that ended within [start, end)."""
+        lots, _, entered, left = self.stays()
+        return (left - entered)[self._window(lots, left, lot, start, end)]
+
+    def dwell_distribution(self, bins=DWELL_BINS, lot=None, start=None, end=None):
+        """Stay counts per duration bin plus percentiles, in seconds."""
+        np = self.np
+        dwell = self.dwell_times(lot, start, end)
+        edges = np.append(np.asarray(bins, dtype=np.float64), np.inf)
+        counts, _ = np.histogram(dwell, edges)
+        return {"bins": list(bins), "counts": counts.tolist(), "percentiles": self._percentiles(dwell),
+                "mean": float(dwell.mean()) if len(dwell) else None}
+
+    def wait_percentiles(self, percentiles=PERCENTILES, lot=None, start=None, end=None):
+        """Queue wait percentiles in seconds for vehicles promoted within [start, end)."""
+        lots, _, queued, promoted = self.waits()
+        mask = self._window(lots, promoted, lot, start, end)
+        return self._percentiles((promoted - queued)[mask], percentiles)
+
+    def peak_hours(self, step=300, lot=None, utc_offset=None):
+        """Arrivals and mean occupancy per local hour of day, and the busiest hour.
+
+        ``utc_offset`` defaults to the current local offset, so daylight
+        saving changes within the history are not accounted for.
+        """
+        np = self.np
+        if utc_offset is None:
+            utc_offset = time.localtime().tm_gmtoff
+        arriving = self._is(self.kind, (PARK, QUEUE))
+        if lot is not None:
+            arriving &= self.lot == self._lot_code(lot)
+        arrivals = np.bincount(((self.ts[arriving] + utc_offset) // 3600 % 24).astype(np.int64), minlength=24)
+        times, occupancy = self.occupancy_series(step, lot=lot)
+        hours = ((times + utc_offset) // 3600 % 24).astype(np.int64)
+        samples = np.bincount(hours, minlength=24)
+        mean = np.bincount(hours, weights=occupancy, minlength=24) / np.maximum(samples, 1)
+        return {"arrivals": arrivals.tolist(), "occupancy": mean.round(2).tolist(),
+                "peak_hour": int(mean.argmax()) if samples.any() else None}
+
+    def revenue(self, tariff=None, start=None, end=None):
+        """Tariff revenue per lot key for stays that ended within [start, end)."""
+        np = self.np
+        tariff = tariff or Tariff()
+        lots, vip, entered, left = self.stays()
+        mask = self._window(lots, left, None, start, end)
+        rates = np.array([tariff.rates.get(key.rsplit("/", 1)[-1], 0.0) for key in self.lots] or [0.0])
+        fees = tariff.fees(np, (left - entered)[mask], rates[lots[mask]], vip[mask])
+        totals = np.bincount(lots[mask], weights=fees, minlength=len(self.lots))
+        return {key: round(float(total), 2) for key, total in zip(self.lots, totals)}
+
+    def _percentiles(self, values, percentiles=PERCENTILES):
+        if not len(values):
+            return {p: None for p in percentiles}
+        return dict(zip(percentiles, self.np.percentile(values, percentiles).tolist()))
+
+
+def _columns(records, lots, lot_codes, vids, vid_codes):
+    # One pass over the records into plain lists; NumPy converts them in bulk
+    ts, kind, lot, vid, vip = [], [], [], [], []
+    for record in records:
+        # Bookings never occupy a bay, so the history leaves them out
+        kind_code = _KIND_CODES.get(record["kind"])
+        if kind_code is None:
+            continue
+        key = record["lot"]
+        code = lot_codes.get(key)
+        if code is None:
+            code = lot_codes[key] = len(lots)
+            lots.append(key)
+        lot.append(code)
+        v = record["vid"]
+        code = vid_codes.get(v)
+        if code is None:
+            code = vid_codes[v] = len(vids)
+            vids.append(v)
+        vid.append(code)
+        ts.append(record["ts"])
+        kind.append(kind_code)
+        vip.append(record["vip"])
+    return ts, kind, lot, vid, vip, lots, vids
@@ -0,0 +1,681 @@
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from contextlib import ExitStack, contextmanager
+
+from core.events import ChangeEvent, ChangeFeed
+from core.facility import Facility, Level, VEHICLE_TYPES, load_facilities, lot_layout
+from core.ingest import BATCH_SIZE, batches, iter_arrivals, iter_departures
+from core.journal import DATA_DIR_ENV, EventLog
+from core.parking import ParkingSystem
+from core.vehicle_index import IndexEntry
+
+WORKERS_ENV = "PARKING_WORKERS"
+# Columns of each lot's row on the status board
+CAPACITY, OCCUPIED, WAITING, HELD = range(4)
+COLUMNS = 4
+# Board reads retried this many times before settling for an unchecked copy
+READ_RETRIES = 100
+# Result slot for a worker that died mid-call
+_LOST = object()
+
+
+def partition_lots(facilities, workers):
+    """Split the site's lots into at most ``workers`` groups, one per worker process.
+
+    Each vehicle type's bays are spread as evenly as the lots allow, largest
+    lot first, because every type is routed on its own. Returns a facility
+    list per non-empty group holding only that group's zones, so a worker
+    builds an ordinary ParkingSystem from it.
+    """
+    lots = list(lot_layout(facilities))
+    workers = max(1, min(workers, len(lots)))
+    owned = [set() for _ in range(workers)]
+    total = [0] * workers
+    for vtype in VEHICLE_TYPES:
+        by_type = [0] * workers
+        for facility, _, capacity in sorted((lot for lot in lots if lot[1] == vtype), key=lambda lot: -lot[2]):
+            i = min(range(workers), key=lambda w: (by_type[w], total[w]))
+            owned[i].add((facility, vtype))
+            by_type[i] += capacity
+            total[i] += capacity
+    parts = []
+    for lots_owned in owned:
+        part = []
+        for facility in facilities:
+            levels = []
+            for level in facility.levels:
+                zones = [zone for zone in level.zones if (facility.name, zone.type) in lots_owned]
+                if zones:
+                    levels.append(Level(level.name, zones))
+            if levels:
+                part.append(Facility(facility.name, levels))
+        if part:
+            parts.append(part)
+    return parts
+
+
+class StatusBoard:
+    """Per-lot counts in shared memory, written by the owning worker and read by anyone.
+
+    A worker makes its sequence number odd while it rewrites its rows and
+    even again afterwards. Readers retry until they see the same even
+    numbers before and after copying, so a read never mixes two updates.
+    A worker killed mid-write leaves its number odd, so reset() evens it
+    before a replacement starts, and reads give up after READ_RETRIES:
+    the counts only steer routing, and each cell is still a whole value.
+    """
+
+    def __init__(self, context, lots, workers):
+        self.seq = context.RawArray("q", workers)
+        self.cells = context.RawArray("q", len(lots) * COLUMNS)
+        for row, capacity in enumerate(lots):
+            self.cells[row * COLUMNS + CAPACITY] = capacity
+
+    def write(self, worker, rows):
+        """Publish ``(row, (capacity, occupied, waiting, held))`` pairs for ``worker``'s lots."""
+        self.seq[worker] += 1
+        for row, values in rows:
+            self.cells[row * COLUMNS:(row + 1) * COLUMNS] = values
+        self.seq[worker] += 1
+
+    def reset(self, worker):
+        """Close a write ``worker`` died in; call before anything else writes for it."""
+        self.seq[worker] += self.seq[worker] & 1
+
+    def read(self):
+        """Every lot's row as a list of ``[capacity, occupied, waiting, held]``."""
+        for _ in range(READ_RETRIES):
+            before = self.seq[:]
+            cells = self.cells[:]
+            if self.seq[:] == before and not any(seq & 1 for seq in before):
+                break
+            # Let the writer finish, even if it shares this core
+            time.sleep(0)
+        return [cells[i:i + COLUMNS] for i in range(0, len(cells), COLUMNS)]
+
+    def cell(self, row, column):
+        return self.cells[row * COLUMNS + column]
+
+
+class LotView:
+    """Read-only lot as seen on the status board; answers without asking its worker."""
+
+    __slots__ = ("key", "type", "capacity", "board", "row")
+
+    def __init__(self, key, vtype, capacity, board, row):
+        self.key = key
+        self.type = vtype
+        self.capacity = capacity
+        self.board = board
+        self.row = row
+
+    def occupied(self):
+        return self.board.cell(self.row, OCCUPIED)
+
+    def waiting(self):
+        return self.board.cell(self.row, WAITING)
+
+    def taken(self):
+        return self.board.cell(self.row, OCCUPIED) + self.board.cell(self.row, HELD)
+
+
+class ClusterIndex:
+    """Which vehicles are inside, from the router's directory; details come from the owning worker."""
+
+    def __init__(self, cluster):
+        self.cluster = cluster
+
+    def __contains__(self, vid):
+        return vid in self.cluster.homes
+
+    def __len__(self):
+        return len(self.cluster.homes)
+
+    def get(self, vid):
+        worker = self.cluster.homes.get(vid)
+        if worker is None:
+            return None
+        found = self.cluster._call(worker, "entry", vid)
+        return None if found is None or found is _LOST else IndexEntry(*found, None)
+
+
+def _pump(conn, requests):
+    # Always draining the pipe means the router can send the next batch
+    # while this worker is still sending back the last one's results.
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            request = (None, (), False)
+        requests.put(request)
+        if request[0] is None:
+            return
+
+
+def _serve(worker, facilities, data_dir, board, rows, conn):
+    # queue and signal only matter inside a worker, so importing the
+    # cluster module stays as light as the single-process system.
+    import queue
+    import signal
+
+    # The parent decides when workers stop, so Ctrl-C at a terminal does not
+    # kill them halfway through a journal write.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    system = ParkingSystem(facilities)
+    event_log = EventLog(system, data_dir) if data_dir else None
+    events = []
+    system.feed.subscribe(events.extend, batch=True)
+    lots = [(row, system.lots[key]) for key, row in rows]
+
+    def entry(vid):
+        found = system.index.get(vid)
+        return None if found is None else (found.lot, found.state, found.position)
+
+    # Arrivals and removals also say whether the vehicle is still inside
+    # (arrivals with its entry, so gates need no second call) and still
+    # booked here: an early arrival keeps its booking, and any call can
+    # drop holds for no-shows.
+    def booked(vid, vtype=None):
+        return system.booked_lot(vid, vtype) is not None
+
+    def admit(vid, vtype, vip):
+        ok, msg = system.add_vehicle(vid, vtype, vip)
+        return ok, msg, entry(vid), booked(vid, vtype)
+
+    def admit_many(records):
+        return [(vid, ok, msg, entry(vid), booked(vid, vtype))
+                for (vid, ok, msg), (_, vtype, _) in zip(system.add_vehicles(records), records)]
+
+    def remove(vid, expired):
+        ok, msg = system.remove_vehicle(vid, expired)
+        return ok, msg, vid in system.index, booked(vid)
+
+    def remove_many(vids, expired):
+        return [(vid, ok, msg, vid in system.index, booked(vid))
+                for vid, ok, msg in system.remove_vehicles(vids, expired)]
+
+    def contents():
+        booked = [vid for lot in system.lots.values() for vid in lot.reservations]
+        return [vid for vid, _ in system.index.items()], booked
+
+    handlers = {
+        "add": admit,
+        "add_many": admit_many,
+        "remove": remove,
+        "remove_many": remove_many,
+        "reserve": system.reserve,
+        "cancel_reservation": system.cancel_reservation,
+        "availability": system.availability,
+        "release_no_shows": system.release_no_shows,
+        "entry": entry,
+        "contents": contents,
+    }
+    requests = queue.SimpleQueue()
+    threading.Thread(target=_pump, args=(conn, requests), name="requests", daemon=True).start()
+    try:
+        while True:
+            op, args, forward = requests.get()
+            if op is None:
+                break
+            try:
+                reply = ("ok", handlers[op](*args))
+            except Exception as exc:
+                reply = ("error", exc)
+            now = system.clock()
+            for _, lot in lots:
+                if lot.reservations:
+                    lot.expire_holds(now)
+            board.write(worker, [(row, (lot.capacity, lot.occupied(), lot.waiting(), lot.reservations.held(now)))
+                                 for row, lot in lots])
+            shipped = [(e.kind, e.lot, e.vid, e.bay, e.vip, e.ts, e.window) for e in events] if forward else None
+            events.clear()
+            conn.send(reply + (shipped,))
+    finally:
+        if event_log:
+            event_log.close()
+        conn.close()
+
+
+class ParkingCluster:
+    """A site's lots split across worker processes, driven like a ParkingSystem.
+
+    Each worker owns a group of lots, with its own ParkingSystem and, given
+    a data directory, its own event log in ``worker-<n>``. Arrivals go to a
+    worker picked by hashing the vehicle ID over the workers that have lots
+    of its type. If that worker has no free bay, the arrival goes to the
+    worker with the most free bays, and failing that the shortest queue.
+    A directory of vehicle IDs to workers sends departures straight to the
+    right worker. Workers publish their lot counts on a shared-memory
+    status board after every call, so occupancy reads never leave this
+    process. Bulk calls run on all their workers at once and keep the next
+    batch queued on each worker while it works, which holds every worker
+    for the length of the call.
+
+    A worker that dies is restarted at once, recovering from its event log
+    if there is one. Calls that were in flight on it report "unavailable".
+    Keep the number of workers fixed for a data directory, since it decides
+    which lots each worker's log holds.
+    """
+
+    MESSAGES = {
+        **ParkingSystem.MESSAGES,
+        "unavailable": "Lot worker restarted, please retry",
+    }
+
+    def __init__(self, facilities=None, workers=None, data_dir=None):
+        # Only cluster mode pays for importing multiprocessing
+        import multiprocessing
+        facilities = facilities or load_facilities()
+        workers = workers or int(os.environ.get(WORKERS_ENV) or os.cpu_count() or 1)
+        self.parts = partition_lots(facilities, workers)
+        self.data_dir = data_dir or os.environ.get(DATA_DIR_ENV)
+        self.context = multiprocessing.get_context()
+        layout = [(i, facility, vtype, capacity)
+                  for i, part in enumerate(self.parts) for facility, vtype, capacity in lot_layout(part)]
+        self.board = StatusBoard(self.context, [capacity for *_, capacity in layout], len(self.parts))
+        self.lots = {}
+        self.rows = [[] for _ in self.parts]
+        self.by_type = {}
+        self._type_rows = {}
+        for row, (i, facility, vtype, capacity) in enumerate(layout):
+            key = f"{facility}/{vtype}"
+            self.lots[key] = LotView(key, vtype, capacity, self.board, row)
+            self.rows[i].append((key, row))
+            if i not in self.by_type.setdefault(vtype, []):
+                self.by_type[vtype].append(i)
+            self._type_rows.setdefault(vtype, []).append((i, row))
+        self.index = ClusterIndex(self)
+        self.feed = ChangeFeed()
+        self.homes = {}
+        self.booked = {}
+        self._lock = threading.Lock()
+        self._call_locks = [threading.Lock() for _ in self.parts]
+        self._procs = [None] * len(self.parts)
+        self._conns = [None] * len(self.parts)
+        for i in range(len(self.parts)):
+            self._start(i)
+
+    @property
+    def workers(self):
+        return len(self.parts)
+
+    def _start(self, i):
+        self.board.reset(i)
+        data_dir = os.path.join(self.data_dir, f"worker-{i}") if self.data_dir else None
+        conn, child = self.context.Pipe()
+        proc = self.context.Process(target=_serve, name=f"parking-worker-{i}", daemon=True,
+                                    args=(i, self.parts[i], data_dir, self.board, self.rows[i], child))
+        proc.start()
+        child.close()
+        self._procs[i] = proc
+        self._conns[i] = conn
+        # Recovered vehicles and bookings go back into the directory
+        _, (vids, booked), _ = self._exchange(i, "contents", (), False)
+        with self._lock:
+            for vid in vids:
+                self.homes[vid] = i
+            for vid in booked:
+                self.booked[vid] = i
+
+    def _restart(self, i):
+        self._conns[i].close()
+        self._procs[i].kill()
+        self._procs[i].join()
+        with self._lock:
+            for directory in (self.homes, self.booked):
+                for vid in [vid for vid, worker in directory.items() if worker == i]:
+                    del directory[vid]
+        self._start(i)
+
+    def _exchange(self, i, op, args, forward):
+        self._conns[i].send((op, args, forward))
+        return self._conns[i].recv()
+
+    def _post(self, calls, forward):
+        """Send ``{worker: (op, args)}``; returns what _collect() needs to read the replies."""
+        posted = []
+        for i, (op, args) in calls.items():
+            conn = self._conns[i]
+            try:
+                conn.send((op, args, forward))
+                posted.append((i, conn, True))
+            except OSError:
+                posted.append((i, conn, False))
+        return posted
+
+    def _collect(self, posted):
+        """``{worker: result}`` for posted calls, publishing the events they caused.
+
+        A worker that died is restarted and its result is ``_LOST``, as is
+        a call that was sent to it before the restart. An exception raised
+        in a worker is raised here, once every reply is in.
+        """
+        results = {}
+        events = []
+        error = None
+        for i, conn, sent in posted:
+            if conn is not self._conns[i]:
+                results[i] = _LOST
+                continue
+            try:
+                if not sent:
+                    raise EOFError
+                status, result, shipped = conn.recv()
+            except (EOFError, OSError):
+                self._restart(i)
+                results[i] = _LOST
+                continue
+            if status == "error":
+                error = result
+            results[i] = result
+            if shipped:
+                events.extend(ChangeEvent(*event) for event in shipped)
+        self.feed.publish_many(events)
+        if error is not None:
+            raise error
+        return results
+
+    @contextmanager
+    def _holding(self, workers):
+        with ExitStack() as stack:
+            for i in sorted(workers):
+                stack.enter_context(self._call_locks[i])
+            yield
+
+    def _scatter(self, calls):
+        """Run ``{worker: (op, args)}`` on all those workers at once; returns ``{worker: result}``."""
+        with self._holding(calls):
+            return self._collect(self._post(calls, self.feed.active))
+
+    def _stream(self, prepared):
+        """Run each ``{worker: (op, args)}`` from ``prepared`` in order; yields their results.
+
+        Each batch is sent before the previous one's replies are read, so
+        workers start on it at once while this process handles the replies
+        and prepares the batch after.
+        """
+        with self._holding(range(self.workers)):
+            forward = self.feed.active
+            in_flight = deque()
+            try:
+                for calls in prepared:
+                    in_flight.append(self._post(calls, forward))
+                    if len(in_flight) > 1:
+                        yield self._collect(in_flight.popleft())
+                while in_flight:
+                    yield self._collect(in_flight.popleft())
+            finally:
+                # Replies left unread would be taken for the next call's
+                while in_flight:
+                    try:
+                        self._collect(in_flight.popleft())
+                    except Exception:
+                        pass
+
+    def _call(self, i, op, *args):
+        return self._scatter({i: (op, args)})[i]
+
+    def _room(self, vtype):
+        """``{worker: [free bays, waiting]}`` for ``vtype``, from the status board."""
+        rows = self.board.read()
+        room = {i: [0, 0] for i in self.by_type[vtype]}
+        for i, row in self._type_rows[vtype]:
+            capacity, occupied, waiting, held = rows[row]
+            room[i][0] += max(0, capacity - occupied - held)
+            room[i][1] += waiting
+        return room
+
+    def _place(self, vid, workers, room):
+        # The hash home keeps placement even and repeatable; the board only
+        # overrides it when the home is full and another worker is not.
+        i = workers[zlib.crc32(vid.encode()) % len(workers)]
+        counts = room[i]
+        if counts[0] > 0:
+            counts[0] -= 1
+            return i
+        roomiest = max(workers, key=lambda w: room[w][0])
+        i = roomiest if room[roomiest][0] > 0 else min(workers, key=lambda w: room[w][1])
+        counts = room[i]
+        if counts[0] > 0:
+            counts[0] -= 1
+        else:
+            counts[1] += 1
+        return i
+
+    def _claim(self, vid, vtype, room):
+        """Pick and record the worker for an arrival; None if ``vid`` is already inside."""
+        if vid in self.homes:
+            return None
+        workers = self.by_type[vtype]
+        i = self.booked.get(vid)
+        if i not in workers:
+            i = self._place(vid, workers, room)
+        self.homes[vid] = i
+        return i
+
+    def _settle(self, i, vid, inside, booked):
+        """Update the directories from worker ``i``'s word on ``vid``."""
+        if inside and booked:
+            return
+        with self._lock:
+            if not inside:
+                self.homes.pop(vid, None)
+            if not booked and self.booked.get(vid) == i:
+                del self.booked[vid]
+
+    def add_vehicle(self, vid, vtype, vip):
+        return self.admit(vid, vtype, vip)[:2]
+
+    def admit(self, vid, vtype, vip):
+        """add_vehicle() that also returns the vehicle's IndexEntry afterwards, or None if it is not inside.
+
+        The worker sends the entry back with its answer, so this is still one round trip.
+        """
+        if vtype not in self.by_type:
+            return False, self.MESSAGES["invalid_type"], self.index.get(vid)
+        room = self._room(vtype)
+        with self._lock:
+            i = self._claim(vid, vtype, room)
+        if i is None:
+            return False, self.MESSAGES["duplicate"], self.index.get(vid)
+        result = self._call(i, "add", vid, vtype, vip)
+        if result is _LOST:
+            # The restarted worker has already put back any booking it recovered
+            self._settle(i, vid, False, True)
+            return False, self.MESSAGES["unavailable"], None
+        ok, msg, found, booked = result
+        self._settle(i, vid, found is not None, booked)
+        return ok, msg, None if found is None else IndexEntry(*found, None)
+
+    def remove_vehicle(self, vid, expired=False):
+        i = self.homes.get(vid)
+        if i is None:
+            return False, self.MESSAGES["not_found"]
+        result = self._call(i, "remove", vid, expired)
+        if result is _LOST:
+            return False, self.MESSAGES["unavailable"]
+        ok, msg, inside, booked = result
+        self._settle(i, vid, inside, booked)
+        return ok, msg
+
+    def add_vehicles(self, records, batch_size=BATCH_SIZE):
+        """Admit many arrivals; returns ``(vid, parked, msg)`` per record, in order."""
+        return [result[:3] for result in self._add_many(records, batch_size)]
+
+    def admit_many(self, records, batch_size=BATCH_SIZE):
+        """add_vehicles() with each vehicle's IndexEntry (or None), as of the end of the call, appended."""
+        results = []
+        for vid, ok, msg, found in self._add_many(records, batch_size):
+            if found is not None:
+                found = IndexEntry(*found, None)
+            elif vid in self.homes:
+                # Turned away because it is already inside; ask where
+                found = self.index.get(vid)
+            results.append((vid, ok, msg, found))
+        return results
+
+    def _add_many(self, records, batch_size):
+        """``(vid, parked, msg, entry tuple or None)`` per record, in order.
+
+        Each batch is split by worker and every worker admits its share at
+        the same time. Free bays are read off the board once per call and
+        counted down as arrivals are placed, like LotRouter.split().
+        """
+        rooms = {vtype: self._room(vtype) for vtype in self.by_type}
+        plans = deque()
+
+        def prepare():
+            homes, booked, by_type = self.homes, self.booked, self.by_type
+            for batch in batches(iter_arrivals(records), batch_size):
+                batch_results = [None] * len(batch)
+                groups = {}
+                # _claim() inlined; this loop is most of the router's work
+                with self._lock:
+                    for n, record in enumerate(batch):
+                        vid, vtype, _ = record
+                        workers = by_type.get(vtype)
+                        if workers is None:
+                            batch_results[n] = (vid, False, self.MESSAGES["invalid_type"], None)
+                            continue
+                        if vid in homes:
+                            batch_results[n] = (vid, False, self.MESSAGES["duplicate"], None)
+                            continue
+                        i = booked.get(vid) if booked else None
+                        if i not in workers:
+                            i = self._place(vid, workers, rooms[vtype])
+                        homes[vid] = i
+                        group = groups.get(i)
+                        if group is None:
+                            group = groups[i] = ([], [])
+                        group[0].append(n)
+                        group[1].append(record)
+                plans.append((batch, batch_results, {i: positions for i, (positions, _) in groups.items()}))
+                yield {i: ("add_many", (group,)) for i, (_, group) in groups.items()}
+
+        results = []
+        for replies in self._stream(prepare()):
+            batch, batch_results, groups = plans.popleft()
+            self._gather(batch, groups, replies, batch_results, lambda record: record[0])
+            results.extend(batch_results)
+        return results
+
+    def remove_vehicles(self, vids, expired=False, batch_size=BATCH_SIZE):
+        """Remove many vehicles; returns ``(vid, removed, msg)`` per ID, in order."""
+        plans = deque()
+
+        def prepare():
+            for batch in batches(iter_departures(vids), batch_size):
+                batch_results = [None] * len(batch)
+                groups = {}
+                for n, vid in enumerate(batch):
+                    i = self.homes.get(vid)
+                    if i is None:
+                        batch_results[n] = (vid, False, self.MESSAGES["not_found"], None)
+                    else:
+                        groups.setdefault(i, []).append(n)
+                plans.append((batch, batch_results, groups))
+                yield {i: ("remove_many", ([batch[n] for n in group], expired)) for i, group in groups.items()}
+
+        results = []
+        for replies in self._stream(prepare()):
+            batch, batch_results, groups = plans.popleft()
+            self._gather(batch, groups, replies, batch_results, lambda vid: vid)
+            results.extend(result[:3] for result in batch_results)
+        return results
+
+    def _gather(self, batch, groups, replies, batch_results, vid_of):
+        # Fills ``(vid, ok, msg, found)``; found is what the worker said about the
+        # vehicle being inside: its entry tuple (or None) for adds, a bool for removals
+        gone, unbooked = [], []
+        booked = self.booked
+        for i, group in groups.items():
+            reply = replies[i]
+            if reply is _LOST:
+                for n in group:
+                    batch_results[n] = (vid_of(batch[n]), False, self.MESSAGES["unavailable"], None)
+                    gone.append(vid_of(batch[n]))
+                continue
+            for n, (vid, ok, msg, found, still_booked) in zip(group, reply):
+                batch_results[n] = (vid, ok, msg, found)
+                if not found:
+                    gone.append(vid)
+                if not still_booked and booked.get(vid) == i:
+                    unbooked.append((vid, i))
+        if gone or unbooked:
+            with self._lock:
+                for vid in gone:
+                    self.homes.pop(vid, None)
+                for vid, i in unbooked:
+                    if booked.get(vid) == i:
+                        del booked[vid]
+
+    def reserve(self, vid, vtype, start, end, vip=False):
+        """Book a bay, trying the vehicle's hash home first and then the other workers."""
+        workers = self.by_type.get(vtype)
+        if not workers:
+            return False, self.MESSAGES["invalid_type"]
+        with self._lock:
+            if vid in self.booked:
+                return False, self.MESSAGES["reservation_exists"].format(vid=vid)
+            self.booked[vid] = None
+        home = zlib.crc32(vid.encode()) % len(workers)
+        msg = self.MESSAGES["unavailable"]
+        for i in workers[home:] + workers[:home]:
+            result = self._call(i, "reserve", vid, vtype, start, end, vip)
+            if result is _LOST:
+                continue
+            ok, msg = result
+            if ok:
+                with self._lock:
+                    self.booked[vid] = i
+                return ok, msg
+        with self._lock:
+            self.booked.pop(vid, None)
+        return False, msg
+
+    def cancel_reservation(self, vid):
+        with self._lock:
+            i = self.booked.pop(vid, None)
+        if i is None:
+            return False, self.MESSAGES["no_reservation"].format(vid=vid)
+        result = self._call(i, "cancel_reservation", vid)
+        return (False, self.MESSAGES["unavailable"]) if result is _LOST else result
+
+    def availability(self, vtype, start, end):
+        """Bays of ``vtype`` free across [start, end), summed over the workers."""
+        replies = self._scatter({i: ("availability", (vtype, start, end)) for i in self.by_type.get(vtype, ())})
+        return sum(free for free in replies.values() if free is not _LOST)
+
+    def release_no_shows(self):
+        replies = self._scatter({i: ("release_no_shows", ()) for i in range(self.workers)})
+        released = []
+        with self._lock:
+            for i, reservations in replies.items():
+                if reservations is _LOST:
+                    continue
+                for reservation in reservations:
+                    if self.booked.get(reservation.vid) == i:
+                        del self.booked[reservation.vid]
+                released.extend(reservations)
+        return released
+
+    def occupancy(self):
+        """``{lot: (parked, waiting)}`` straight from the status board."""
+        rows = self.board.read()
+        return {key: (rows[lot.row][OCCUPIED], rows[lot.row][WAITING]) for key, lot in self.lots.items()}
+
+    def close(self):
+        for i, conn in enumerate(self._conns):
+            with self._call_locks[i]:
+                try:
+                    conn.send((None, (), False))
+                except OSError:
+                    pass
+        for i, proc in enumerate(self._procs):
+            proc.join(timeout=10)
+            if proc.is_alive():
+                proc.kill()
+            self._conns[i].close()
@@ -0,0 +1,76 @@
+import time
+
+# Change event kinds published by ParkingSystem
+PARK = "park"
+QUEUE = "queue"
+PROMOTE = "promote"
+REMOVE = "remove"
+EXPIRE = "expire"
+CANCEL = "cancel"
+# Bookings: made, cancelled, and dropped because the vehicle never came
+RESERVE = "reserve"
+UNRESERVE = "unreserve"
+NO_SHOW = "no_show"
+BOOKING_KINDS = (RESERVE, UNRESERVE, NO_SHOW)
+
+
+class ChangeEvent:
+    __slots__ = ("kind", "lot", "vid", "bay", "vip", "ts", "window")
+
+    def __init__(self, kind, lot, vid, bay=None, vip=False, ts=None, window=None):
+        self.kind = kind
+        self.lot = lot
+        self.vid = vid
+        self.bay = bay
+        self.vip = vip
+        self.ts = time.time() if ts is None else ts
+        # ``(start, end)`` of the booking, on RESERVE events only
+        self.window = window
+
+    def __repr__(self):
+        return f"ChangeEvent({self.kind!r}, {self.lot!r}, {self.vid!r}, bay={self.bay!r})"
+
+
+class ChangeFeed:
+    """Fan-out of state changes to whoever needs to react to them.
+
+    Every park, queue, promotion, removal, expiry and queue cancellation is
+    published once, as is every booking made, cancelled or dropped for a
+    no-show, so consumers like the GUI can update only what changed instead
+    of re-reading every lot. Bulk operations publish a whole batch at once so
+    batch subscribers, like the journal, can write it in one go.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._batch_subscribers = []
+
+    def subscribe(self, callback, batch=False):
+        """Call ``callback`` per event, or with each published batch if ``batch``."""
+        (self._batch_subscribers if batch else self._subscribers).append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._batch_subscribers:
+            self._batch_subscribers.remove(callback)
+        else:
+            self._subscribers.remove(callback)
+
+    @property
+    def active(self):
+        """True while anyone is subscribed, so publishers can skip building events."""
+        return bool(self._subscribers or self._batch_subscribers)
+
+    def publish(self, kind, lot, vid, bay=None, vip=False, ts=None):
+        if not self.active:
+            return
+        self.publish_many((ChangeEvent(kind, lot, vid, bay, vip, ts),))
+
+    def publish_many(self, events):
+        if not events:
+            return
+        for callback in self._subscribers:
+            for event in events:
+                callback(event)
+        for callback in self._batch_subscribers:
+            callback(events)
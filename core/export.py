@@ -0,0 +1,146 @@
+import csv
+import datetime
+import functools
+import json
+import threading
+
+from core.journal import read_journal
+
+JOURNAL_COLUMNS = ("Timestamp", "VehicleID", "Lot", "Event", "Bay", "VIP")
+LOG_COLUMNS = ("Timestamp", "VehicleID", "Type", "Status", "Message")
+CHUNK_SIZE = 10_000
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_second(second):
+    return datetime.datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def format_ts(ts):
+    # Events cluster within the same second, so format each second once
+    return _format_second(int(ts))
+
+
+def to_epoch(value):
+    """Epoch seconds for a datetime; numbers and None pass through unchanged."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return value.timestamp()
+
+
+def journal_rows(journal_path, start=None, end=None):
+    """Stream journal records as JOURNAL_COLUMNS rows within [start, end)."""
+    start, end = to_epoch(start), to_epoch(end)
+    for record, _ in read_journal(journal_path):
+        ts = record["ts"]
+        if (start is not None and ts < start) or (end is not None and ts >= end):
+            continue
+        yield (format_ts(ts), record["vid"], record["lot"], record["kind"], record["bay"], record["vip"])
+
+
+def log_rows(logs, start=None, end=None):
+    """Stream the GUI's in-memory ``(datetime, vid, type, status, msg)`` logs."""
+    start, end = to_epoch(start), to_epoch(end)
+    for ts, vid, vtype, status, msg in logs:
+        epoch = ts.timestamp()
+        if (start is not None and epoch < start) or (end is not None and epoch >= end):
+            continue
+        yield (format_ts(epoch), vid, vtype, status, msg)
+
+
+def format_for(path):
+    if path.endswith(".jsonl"):
+        return "jsonl"
+    if path.endswith(".parquet"):
+        return "parquet"
+    return "csv"
+
+
+def export_rows(rows, columns, path, fmt=None, chunk_size=CHUNK_SIZE):
+    """Write ``rows`` to ``path`` as CSV, JSONL or Parquet without buffering them all.
+
+    Returns the number of rows written. Parquet needs the optional
+    ``pyarrow`` package and is written one row group per ``chunk_size`` rows.
+    """
+    fmt = fmt or format_for(path)
+    if fmt == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            count = 0
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+            return count
+    if fmt == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            count = 0
+            for row in rows:
+                f.write(json.dumps(dict(zip(columns, row))) + "\n")
+                count += 1
+            return count
+    if fmt == "parquet":
+        return _export_parquet(rows, columns, path, chunk_size)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def _export_parquet(rows, columns, path, chunk_size):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow") from None
+    writer = None
+    count = 0
+    chunk = []
+    try:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                writer = _write_parquet_chunk(pa, pq, writer, chunk, columns, path)
+                count += len(chunk)
+                chunk = []
+        if chunk or writer is None:
+            writer = _write_parquet_chunk(pa, pq, writer, chunk, columns, path)
+            count += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def _write_parquet_chunk(pa, pq, writer, chunk, columns, path):
+    # Everything is written as strings so mixed-type columns stay readable
+    arrays = [pa.array(["" if v is None else str(v) for v in col], pa.string()) for col in zip(*chunk)] \
+        if chunk else [pa.array([], pa.string()) for _ in columns]
+    table = pa.Table.from_arrays(arrays, names=list(columns))
+    if writer is None:
+        writer = pq.ParquetWriter(path, table.schema)
+    writer.write_table(table)
+    return writer
+
+
+class ExportJob(threading.Thread):
+    """Runs an export on a background thread.
+
+    Poll ``done`` from the UI thread; ``count`` or ``error`` is set when it
+    finishes.
+    """
+
+    def __init__(self, rows, columns, path, fmt=None):
+        super().__init__(name="log-export", daemon=True)
+        self.rows = rows
+        self.columns = columns
+        self.path = path
+        self.fmt = fmt
+        self.count = None
+        self.error = None
+        self.done = False
+
+    def run(self):
+        try:
+            self.count = export_rows(self.rows, self.columns, self.path, self.fmt)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
@@ -0,0 +1,131 @@
+import heapq
+import json
+import os
+
+VEHICLE_TYPES = ("Two-Wheeler", "Four-Wheeler", "Heavy Vehicle")
+DEFAULT_CAPACITY = 25
+CONFIG_ENV = "PARKING_CONFIG"
+
+
+class Zone:
+    def __init__(self, name, vtype, capacity):
+        if vtype not in VEHICLE_TYPES:
+            raise ValueError(f"Unknown vehicle type for zone {name}: {vtype}")
+        self.name = name
+        self.type = vtype
+        self.capacity = int(capacity)
+
+
+class Level:
+    def __init__(self, name, zones):
+        self.name = name
+        self.zones = zones
+
+
+class Facility:
+    def __init__(self, name, levels):
+        self.name = name
+        self.levels = levels
+
+    def zones_for(self, vtype):
+        # Levels are listed from the entrance outwards, so this order is also
+        # the order bays should be handed out in.
+        return [(level, zone) for level in self.levels for zone in level.zones if zone.type == vtype]
+
+    def capacity_for(self, vtype):
+        return sum(zone.capacity for _, zone in self.zones_for(vtype))
+
+
+def default_facilities(capacity=DEFAULT_CAPACITY):
+    zones = [Zone(vtype, vtype, capacity) for vtype in VEHICLE_TYPES]
+    return [Facility("Main", [Level("Ground", zones)])]
+
+
+def parse_facilities(config):
+    facilities = []
+    for fac in config["facilities"]:
+        levels = []
+        for lvl in fac["levels"]:
+            zones = [Zone(z["name"], z["type"], z["capacity"]) for z in lvl["zones"]]
+            levels.append(Level(lvl["name"], zones))
+        facilities.append(Facility(fac["name"], levels))
+    if not facilities:
+        raise ValueError("Config must define at least one facility")
+    return facilities
+
+
+def load_facilities(path=None):
+    """Load the facility/level/zone layout from a JSON config file.
+
+    Falls back to the ``PARKING_CONFIG`` environment variable and then to a
+    single facility with ``DEFAULT_CAPACITY`` bays per vehicle type.
+    """
+    path = path or os.environ.get(CONFIG_ENV)
+    if not path:
+        return default_facilities()
+    with open(path) as f:
+        return parse_facilities(json.load(f))
+
+
+class LotRouter:
+    """Picks the lot an arrival should go to.
+
+    Lots of the same vehicle type are sharded across facilities. An arrival
+    goes to the least-loaded lot that still has room, or to the shortest
+    waiting queue when every site is full. Bays held for reservations count
+    as taken. The cost depends only on the number of facilities, never on
+    the number of bays.
+    """
+
+    def __init__(self, lots):
+        self.by_type = {}
+        for lot in lots:
+            self.by_type.setdefault(lot.type, []).append(lot)
+
+    @property
+    def types(self):
+        return list(self.by_type)
+
+    def route(self, vtype):
+        candidates = self.by_type.get(vtype)
+        if not candidates:
+            return None
+        open_lots = [lot for lot in candidates if lot.taken() < lot.capacity]
+        if open_lots:
+            return min(open_lots, key=lambda lot: lot.taken() / lot.capacity)
+        return min(candidates, key=lambda lot: len(lot.waiting_queue))
+
+    def split(self, vtype, count):
+        """Pick a lot for each of ``count`` arrivals, as ``count`` calls to route() would."""
+        candidates = self.by_type.get(vtype)
+        if not candidates:
+            return None
+        # Heaps of (load, position) break ties by lot order, just like min() in route()
+        open_heap = [(lot.taken() / lot.capacity, i, lot.taken()) for i, lot in enumerate(candidates)
+                     if lot.taken() < lot.capacity]
+        heapq.heapify(open_heap)
+        queue_heap = [(len(lot.waiting_queue), i) for i, lot in enumerate(candidates)]
+        heapq.heapify(queue_heap)
+        picks = []
+        for _ in range(count):
+            if open_heap:
+                _, i, occupied = open_heap[0]
+                occupied += 1
+                if occupied < candidates[i].capacity:
+                    heapq.heapreplace(open_heap, (occupied / candidates[i].capacity, i, occupied))
+                else:
+                    heapq.heappop(open_heap)
+            else:
+                waiting, i = queue_heap[0]
+                heapq.heapreplace(queue_heap, (waiting + 1, i))
+            picks.append(candidates[i])
+        return picks
+
+
+def lot_layout(facilities):
+    """Yield ``(facility name, vehicle type, capacity)`` for every lot to build."""
+    for facility in facilities:
+        for vtype in VEHICLE_TYPES:
+            capacity = facility.capacity_for(vtype)
+            if capacity:
+                yield facility.name, vtype, capacity
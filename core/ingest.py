@@ -0,0 +1,66 @@
+import csv
+import itertools
+import json
+import os
+
+BATCH_SIZE = 10_000
+TRUE_VALUES = ("1", "true", "yes", "y", "vip")
+
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_VALUES
+    return bool(value)
+
+
+def _vid(record):
+    return str(record["vid"] if "vid" in record else record["id"])
+
+
+def read_records(path):
+    """Stream dict records from a CSV file with a header row, or from JSONL."""
+    if str(path).endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+
+def iter_arrivals(source):
+    """Yield ``(vid, vtype, vip)`` from tuples, dicts or a CSV/JSONL file path.
+
+    Records need ``vid`` (or ``id``) and ``type``; ``vip`` is optional.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        source = read_records(source)
+    for record in source:
+        if isinstance(record, dict):
+            yield _vid(record), record["type"], _flag(record.get("vip", False))
+        else:
+            vid, vtype, *vip = record
+            yield str(vid), vtype, _flag(vip[0]) if vip else False
+
+
+def iter_departures(source):
+    """Yield vehicle IDs from plain IDs, dicts, tuples or a CSV/JSONL file path."""
+    if isinstance(source, (str, os.PathLike)):
+        source = read_records(source)
+    for record in source:
+        if isinstance(record, dict):
+            yield _vid(record)
+        elif isinstance(record, (tuple, list)):
+            yield str(record[0])
+        else:
+            yield str(record)
+
+
+def batches(iterable, size=BATCH_SIZE):
+    it = iter(iterable)
+    while True:
+        batch = list(itertools.islice(it, size))
+        if not batch:
+            return
+        yield batch
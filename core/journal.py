@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+
+DATA_DIR_ENV = "PARKING_DATA_DIR"
+JOURNAL_FILE = "journal.jsonl"
+SNAPSHOT_FILE = "snapshot.json"
+SNAPSHOT_EVERY = 100_000
+# One shared compact encoder; json.dumps builds a new one per call when given separators
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class Journal:
+    """Append-only JSONL journal with group-commit fsync.
+
+    Records are written as they arrive but only fsynced once ``group_size``
+    of them are pending or ``group_interval`` seconds have passed, so one
+    fsync covers a whole group. A crash can lose at most the last
+    uncommitted group; a torn final line is dropped on recovery.
+    """
+
+    def __init__(self, path, group_size=512, group_interval=0.05, seq=0):
+        self.path = path
+        self.group_size = group_size
+        self.seq = seq
+        self._file = open(path, "a", encoding="utf-8")
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._run, args=(group_interval,), name="journal-commit", daemon=True)
+        self._flusher.start()
+
+    def append(self, record):
+        with self._lock:
+            self.seq += 1
+            record["seq"] = self.seq
+            self._file.write(_encode(record) + "\n")
+            self._pending += 1
+            if self._pending >= self.group_size:
+                self._commit_locked()
+
+    def append_many(self, records):
+        """Append a batch with a single write; it still counts toward group commit."""
+        with self._lock:
+            lines = []
+            for record in records:
+                self.seq += 1
+                record["seq"] = self.seq
+                lines.append(_encode(record))
+            self._file.write("\n".join(lines) + "\n")
+            self._pending += len(lines)
+            if self._pending >= self.group_size:
+                self._commit_locked()
+
+    def commit(self):
+        with self._lock:
+            self._commit_locked()
+
+    def checkpoint(self):
+        """Commit everything and return ``(byte offset, last seq)``."""
+        with self._lock:
+            self._commit_locked()
+            return self._file.tell(), self.seq
+
+    def _commit_locked(self):
+        if self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            self.commit()
+
+    def close(self):
+        self._stop.set()
+        self._flusher.join()
+        self.commit()
+        self._file.close()
+
+
+def read_journal(path, offset=0):
+    """Yield ``(record, end offset)`` from ``offset``, stopping at a torn tail."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return
+            offset += len(line)
+            yield record, offset
+
+
+def _record(e):
+    record = {"ts": e.ts, "kind": e.kind, "lot": e.lot, "vid": e.vid, "bay": e.bay, "vip": e.vip}
+    if e.window is not None:
+        record["window"] = list(e.window)
+    return record
+
+
+def write_snapshot(system, journal, path):
+    # Gates pause while the state is copied so the snapshot and its journal
+    # offset describe the same moment.
+    with system.locked():
+        offset, seq = journal.checkpoint()
+        data = {"seq": seq, "offset": offset, "ts": time.time(), "lots": system.snapshot_state()}
+    # One temp file per writer, so overlapping snapshots (a manual one during
+    # a background one) never rename each other's file away.
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def recover(system, journal_path, snapshot_path):
+    """Load the latest snapshot, then replay the journal tail after it.
+
+    Returns ``(last seq, records replayed)``. Any torn tail is truncated so
+    new records are appended after the last good one.
+    """
+    seq, offset = 0, 0
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        system.load_state(snapshot["lots"])
+        seq, offset = snapshot["seq"], snapshot["offset"]
+    replayed = 0
+    for record, offset in read_journal(journal_path, offset):
+        system.apply_event(record["kind"], record["lot"], record["vid"], record["bay"], record["vip"], record["ts"],
+                           record.get("window"))
+        seq = record["seq"]
+        replayed += 1
+    if os.path.exists(journal_path) and os.path.getsize(journal_path) > offset:
+        with open(journal_path, "r+b") as f:
+            f.truncate(offset)
+    return seq, replayed
+
+
+class EventLog:
+    """Durable history for a ParkingSystem.
+
+    Recovers the system from ``directory`` (snapshot plus journal tail),
+    then journals every change published on its feed. Every
+    ``snapshot_every`` events a background thread writes a fresh snapshot;
+    doing it off the publishing thread means no gate ever waits for other
+    lots' locks while holding its own.
+    """
+
+    def __init__(self, system, directory, snapshot_every=SNAPSHOT_EVERY, **journal_options):
+        os.makedirs(directory, exist_ok=True)
+        self.system = system
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.snapshot_every = snapshot_every
+        seq, self.replayed = recover(system, self.journal_path, self.snapshot_path)
+        self.journal = Journal(self.journal_path, seq=seq, **journal_options)
+        self._since_snapshot = self.replayed
+        self._snapshot_due = threading.Event()
+        self._closing = False
+        self._snapshotter = threading.Thread(target=self._run_snapshots, name="journal-snapshot", daemon=True)
+        self._snapshotter.start()
+        system.feed.subscribe(self.record, batch=True)
+
+    def record(self, events):
+        self.journal.append_many([_record(e) for e in events])
+        self._since_snapshot += len(events)
+        if self._since_snapshot >= self.snapshot_every:
+            self._since_snapshot = 0
+            self._snapshot_due.set()
+
+    def snapshot(self):
+        write_snapshot(self.system, self.journal, self.snapshot_path)
+
+    def _run_snapshots(self):
+        while True:
+            self._snapshot_due.wait()
+            self._snapshot_due.clear()
+            if self._closing:
+                return
+            self.snapshot()
+
+    def close(self):
+        self.system.feed.unsubscribe(self.record)
+        self._closing = True
+        self._snapshot_due.set()
+        self._snapshotter.join()
+        self.journal.close()
+
+
+def open_event_log(system, data_dir=None):
+    """Attach an EventLog when a data directory is given or set in the environment."""
+    data_dir = data_dir or os.environ.get(DATA_DIR_ENV)
+    return EventLog(system, data_dir) if data_dir else None
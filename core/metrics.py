@@ -0,0 +1,444 @@
+import bisect
+import functools
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter as Tally
+
+from core.events import BOOKING_KINDS, PARK, QUEUE, PROMOTE, REMOVE, EXPIRE, CANCEL
+
+METRICS_ENV = "PARKING_METRICS_ADDRESS"
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 1.0)
+WAIT_BUCKETS = (60, 300, 900, 1800, 3600, 2 * 3600, 4 * 3600, 8 * 3600)
+RATE_WINDOW = 60
+MAX_PROFILE_SECONDS = 300
+
+
+def _escape(value):
+    # Label values come from config (facility names), so quote them per the text format
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "count", "lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("target", "start")
+
+    def __init__(self, target):
+        self.target = target
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.target.observe(time.perf_counter() - self.start)
+
+
+class _Window:
+    """Events in the last ``size`` seconds, kept in one bucket per second."""
+
+    __slots__ = ("size", "stamps", "counts", "lock")
+
+    def __init__(self, size):
+        self.size = size
+        self.stamps = [0] * size
+        self.counts = [0] * size
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, now=None):
+        with self.lock:
+            self.add(time.time() if now is None else now, amount)
+
+    def add(self, ts, amount=1):
+        """Unlocked ``inc`` for callers that already serialize their updates."""
+        second = int(ts)
+        i = second % self.size
+        if self.stamps[i] != second:
+            self.stamps[i] = second
+            self.counts[i] = 0
+        self.counts[i] += amount
+
+    @property
+    def value(self):
+        now = int(time.time())
+        return sum(c for s, c in zip(self.stamps, self.counts) if now - self.size < s <= now)
+
+
+class Metric:
+    """A named metric family with optional labels, rendered in Prometheus text format."""
+
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        return _Value()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, values)} {child.value}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+
+class Rate(Metric):
+    """Events per sliding window, exported as a gauge; O(1) per event."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=(), window=RATE_WINDOW):
+        super().__init__(name, help_text, labels)
+        self.window = window
+
+    def _new_child(self):
+        return _Window(self.window)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            with child.lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                le = _format_labels(self.label_names, values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Get-or-create home for metrics, so each name is registered once per process."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._get(Gauge, name, help_text, labels)
+
+    def rate(self, name, help_text, labels=(), window=RATE_WINDOW):
+        return self._get(Rate, name, help_text, labels, window)
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help_text, labels, buckets)
+
+    def render(self):
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def timed(histogram, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return wrapper
+
+
+class ParkingMetrics:
+    """Live counters, gauges and latency histograms for a ParkingSystem.
+
+    Gauges start from the current state and are then kept up to date from
+    the change feed, one O(1) update per event, so a scrape never walks the
+    lots. Gate operations, and each lot's queue promotion step, are timed
+    by wrapping their methods.
+    """
+
+    OPERATIONS = ("add_vehicle", "remove_vehicle", "add_vehicles", "remove_vehicles")
+
+    def __init__(self, system, registry=REGISTRY):
+        self.system = system
+        self.occupied = registry.gauge("parking_occupied_bays", "Bays in use", ("lot",))
+        self.capacity = registry.gauge("parking_capacity_bays", "Bays in the lot", ("lot",))
+        self.queued = registry.gauge("parking_queue_depth", "Vehicles in the waiting queue", ("lot",))
+        self.events = registry.counter("parking_events_total", "Change events published", ("lot", "kind"))
+        self.arrivals = registry.rate("parking_arrivals_per_minute", "Arrivals over the last minute", ("lot",))
+        self.exits = registry.rate("parking_exits_per_minute", "Exits over the last minute", ("lot",))
+        self.promotion_wait = registry.histogram("parking_promotion_wait_seconds",
+                                                 "Time from arrival to promotion out of the queue",
+                                                 ("lot",), WAIT_BUCKETS)
+        self.latency = registry.histogram("parking_operation_seconds", "Time spent in gate operations", ("op",))
+        self._lots = {}
+        with system.locked():
+            for key, lot in system.lots.items():
+                self.capacity.labels(key).set(lot.capacity)
+                self.occupied.labels(key).set(lot.occupied())
+                self.queued.labels(key).set(len(lot.waiting_queue))
+            system.feed.subscribe(self.record, batch=True)
+        for name in self.OPERATIONS:
+            setattr(system, name, timed(self.latency.labels(name), getattr(system, name)))
+        promote = self.latency.labels("promote")
+        for lot in system.lots.values():
+            lot._promote = timed(promote, lot._promote)
+
+    def _children(self, key):
+        children = self._lots.get(key)
+        if children is None:
+            children = self._lots[key] = (
+                self.occupied.labels(key), self.queued.labels(key), self.arrivals.labels(key),
+                self.exits.labels(key), self.promotion_wait.labels(key),
+                {kind: self.events.labels(key, kind) for kind in (PARK, QUEUE, PROMOTE, REMOVE, EXPIRE, CANCEL) + BOOKING_KINDS},
+            )
+        return children
+
+    def record(self, events):
+        # Lots publish under their own lock, so a lot's children are never
+        # written concurrently and can skip their per-value locks here.
+        for event in events:
+            occupied, queued, arrivals, exits, wait, kinds = self._children(event.lot)
+            kind = event.kind
+            kinds[kind].value += 1
+            if kind == PARK:
+                occupied.value += 1
+                arrivals.add(event.ts)
+            elif kind == QUEUE:
+                queued.value += 1
+                arrivals.add(event.ts)
+            elif kind == PROMOTE:
+                queued.value -= 1
+                occupied.value += 1
+                entry = self.system.index.get(event.vid)
+                if entry is not None:
+                    wait.observe(event.ts - entry.vehicle.park_time)
+            elif kind == CANCEL:
+                queued.value -= 1
+                exits.add(event.ts)
+            elif kind in (REMOVE, EXPIRE):
+                occupied.value -= 1
+                exits.add(event.ts)
+
+    def close(self):
+        self.system.feed.unsubscribe(self.record)
+        for name in self.OPERATIONS:
+            self.system.__dict__.pop(name, None)
+        for lot in self.system.lots.values():
+            lot.__dict__.pop("_promote", None)
+
+
+class SamplingProfiler:
+    """Low-overhead sampler of every thread's stack, to find hot paths in production.
+
+    A background thread snapshots all stacks every ``interval`` seconds.
+    Functions are ranked by how often they were on top of a stack (self)
+    and anywhere in one (total).
+    """
+
+    def __init__(self, interval=0.005, ignore=()):
+        self.interval = interval
+        self.ignore = set(ignore)
+        self.samples = 0
+        self.self_counts = Tally()
+        self.total_counts = Tally()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def _run(self):
+        ignore = self.ignore | {threading.get_ident()}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident in ignore:
+                    continue
+                self.samples += 1
+                seen = set()
+                top = True
+                while frame is not None:
+                    code = frame.f_code
+                    where = (code.co_filename, code.co_firstlineno, code.co_name)
+                    if top:
+                        self.self_counts[where] += 1
+                        top = False
+                    if where not in seen:
+                        seen.add(where)
+                        self.total_counts[where] += 1
+                    frame = frame.f_back
+
+    def report(self, limit=30):
+        if not self.samples:
+            return "no samples\n"
+        lines = [f"{self.samples} samples every {self.interval * 1000:g} ms", "  self%  total%  function"]
+        for where, count in self.self_counts.most_common(limit):
+            filename, line, name = where
+            lines.append(f"{100 * count / self.samples:6.1f}  {100 * self.total_counts[where] / self.samples:6.1f}"
+                         f"  {name} ({os.path.basename(filename)}:{line})")
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler:
+    # Mixed into BaseHTTPRequestHandler by serve_metrics, so that importing
+    # this module does not pull in http.server
+    registry = REGISTRY
+
+    def do_GET(self):
+        from urllib.parse import parse_qs, urlparse
+        url = urlparse(self.path)
+        if url.path == "/metrics":
+            body = self.registry.render()
+        elif url.path == "/profile":
+            try:
+                seconds = float(parse_qs(url.query).get("seconds", ["10"])[0])
+            except ValueError:
+                seconds = math.nan
+            if not math.isfinite(seconds):
+                self.send_error(400, "seconds must be a number")
+                return
+            profiler = SamplingProfiler(ignore=(threading.get_ident(),)).start()
+            time.sleep(min(max(seconds, 0.1), MAX_PROFILE_SECONDS))
+            body = profiler.stop().report()
+        else:
+            self.send_error(404)
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(host="127.0.0.1", port=9108, registry=REGISTRY):
+    """Serve ``/metrics`` and ``/profile?seconds=N`` over HTTP from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    handler = type("MetricsHandler", (_MetricsHandler, BaseHTTPRequestHandler), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+class MetricsEndpoint:
+    def __init__(self, metrics, server):
+        self.metrics = metrics
+        self.server = server
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.metrics.close()
+
+
+def open_metrics(system, address=None):
+    """Instrument ``system`` and serve metrics when an address is given or set in the environment."""
+    address = address or os.environ.get(METRICS_ENV)
+    if not address:
+        return None
+    host, _, port = address.rpartition(":")
+    metrics = ParkingMetrics(system)
+    return MetricsEndpoint(metrics, serve_metrics(host or "127.0.0.1", int(port)))
@@ -0,0 +1,45 @@
+import threading
+import time
+
+from core.facility import VEHICLE_TYPES
+
+# Vehicle types are stored as small codes into this table; a type missing
+# from it (say, from a custom config) is added the first time it is seen.
+TYPE_NAMES = list(VEHICLE_TYPES)
+_TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+_types_lock = threading.Lock()
+
+
+def type_code(vtype):
+    code = _TYPE_CODES.get(vtype)
+    if code is None:
+        with _types_lock:
+            code = _TYPE_CODES.get(vtype)
+            if code is None:
+                code = _TYPE_CODES[vtype] = len(TYPE_NAMES)
+                TYPE_NAMES.append(vtype)
+    return code
+
+
+class Vehicle:
+    """A parked or queued vehicle, shared by every front-end.
+
+    Slotted, with the type kept as a small code and the arrival time as
+    whole epoch seconds, so a vehicle costs a fixed few dozen bytes on top
+    of its ID string.
+    """
+
+    __slots__ = ("id", "vip", "park_time", "_type")
+
+    def __init__(self, vid, vtype, vip=False, park_time=None):
+        self.id = vid
+        self._type = type_code(vtype)
+        self.vip = bool(vip)
+        self.park_time = int(time.time() if park_time is None else park_time)
+
+    @property
+    def type(self):
+        return TYPE_NAMES[self._type]
+
+    def __repr__(self):
+        return f"Vehicle({self.id!r}, {self.type!r}, vip={self.vip})"
@@ -0,0 +1,469 @@
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from core.allocator import BayAllocator
+from core.events import ChangeEvent, ChangeFeed, PARK, QUEUE, PROMOTE, REMOVE, EXPIRE, CANCEL, NO_SHOW, RESERVE, UNRESERVE
+from core.facility import DEFAULT_CAPACITY, LotRouter, load_facilities, lot_layout
+from core.ingest import BATCH_SIZE, batches, iter_arrivals, iter_departures
+from core.models.vehicle import Vehicle
+from core.reservations import Reservation, ReservationBook
+from core.vehicle_index import VehicleIndex, PARKED
+from waiting_queue import RESERVED, WaitingQueue
+
+
+class ParkingLot:
+    """Bays and waiting queue for one vehicle type at one facility.
+
+    Every state change happens under the lot's own lock, so park-or-enqueue
+    and remove-and-promote are atomic per lot while gates working on other
+    lots never wait for each other. Front-ends subclass this to word the
+    result messages their own way.
+    """
+
+    MESSAGES = {
+        "parked": "Parked at bay {bay}",
+        "queued": "Added to waiting queue",
+        "not_found": "Vehicle not found",
+        "removed": "Removed {vid} from bay {bay}",
+        "removed_waiting": "Removed {vid} from waiting",
+        "reserved": "Reserved a bay for {vid}",
+        "reservation_cancelled": "Cancelled the reservation for {vid}",
+        "full": "No bays left to reserve in that window",
+        "window_invalid": "A reservation must end after it starts",
+        "window_range": "That window is over or too far ahead",
+    }
+
+    def __init__(self, vtype, capacity=DEFAULT_CAPACITY, index=None, facility="Main", feed=None, clock=time.time):
+        self.type = vtype
+        self.facility = facility
+        self.key = f"{facility}/{vtype}"
+        self.capacity = capacity
+        self.index = index if index is not None else VehicleIndex()
+        self.feed = feed if feed is not None else ChangeFeed()
+        self.allocator = BayAllocator(capacity)
+        self.bays = {}
+        self.clock = clock
+        self.waiting_queue = WaitingQueue(clock=clock)
+        self.reservations = ReservationBook(capacity)
+        # Bookings dropped for a no-show since release_no_shows() last ran
+        self.no_shows = []
+        self.lock = threading.RLock()
+
+    def park_vehicle(self, vehicle):
+        with self.lock:
+            events = []
+            self._expire_holds(vehicle.park_time, events)
+            result, event = self._admit(vehicle)
+            events.append(event)
+            self.feed.publish_many(events)
+            return result
+
+    def park_vehicles(self, vehicles):
+        """Park or queue a batch under one lock hold, publishing it as one batch."""
+        results, events = [], []
+        with self.lock:
+            self._expire_holds(self.clock(), events)
+            for vehicle in vehicles:
+                result, event = self._admit(vehicle)
+                results.append(result)
+                events.append(event)
+            self.feed.publish_many(events)
+        return results
+
+    def _admit(self, vehicle):
+        # A booked arrival uses its held bay, or goes ahead of every walk-in
+        # in the queue; walk-ins only get bays nobody has booked for now.
+        reserved = self.reservations.claim(vehicle.id, vehicle.park_time) if self.reservations else None
+        free = self.allocator.available()
+        if free and (reserved is not None or free > self.reservations.held(vehicle.park_time)):
+            bay = self._occupy(vehicle)
+            event = ChangeEvent(PARK, self.key, vehicle.id, bay, vehicle.vip, vehicle.park_time)
+            return (True, self.MESSAGES["parked"].format(bay=bay, vid=vehicle.id)), event
+        tier = RESERVED if reserved is not None else None
+        self.waiting_queue.add_vehicle(vehicle, tier, enqueued_at=vehicle.park_time)
+        self.index.wait(vehicle.id, self.key, vehicle)
+        event = ChangeEvent(QUEUE, self.key, vehicle.id, vip=vehicle.vip, ts=vehicle.park_time)
+        return (False, self.MESSAGES["queued"].format(vid=vehicle.id)), event
+
+    def occupied(self):
+        return self.allocator.in_use
+
+    def waiting(self):
+        return len(self.waiting_queue)
+
+    def taken(self):
+        """Bays in use plus bays held right now for booked arrivals."""
+        if not self.reservations:
+            return self.allocator.in_use
+        with self.lock:
+            now = self.clock()
+            self.expire_holds(now)
+            return self.allocator.in_use + self.reservations.held(now)
+
+    def _occupy(self, vehicle):
+        bay = self.allocator.allocate()
+        self.bays[bay] = vehicle
+        self.index.park(vehicle.id, self.key, bay, vehicle)
+        return bay
+
+    def remove_vehicle(self, vehicle_id, kind=REMOVE):
+        return self.remove_vehicles((vehicle_id,), kind)[0]
+
+    def remove_vehicles(self, vehicle_ids, kind=REMOVE):
+        """Remove a batch under one lock hold, promoting from the queue as bays free up."""
+        results, events, released = [], [], set()
+        with self.lock:
+            self._expire_holds(self.clock(), events)
+            for vehicle_id in vehicle_ids:
+                results.append(self._release(vehicle_id, kind, events, released))
+            self.feed.publish_many(events)
+            # IDs leave the index last, so no other gate can re-admit them
+            # before their removal has been published.
+            self.index.pop_many(released)
+        return results
+
+    def _release(self, vehicle_id, kind, events, released):
+        entry = self.index.get(vehicle_id)
+        if entry is None or entry.lot != self.key or vehicle_id in released:
+            return False, self.MESSAGES["not_found"].format(vid=vehicle_id)
+        released.add(vehicle_id)
+        now = self.clock()
+        if entry.state == PARKED:
+            del self.bays[entry.position]
+            self.allocator.release(entry.position)
+            events.append(ChangeEvent(kind, self.key, vehicle_id, entry.position, entry.vehicle.vip, now))
+            self._promote(events, now)
+            return True, self.MESSAGES["removed"].format(vid=vehicle_id, bay=entry.position)
+        self.waiting_queue.remove(vehicle_id)
+        events.append(ChangeEvent(CANCEL, self.key, vehicle_id, vip=entry.vehicle.vip, ts=now))
+        return True, self.MESSAGES["removed_waiting"].format(vid=vehicle_id)
+
+    def _promote(self, events, now):
+        # Free bays go to the head of the queue, except those held for bookings
+        while len(self.waiting_queue) and self.allocator.available() > self.reservations.held(now):
+            next_v = self.waiting_queue.next_vehicle()
+            bay = self._occupy(next_v)
+            events.append(ChangeEvent(PROMOTE, self.key, next_v.id, bay, next_v.vip, now))
+
+    def _expire_holds(self, now, events):
+        expired = self.reservations.expire(now)
+        if expired:
+            self.no_shows.extend(expired)
+            events.extend(ChangeEvent(NO_SHOW, self.key, r.vid, vip=r.vip, ts=now) for r in expired)
+            self._promote(events, now)
+
+    def expire_holds(self, now):
+        """Drop holds whose vehicle is overdue before they are counted as taken."""
+        with self.lock:
+            events = []
+            self._expire_holds(now, events)
+            self.feed.publish_many(events)
+
+    def reserve(self, reservation):
+        """Hold a bay for ``reservation``; returns ``(success, msg)``."""
+        with self.lock:
+            now = self.clock()
+            events = []
+            self._expire_holds(now, events)
+            problem = self.reservations.check(reservation.start, reservation.end, now, self.allocator.available())
+            if problem is None:
+                self.reservations.book(reservation)
+                events.append(ChangeEvent(RESERVE, self.key, reservation.vid, vip=reservation.vip, ts=now,
+                                          window=(reservation.start, reservation.end)))
+            self.feed.publish_many(events)
+            if problem is not None:
+                return False, self.MESSAGES[problem]
+            return True, self.MESSAGES["reserved"].format(vid=reservation.vid)
+
+    def cancel_reservation(self, vid):
+        with self.lock:
+            reservation = self.reservations.cancel(vid)
+            if reservation is None:
+                return False, self.MESSAGES["not_found"].format(vid=vid)
+            now = self.clock()
+            events = [ChangeEvent(UNRESERVE, self.key, vid, vip=reservation.vip, ts=now)]
+            self._promote(events, now)
+            self.feed.publish_many(events)
+            return True, self.MESSAGES["reservation_cancelled"].format(vid=vid)
+
+    def release_no_shows(self, now=None):
+        """Drop holds nobody arrived for, letting queued vehicles into those bays.
+
+        Returns every booking dropped for a no-show since the last call,
+        including ones dropped along the way by parks and removals.
+        """
+        with self.lock:
+            self.expire_holds(self.clock() if now is None else now)
+            no_shows, self.no_shows = self.no_shows, []
+            return no_shows
+
+    def restore_parked(self, vehicle, bay):
+        self.allocator.claim(bay)
+        self.bays[bay] = vehicle
+        self.index.park(vehicle.id, self.key, bay, vehicle)
+
+    def restore_waiting(self, vehicle, tier=None):
+        self.waiting_queue.add_vehicle(vehicle, tier, enqueued_at=vehicle.park_time)
+        self.index.wait(vehicle.id, self.key, vehicle)
+
+    def get_parked_vehicles(self):
+        with self.lock:
+            return [self.bays[bay] for bay in sorted(self.bays)]
+
+    def get_waiting_vehicles(self, limit=None):
+        with self.lock:
+            if limit is None:
+                return self.waiting_queue.get_all()
+            return self.waiting_queue.head(limit)
+
+
+class ParkingSystem:
+    """Lots for every facility, with routing, the vehicle index and change feed.
+
+    Safe to drive from several gate threads at once: vehicle IDs are claimed
+    atomically in the index and each lot serializes its own changes.
+    Subclasses pick the ``lot_class`` they need.
+    """
+
+    MESSAGES = {
+        "invalid_type": "Invalid vehicle type",
+        "duplicate": "Vehicle already inside",
+        "not_found": "Vehicle not found",
+        "reservation_exists": "{vid} already has a reservation",
+        "no_reservation": "No reservation for {vid}",
+    }
+    lot_class = ParkingLot
+    vehicle_class = Vehicle
+
+    def __init__(self, facilities=None, clock=time.time):
+        self.facilities = facilities or load_facilities()
+        self.clock = clock
+        self.index = VehicleIndex()
+        self.feed = ChangeFeed()
+        self.lots = {}
+        for facility, vtype, capacity in lot_layout(self.facilities):
+            lot = self.lot_class(vtype, capacity, self.index, facility, self.feed, clock)
+            self.lots[lot.key] = lot
+        self.router = LotRouter(self.lots.values())
+
+    def add_vehicle(self, vid, vtype, vip):
+        if vtype not in self.router.by_type:
+            return False, self.MESSAGES["invalid_type"]
+        lot = self.booked_lot(vid, vtype) or self.router.route(vtype)
+        if not self.index.claim(vid):
+            return False, self.MESSAGES["duplicate"]
+        try:
+            return lot.park_vehicle(self.vehicle_class(vid, vtype, vip, self.clock()))
+        except Exception:
+            self.index.pop(vid)
+            raise
+
+    def admit(self, vid, vtype, vip):
+        """add_vehicle() that also returns the vehicle's IndexEntry afterwards, or None if it is not inside."""
+        ok, msg = self.add_vehicle(vid, vtype, vip)
+        return ok, msg, self.index.get(vid)
+
+    def remove_vehicle(self, vid, expired=False):
+        entry = self.index.get(vid)
+        if entry is None:
+            return False, self.MESSAGES["not_found"]
+        return self.lots[entry.lot].remove_vehicle(vid, EXPIRE if expired else REMOVE)
+
+    def add_vehicles(self, records, batch_size=BATCH_SIZE):
+        """Admit many arrivals; returns ``(vid, parked, msg)`` per record, in order.
+
+        ``records`` is an iterable of ``(vid, vtype, vip)`` tuples or dicts, or
+        a CSV/JSONL file path. Each batch claims its IDs in one index update
+        and is parked lot by lot, so every lot publishes it as one batch.
+        """
+        results = []
+        for batch in batches(iter_arrivals(records), batch_size):
+            results.extend(self._add_batch(batch))
+        return results
+
+    def admit_many(self, records, batch_size=BATCH_SIZE):
+        """add_vehicles() with each vehicle's IndexEntry (or None), as of the end of the call, appended."""
+        return [(vid, ok, msg, self.index.get(vid)) for vid, ok, msg in self.add_vehicles(records, batch_size)]
+
+    def _add_batch(self, batch):
+        results = [None] * len(batch)
+        valid = []
+        for i, (vid, vtype, vip) in enumerate(batch):
+            if vtype in self.router.by_type:
+                valid.append(i)
+            else:
+                results[i] = (vid, False, self.MESSAGES["invalid_type"])
+        claimed = self.index.claim_many([batch[i][0] for i in valid])
+        by_type = {}
+        for i, ok in zip(valid, claimed):
+            if ok:
+                by_type.setdefault(batch[i][1], []).append(i)
+            else:
+                results[i] = (batch[i][0], False, self.MESSAGES["duplicate"])
+        now = self.clock()
+        try:
+            for vtype, positions in by_type.items():
+                by_lot = {}
+                if any(lot.reservations for lot in self.router.by_type[vtype]):
+                    # Booked arrivals go to the lot holding their bay
+                    walk_ins = []
+                    for i in positions:
+                        lot = self.booked_lot(batch[i][0], vtype)
+                        if lot is None:
+                            walk_ins.append(i)
+                        else:
+                            by_lot.setdefault(lot, []).append(i)
+                    positions = walk_ins
+                for i, lot in zip(positions, self.router.split(vtype, len(positions))):
+                    by_lot.setdefault(lot, []).append(i)
+                for lot, group in by_lot.items():
+                    vehicles = [self.vehicle_class(batch[i][0], vtype, batch[i][2], now) for i in group]
+                    for i, (parked, msg) in zip(group, lot.park_vehicles(vehicles)):
+                        results[i] = (batch[i][0], parked, msg)
+        except Exception:
+            self.index.unclaim([batch[i][0] for group in by_type.values() for i in group])
+            raise
+        return results
+
+    def remove_vehicles(self, vids, expired=False, batch_size=BATCH_SIZE):
+        """Remove many vehicles; returns ``(vid, removed, msg)`` per ID, in order.
+
+        ``vids`` is an iterable of IDs (or records with a ``vid``), or a
+        CSV/JSONL file path. Each batch is grouped by lot and removed under
+        one lock hold per lot.
+        """
+        kind = EXPIRE if expired else REMOVE
+        results = []
+        for batch in batches(iter_departures(vids), batch_size):
+            results.extend(self._remove_batch(batch, kind))
+        return results
+
+    def _remove_batch(self, batch, kind):
+        results = [None] * len(batch)
+        by_lot = {}
+        for i, vid in enumerate(batch):
+            entry = self.index.get(vid)
+            if entry is None:
+                results[i] = (vid, False, self.MESSAGES["not_found"])
+            else:
+                by_lot.setdefault(entry.lot, []).append(i)
+        for key, group in by_lot.items():
+            for i, (removed, msg) in zip(group, self.lots[key].remove_vehicles([batch[i] for i in group], kind)):
+                results[i] = (batch[i], removed, msg)
+        return results
+
+    def booked_lot(self, vid, vtype=None):
+        """The lot holding a reservation for ``vid`` (of ``vtype``, if given), or None."""
+        lots = self.router.by_type.get(vtype, ()) if vtype is not None else self.lots.values()
+        for lot in lots:
+            if lot.reservations and vid in lot.reservations:
+                return lot
+        return None
+
+    def reserve(self, vid, vtype, start, end, vip=False):
+        """Book a ``vtype`` bay for ``vid`` from ``start`` to ``end`` (epoch seconds).
+
+        Tries the lot with the least booked share of that window first.
+        Returns ``(success, msg)``.
+        """
+        candidates = self.router.by_type.get(vtype)
+        if not candidates:
+            return False, self.MESSAGES["invalid_type"]
+        if self.booked_lot(vid) is not None:
+            return False, self.MESSAGES["reservation_exists"].format(vid=vid)
+        msg = None
+        for lot in sorted(candidates, key=lambda lot: lot.reservations.peak(start, end) / lot.capacity):
+            booked, msg = lot.reserve(Reservation(vid, start, end, vip))
+            if booked:
+                break
+        return booked, msg
+
+    def cancel_reservation(self, vid):
+        lot = self.booked_lot(vid)
+        if lot is None:
+            return False, self.MESSAGES["no_reservation"].format(vid=vid)
+        return lot.cancel_reservation(vid)
+
+    def availability(self, vtype, start, end):
+        """Bays of ``vtype`` that are not booked at any moment of [start, end), across facilities.
+
+        For a window that has already begun, the vehicles parked right now
+        are counted as staying.
+        """
+        now = self.clock()
+        free = 0
+        for lot in self.router.by_type.get(vtype, ()):
+            with lot.lock:
+                lot.expire_holds(now)
+                taken = lot.reservations.peak(start, end)
+                if start <= now:
+                    taken += lot.occupied()
+            free += max(0, lot.capacity - taken)
+        return free
+
+    def release_no_shows(self):
+        """Drop holds for no-shows in every lot; returns the dropped reservations."""
+        return [reservation for lot in self.lots.values() for reservation in lot.release_no_shows()]
+
+    def make_vehicle(self, vid, vtype, vip, park_time):
+        return self.vehicle_class(vid, vtype, vip, park_time)
+
+    @contextmanager
+    def locked(self):
+        """Hold every lot lock, in a fixed order, for a consistent cut."""
+        with ExitStack() as stack:
+            for key in sorted(self.lots):
+                stack.enter_context(self.lots[key].lock)
+            yield
+
+    def snapshot_state(self):
+        """Plain-data copy of every lot; call inside ``locked()`` when gates are live."""
+        state = {}
+        for key, lot in self.lots.items():
+            book = lot.reservations
+            state[key] = {
+                "parked": [[bay, v.id, v.vip, v.park_time] for bay, v in lot.bays.items()],
+                "waiting": [[v.id, v.vip, v.park_time, lot.waiting_queue.tier(v.id)] for v in lot.waiting_queue],
+                "reserved": [[r.vid, r.start, r.end, r.vip] for r in map(book.get, book)],
+            }
+        return state
+
+    def load_state(self, state):
+        for key, data in state.items():
+            lot = self.lots[key]
+            for bay, vid, vip, park_time in data["parked"]:
+                lot.bays[bay] = vehicle = self.make_vehicle(vid, lot.type, vip, park_time)
+                self.index.park(vid, key, bay, vehicle)
+            lot.allocator.restore(lot.bays)
+            # Older snapshots have no tier and no bookings
+            for vid, vip, park_time, *tier in data["waiting"]:
+                lot.restore_waiting(self.make_vehicle(vid, lot.type, vip, park_time), *tier)
+            for vid, start, end, vip in data.get("reserved", ()):
+                lot.reservations.book(Reservation(vid, start, end, vip))
+
+    def apply_event(self, kind, lot_key, vid, bay, vip, ts, window=None):
+        """Re-apply one journaled change without publishing it again."""
+        lot = self.lots[lot_key]
+        # An arrival used its booking exactly when claim() at its own
+        # timestamp succeeds, so replay re-derives it instead of logging it.
+        if kind == PARK:
+            lot.reservations.claim(vid, ts)
+            lot.restore_parked(self.make_vehicle(vid, lot.type, vip, ts), bay)
+        elif kind == QUEUE:
+            tier = RESERVED if lot.reservations.claim(vid, ts) is not None else None
+            lot.restore_waiting(self.make_vehicle(vid, lot.type, vip, ts), tier)
+        elif kind == PROMOTE:
+            vehicle = lot.waiting_queue.remove(vid)
+            lot.restore_parked(vehicle or self.make_vehicle(vid, lot.type, vip, ts), bay)
+        elif kind in (REMOVE, EXPIRE):
+            self.index.pop(vid)
+            del lot.bays[bay]
+            lot.allocator.release(bay)
+        elif kind == CANCEL:
+            self.index.pop(vid)
+            lot.waiting_queue.remove(vid)
+        elif kind == RESERVE:
+            lot.reservations.book(Reservation(vid, *window, vip))
+        elif kind in (UNRESERVE, NO_SHOW):
+            lot.reservations.cancel(vid)
@@ -0,0 +1,206 @@
+import heapq
+import itertools
+import math
+
+SLOT_SECONDS = 15 * 60
+# Bookings may start up to this far ahead and last at most this long
+HORIZON = 7 * 24 * 3600
+# A reserved vehicle may turn up this early and still use its booking
+EARLY_ARRIVAL = 15 * 60
+# The hold is dropped if the vehicle has not arrived this long after the start
+NO_SHOW_AFTER = 30 * 60
+
+
+class MaxTree:
+    """Segment tree over ``size`` slots with range add and range max.
+
+    Bottom-up with pending adds kept on inner nodes, so both operations
+    are O(log n) loops with no recursion.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.height = size.bit_length()
+        self.top = [0] * (2 * size)
+        self.pending = [0] * size
+
+    def _apply(self, node, amount):
+        self.top[node] += amount
+        if node < self.size:
+            self.pending[node] += amount
+
+    def _rebuild(self, node):
+        top, pending = self.top, self.pending
+        while node > 1:
+            node >>= 1
+            top[node] = max(top[2 * node], top[2 * node + 1]) + pending[node]
+
+    def _push(self, node):
+        for shift in range(self.height, 0, -1):
+            parent = node >> shift
+            if parent and self.pending[parent]:
+                self._apply(2 * parent, self.pending[parent])
+                self._apply(2 * parent + 1, self.pending[parent])
+                self.pending[parent] = 0
+
+    def add(self, lo, hi, amount):
+        """Add ``amount`` to every slot in [lo, hi)."""
+        lo += self.size
+        hi += self.size
+        first, last = lo, hi - 1
+        while lo < hi:
+            if lo & 1:
+                self._apply(lo, amount)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                self._apply(hi, amount)
+            lo >>= 1
+            hi >>= 1
+        self._rebuild(first)
+        self._rebuild(last)
+
+    def max(self, lo, hi):
+        """Largest value in [lo, hi)."""
+        lo += self.size
+        hi += self.size
+        self._push(lo)
+        self._push(hi - 1)
+        best = -math.inf
+        while lo < hi:
+            if lo & 1:
+                best = max(best, self.top[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = max(best, self.top[hi])
+            lo >>= 1
+            hi >>= 1
+        return best
+
+
+class Reservation:
+    __slots__ = ("vid", "start", "end", "vip", "deadline")
+
+    def __init__(self, vid, start, end, vip=False, deadline=None):
+        self.vid = vid
+        self.start = start
+        self.end = end
+        self.vip = vip
+        self.deadline = min(start + NO_SHOW_AFTER, end) if deadline is None else deadline
+
+    def __repr__(self):
+        return f"Reservation({self.vid!r}, {self.start}, {self.end}, vip={self.vip})"
+
+
+class ReservationBook:
+    """Advance bookings for one lot, indexed by time.
+
+    Every booking adds one to the time slots it covers in a MaxTree, so
+    "how many bays are booked at the busiest moment of this window" is a
+    range max and "how many bays must be held right now" a one-slot max,
+    neither scanning bookings. Slots map onto the tree as a ring three
+    horizons long. Live bookings lie between one horizon ago and two ahead,
+    because each takes its +1 back out when it is claimed, cancelled or
+    expires, so slots never alias. Holds cover whole slots, so they start
+    at the slot boundary at or before the booked time.
+    """
+
+    def __init__(self, capacity, slot=SLOT_SECONDS, horizon=HORIZON, early=EARLY_ARRIVAL):
+        self.capacity = capacity
+        self.slot = slot
+        self.horizon = horizon
+        self.early = early
+        self.tree = MaxTree(1 << math.ceil(math.log2(3 * horizon / slot)))
+        self._bookings = {}
+        self._deadlines = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._bookings)
+
+    def __contains__(self, vid):
+        return vid in self._bookings
+
+    def __iter__(self):
+        return iter(list(self._bookings))
+
+    def get(self, vid):
+        return self._bookings.get(vid)
+
+    def _slots(self, start, end):
+        return int(start // self.slot), max(int(start // self.slot) + 1, math.ceil(end / self.slot))
+
+    def _ranges(self, start, end):
+        # Absolute slots onto the ring, split in two where they wrap
+        size = self.tree.size
+        lo, hi = self._slots(start, end)
+        if hi - lo >= size:
+            return [(0, size)]
+        lo, hi = lo % size, hi % size or size
+        return [(lo, hi)] if lo < hi else [(lo, size), (0, hi)]
+
+    def _add(self, reservation, amount):
+        for lo, hi in self._ranges(reservation.start, reservation.end):
+            self.tree.add(lo, hi, amount)
+
+    def peak(self, start, end):
+        """Most bays booked at any moment in [start, end)."""
+        if not self._bookings:
+            return 0
+        return max(self.tree.max(lo, hi) for lo, hi in self._ranges(start, end))
+
+    def held(self, now):
+        """Bays held right now for bookings that have not arrived yet."""
+        if not self._bookings:
+            return 0
+        return self.peak(now, now)
+
+    def check(self, start, end, now, free):
+        """None if a booking for [start, end) fits, otherwise why not.
+
+        A hold that would start in the current slot also needs one of the
+        lot's ``free`` bays that is not already held.
+        """
+        if end <= start:
+            return "window_invalid"
+        if end <= now or start > now + self.horizon or end - start > self.horizon:
+            return "window_range"
+        if self.peak(start, end) >= self.capacity:
+            return "full"
+        if start // self.slot <= now // self.slot and self.held(now) >= free:
+            return "full"
+        return None
+
+    def book(self, reservation):
+        self._bookings[reservation.vid] = reservation
+        self._add(reservation, 1)
+        heapq.heappush(self._deadlines, (reservation.deadline, next(self._seq), reservation.vid, reservation))
+
+    def cancel(self, vid):
+        reservation = self._bookings.pop(vid, None)
+        if reservation is not None:
+            self._add(reservation, -1)
+        return reservation
+
+    def claim(self, vid, now):
+        """Use ``vid``'s booking if it is arriving inside its window; returns it or None."""
+        reservation = self._bookings.get(vid)
+        if reservation is None or not reservation.start - self.early <= now < reservation.deadline:
+            return None
+        return self.cancel(vid)
+
+    def expire(self, now):
+        """Drop bookings whose vehicle did not arrive in time; returns them."""
+        expired = []
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now:
+            _, _, vid, reservation = heapq.heappop(deadlines)
+            # Claimed or cancelled bookings leave stale heap entries behind
+            if self._bookings.get(vid) is reservation:
+                self.cancel(vid)
+                expired.append(reservation)
+        if len(deadlines) > 2 * len(self._bookings) + 64:
+            self._deadlines = [entry for entry in deadlines if self._bookings.get(entry[2]) is entry[3]]
+            heapq.heapify(self._deadlines)
+        return expired
@@ -0,0 +1,109 @@
+import math
+import queue
+import threading
+import time
+
+# Event kinds owned by the scheduler
+AUTO_REMOVE = "auto_remove"
+OVERSTAY = "overstay"
+RESERVATION_EXPIRY = "reservation_expiry"
+
+
+class Timer:
+    __slots__ = ("kind", "key", "payload", "slot", "rounds")
+
+    def __init__(self, kind, key, payload, slot, rounds):
+        self.kind = kind
+        self.key = key
+        self.payload = payload
+        self.slot = slot
+        self.rounds = rounds
+
+
+class TimerWheel:
+    """Hashed timing wheel that owns every time-based parking event.
+
+    Timers hash into ``slots`` buckets by expiry tick and carry a round
+    count for delays longer than one revolution, so scheduling and
+    cancelling are O(1) dict operations. A single worker thread advances the
+    wheel and puts ``(kind, key, payload)`` tuples on ``events``; the UI
+    thread drains that queue, so callbacks never run off the Tk thread.
+    """
+
+    def __init__(self, slots=512, tick=1.0, clock=time.monotonic):
+        self.tick = tick
+        self.clock = clock
+        self.events = queue.SimpleQueue()
+        self._wheel = [{} for _ in range(slots)]
+        self._timers = {}
+        self._cursor = 0
+        self._next_tick = clock() + tick
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+
+    def schedule(self, kind, key, delay, payload=None):
+        ticks = max(1, math.ceil(delay / self.tick))
+        size = len(self._wheel)
+        with self._lock:
+            self._cancel_locked(kind, key)
+            slot = (self._cursor + ticks) % size
+            timer = Timer(kind, key, payload, slot, (ticks - 1) // size)
+            self._wheel[slot][(kind, key)] = timer
+            self._timers[(kind, key)] = timer
+
+    def cancel(self, kind, key):
+        with self._lock:
+            return self._cancel_locked(kind, key)
+
+    def _cancel_locked(self, kind, key):
+        timer = self._timers.pop((kind, key), None)
+        if timer is None:
+            return False
+        del self._wheel[timer.slot][(kind, key)]
+        return True
+
+    def pending(self):
+        return len(self._timers)
+
+    def advance(self, now=None):
+        """Process every tick that has elapsed up to ``now``."""
+        now = self.clock() if now is None else now
+        fired = 0
+        while self._next_tick <= now:
+            self._next_tick += self.tick
+            with self._lock:
+                self._cursor = (self._cursor + 1) % len(self._wheel)
+                bucket = self._wheel[self._cursor]
+                for ident, timer in list(bucket.items()):
+                    if timer.rounds:
+                        timer.rounds -= 1
+                        continue
+                    del bucket[ident]
+                    del self._timers[ident]
+                    self.events.put((timer.kind, timer.key, timer.payload))
+                    fired += 1
+        return fired
+
+    def drain(self):
+        """Yield fired events without blocking; call from the consuming thread."""
+        while True:
+            try:
+                yield self.events.get_nowait()
+            except queue.Empty:
+                return
+
+    def start(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="timer-wheel", daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def _run(self):
+        while not self._stop.wait(max(0.0, self._next_tick - self.clock())):
+            self.advance()
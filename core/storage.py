@@ -0,0 +1,365 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from core.events import BOOKING_KINDS, PARK, QUEUE, PROMOTE, REMOVE, EXPIRE, CANCEL
+
+STORAGE_ENV = "PARKING_STORAGE"
+DEFAULT_PATH = "parking.db"
+POOL_SIZE = 4
+GROUP_SIZE = 512
+GROUP_INTERVAL = 0.05
+# Rows in the vehicles table and the status cache
+PARKED = 0
+WAITING = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lots (
+    key TEXT PRIMARY KEY, facility TEXT NOT NULL, type TEXT NOT NULL, capacity INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS vehicles (
+    vid TEXT PRIMARY KEY, lot TEXT NOT NULL, state INTEGER NOT NULL, bay INTEGER, vip INTEGER NOT NULL,
+    entry REAL NOT NULL, tier INTEGER);
+CREATE INDEX IF NOT EXISTS vehicles_entry ON vehicles (entry);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY, ts REAL NOT NULL, kind TEXT NOT NULL, lot TEXT NOT NULL, vid TEXT NOT NULL,
+    bay INTEGER, vip INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS events_vid ON events (vid, seq);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+"""
+# Constant SQL text, so sqlite3's per-connection statement cache prepares each once
+UPSERT_LOT = ("INSERT INTO lots VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+              "facility = excluded.facility, type = excluded.type, capacity = excluded.capacity")
+INSERT_EVENT = "INSERT INTO events (ts, kind, lot, vid, bay, vip) VALUES (?, ?, ?, ?, ?, ?)"
+UPSERT_VEHICLE = "INSERT OR REPLACE INTO vehicles VALUES (?, ?, ?, ?, ?, ?, ?)"
+DELETE_VEHICLE = "DELETE FROM vehicles WHERE vid = ?"
+SELECT_VEHICLES = "SELECT vid, lot, state, bay, vip, entry, tier FROM vehicles ORDER BY entry, rowid"
+SELECT_OVERSTAYS = "SELECT vid FROM vehicles WHERE entry < ? AND state = 0 ORDER BY entry"
+
+
+class Storage:
+    """Durable current state and history for a ParkingSystem, behind a status cache.
+
+    Subscribes to the change feed like the journal. Every published batch
+    updates the cache and is written through to the engine as one
+    transaction. ``vehicle`` and ``occupancy`` are answered from the cache
+    alone; history and range queries go to the engine. Engines implement
+    ``_load``, ``_write``, ``_replace``, ``events``, ``overstays`` and ``close``.
+
+    Bookings are not stored. Their events go to the event history, but
+    only the journal brings holds back after a restart.
+    """
+
+    def __init__(self):
+        self.system = None
+        # vid -> (lot, state, bay, vip, entry, queue tier), and lot -> [parked, waiting]
+        self._vehicles = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def attach(self, system):
+        """Load the stored state into an empty ``system``, or store the state it already has.
+
+        A system recovered from the journal is the newer copy, so it
+        replaces whatever the engine held.
+        """
+        self.system = system
+        lots = [(key, lot.facility, lot.type, lot.capacity) for key, lot in system.lots.items()]
+        with self._lock:
+            if len(system.index):
+                state = system.snapshot_state()
+                self._fill(state)
+                self._replace(lots, self._rows())
+            else:
+                rows = [row for row in self._load(lots) if row[1] in system.lots]
+                self._vehicles = {row[0]: row[1:] for row in rows}
+                self._recount()
+                system.load_state(self._state(rows))
+        system.feed.subscribe(self.record, batch=True)
+        return self
+
+    def _fill(self, state):
+        self._vehicles = {}
+        for key, data in state.items():
+            for bay, vid, vip, park_time in data["parked"]:
+                self._vehicles[vid] = (key, PARKED, bay, vip, park_time, None)
+            for vid, vip, park_time, *tier in data["waiting"]:
+                self._vehicles[vid] = (key, WAITING, None, vip, park_time, tier[0] if tier else None)
+        self._recount()
+
+    def _recount(self):
+        self._counts = {key: [0, 0] for key in self.system.lots}
+        for lot, state, *_ in self._vehicles.values():
+            self._counts[lot][state] += 1
+
+    def _rows(self):
+        return [(vid,) + row for vid, row in self._vehicles.items()]
+
+    @staticmethod
+    def _state(rows):
+        # Back into snapshot_state() form. Rows come in arrival order, which
+        # breaks ties between queued vehicles that arrived in the same second.
+        state = {}
+        for vid, lot, status, bay, vip, entry, tier in rows:
+            data = state.setdefault(lot, {"parked": [], "waiting": []})
+            if status == PARKED:
+                data["parked"].append([bay, vid, bool(vip), entry])
+            else:
+                data["waiting"].append([vid, bool(vip), entry, tier])
+        return state
+
+    def record(self, events):
+        with self._lock:
+            changed = {}
+            for e in events:
+                # Bookings are kept in the event log only; they never move a vehicle row
+                if e.kind not in BOOKING_KINDS:
+                    changed[e.vid] = self._apply(e)
+            self._write([(e.ts, e.kind, e.lot, e.vid, e.bay, e.vip) for e in events],
+                        [(vid,) + row for vid, row in changed.items() if row is not None],
+                        [(vid,) for vid, row in changed.items() if row is None])
+
+    def _apply(self, e):
+        # The cache moves exactly as ParkingSystem.apply_event does
+        counts = self._counts[e.lot]
+        if e.kind == PARK:
+            row = self._vehicles[e.vid] = (e.lot, PARKED, e.bay, e.vip, e.ts, None)
+            counts[PARKED] += 1
+            return row
+        if e.kind == QUEUE:
+            # Lots publish under their lock, so the queue still holds the vehicle's tier
+            tier = self.system.lots[e.lot].waiting_queue.tier(e.vid)
+            row = self._vehicles[e.vid] = (e.lot, WAITING, None, e.vip, e.ts, tier)
+            counts[WAITING] += 1
+            return row
+        if e.kind == PROMOTE:
+            queued = self._vehicles.get(e.vid)
+            row = self._vehicles[e.vid] = (e.lot, PARKED, e.bay, e.vip, queued[4] if queued else e.ts, None)
+            counts[WAITING] -= queued is not None
+            counts[PARKED] += 1
+            return row
+        if e.kind in (REMOVE, EXPIRE, CANCEL):
+            if self._vehicles.pop(e.vid, None) is not None:
+                counts[WAITING if e.kind == CANCEL else PARKED] -= 1
+        return None
+
+    def vehicle(self, vid):
+        """``(lot, state, bay, vip, entry, tier)`` for a stored vehicle, or None, from the cache."""
+        return self._vehicles.get(vid)
+
+    def occupancy(self):
+        """``{lot: (parked, waiting)}`` from the cache."""
+        with self._lock:
+            return {lot: tuple(counts) for lot, counts in self._counts.items()}
+
+    def detach(self):
+        if self.system is not None:
+            self.system.feed.unsubscribe(self.record)
+
+    def close(self):
+        self.detach()
+
+
+class MemoryStorage(Storage):
+    """Keeps everything in this process; for tests and throwaway runs."""
+
+    def __init__(self):
+        super().__init__()
+        self.lots = {}
+        self._rows_saved = {}
+        self._events = []
+
+    def _load(self, lots):
+        self.lots = {key: row for key, *row in lots}
+        return sorted(((vid,) + row for vid, row in self._rows_saved.items()), key=lambda r: r[5])
+
+    def _replace(self, lots, rows):
+        self.lots = {key: row for key, *row in lots}
+        self._rows_saved = {row[0]: row[1:] for row in rows}
+
+    def _write(self, events, upserts, deletes):
+        self._events.extend(events)
+        for row in upserts:
+            self._rows_saved[row[0]] = row[1:]
+        for (vid,) in deletes:
+            self._rows_saved.pop(vid, None)
+
+    def events(self, vid=None, start=None, end=None, limit=None):
+        with self._lock:
+            found = [e for e in self._events if (vid is None or e[3] == vid) and (start is None or e[0] >= start)
+                     and (end is None or e[0] < end)]
+        return found[:limit] if limit is not None else found
+
+    def overstays(self, cutoff):
+        with self._lock:
+            found = sorted((row[4], vid) for vid, row in self._rows_saved.items() if row[1] == PARKED and row[4] < cutoff)
+        return [vid for _, vid in found]
+
+
+class ConnectionPool:
+    """A fixed set of SQLite connections shared by gate threads.
+
+    WAL lets every pooled reader run alongside the single writer; a thread
+    borrows a connection for one query and hands it back.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self._idle = queue.Queue()
+        for _ in range(size):
+            conn = _connect(path)
+            conn.execute("PRAGMA query_only = ON")
+            self._idle.put(conn)
+        self.size = size
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        for _ in range(self.size):
+            self._idle.get().close()
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, cached_statements=64)
+    conn.execute("PRAGMA busy_timeout = 5000")
+    return conn
+
+
+class SQLiteStorage(Storage):
+    """SQLite in WAL mode: one writer connection and a pool of readers.
+
+    Writes group-commit like the journal: batches go into an open
+    transaction that is committed once ``group_size`` events are pending
+    or ``group_interval`` seconds have passed. With ``synchronous=NORMAL``
+    a commit does not fsync; WAL checkpoints do. A crash can lose the last
+    uncommitted group but never corrupts the database. The status cache is
+    always current, and history queries commit first so they see
+    everything recorded.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, pool_size=POOL_SIZE, group_size=GROUP_SIZE, group_interval=GROUP_INTERVAL):
+        super().__init__()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._writer = _connect(path)
+        self._writer.execute("PRAGMA journal_mode = WAL")
+        self._writer.execute("PRAGMA synchronous = NORMAL")
+        self._writer.executescript(SCHEMA)
+        # Databases made before queue tiers were stored lack the column
+        if "tier" not in {column[1] for column in self._writer.execute("PRAGMA table_info(vehicles)")}:
+            self._writer.execute("ALTER TABLE vehicles ADD COLUMN tier INTEGER")
+        self.pool = ConnectionPool(path, pool_size)
+        self.group_size = group_size
+        self._pending = 0
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._run, args=(group_interval,), name="storage-commit", daemon=True)
+        self._flusher.start()
+
+    @contextmanager
+    def _transaction(self):
+        self._writer.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._writer
+        except BaseException:
+            self._writer.execute("ROLLBACK")
+            raise
+        self._writer.execute("COMMIT")
+
+    def _load(self, lots):
+        with self._transaction() as conn:
+            conn.executemany(UPSERT_LOT, lots)
+        return [(vid, lot, state, bay, bool(vip), entry, tier)
+                for vid, lot, state, bay, vip, entry, tier in self._writer.execute(SELECT_VEHICLES)]
+
+    def _replace(self, lots, rows):
+        with self._transaction() as conn:
+            conn.executemany(UPSERT_LOT, lots)
+            conn.execute("DELETE FROM vehicles")
+            conn.executemany(UPSERT_VEHICLE, rows)
+
+    def _write(self, events, upserts, deletes):
+        conn = self._writer
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(INSERT_EVENT, events)
+        if upserts:
+            conn.executemany(UPSERT_VEHICLE, upserts)
+        if deletes:
+            conn.executemany(DELETE_VEHICLE, deletes)
+        self._pending += len(events)
+        if self._pending >= self.group_size:
+            self._commit_locked()
+
+    def commit(self):
+        with self._lock:
+            self._commit_locked()
+
+    def _commit_locked(self):
+        if self._writer.in_transaction:
+            self._writer.execute("COMMIT")
+        self._pending = 0
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            self.commit()
+
+    def events(self, vid=None, start=None, end=None, limit=None):
+        """Stored events as ``(ts, kind, lot, vid, bay, vip)``, oldest first."""
+        where, args = [], []
+        if vid is not None:
+            where.append("vid = ?")
+            args.append(vid)
+        if start is not None:
+            where.append("ts >= ?")
+            args.append(start)
+        if end is not None:
+            where.append("ts < ?")
+            args.append(end)
+        sql = "SELECT ts, kind, lot, vid, bay, vip FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY seq"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        self.commit()
+        with self.pool.connection() as conn:
+            return [(ts, kind, lot, v, bay, bool(vip)) for ts, kind, lot, v, bay, vip in conn.execute(sql, args)]
+
+    def overstays(self, cutoff):
+        """IDs of vehicles parked since before ``cutoff``, oldest first, via the entry-time index."""
+        self.commit()
+        with self.pool.connection() as conn:
+            return [vid for (vid,) in conn.execute(SELECT_OVERSTAYS, (cutoff,))]
+
+    def close(self):
+        self.detach()
+        self._stop.set()
+        self._flusher.join()
+        with self._lock:
+            self._commit_locked()
+            self.pool.close()
+            self._writer.close()
+
+
+ENGINES = {"sqlite": SQLiteStorage, "memory": MemoryStorage}
+
+
+def open_storage(system, url=None):
+    """Attach storage named by ``url`` or ``PARKING_STORAGE``, e.g. ``sqlite:data/parking.db`` or ``memory:``."""
+    url = url or os.environ.get(STORAGE_ENV)
+    if not url:
+        return None
+    engine, _, target = url.partition(":")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown storage engine {engine!r}; expected one of {', '.join(ENGINES)}")
+    storage = ENGINES[engine](target) if target else ENGINES[engine]()
+    return storage.attach(system)
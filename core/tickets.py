@@ -0,0 +1,182 @@
+import functools
+import os
+import threading
+
+from core.facility import VEHICLE_TYPES
+from core.vehicle_index import PARKED
+from qr_utils import qr_png, read_qr
+
+# Tickets are "P1:<vid>:<type>:<vip>:<entry>:<sig>", with the entry second
+# in base36 and a truncated HMAC-SHA256 of the rest in base32. For plates
+# in capitals every character is in the QR alphanumeric set, which packs
+# tighter than bytes.
+VERSION = "P1"
+SIGNATURE_BYTES = 10
+TICKET_KEY_ENV = "PARKING_TICKET_KEY"
+WORKERS = 2
+CACHE_SIZE = 1024
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff")
+_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+_key = None
+_key_lock = threading.Lock()
+
+
+def ticket_key():
+    """The signing key: ``PARKING_TICKET_KEY`` if set, otherwise random for this process."""
+    global _key
+    with _key_lock:
+        if _key is None:
+            secret = os.environ.get(TICKET_KEY_ENV)
+            _key = secret.encode() if secret else os.urandom(32)
+    return _key
+
+
+def _base36(n):
+    digits = []
+    while True:
+        n, r = divmod(n, 36)
+        digits.append(_DIGITS[r])
+        if not n:
+            return "".join(reversed(digits))
+
+
+def _sign(body, key):
+    # Signing needs base64 (and with it re), hashlib and hmac; headless
+    # imports of this module stay cheap until a ticket is made or read
+    import base64
+    import hashlib
+    import hmac
+    digest = hmac.new(key, body.encode(), hashlib.sha256).digest()[:SIGNATURE_BYTES]
+    return base64.b32encode(digest).decode()
+
+
+class Ticket:
+    __slots__ = ("vid", "vtype", "vip", "entry")
+
+    def __init__(self, vid, vtype, vip, entry):
+        self.vid = vid
+        self.vtype = vtype
+        self.vip = vip
+        self.entry = int(entry)
+
+    @classmethod
+    def for_vehicle(cls, vehicle):
+        return cls(vehicle.id, vehicle.type, vehicle.vip, vehicle.park_time)
+
+    def __eq__(self, other):
+        return isinstance(other, Ticket) and (self.vid, self.vtype, self.vip, self.entry) == (
+            other.vid, other.vtype, other.vip, other.entry)
+
+    def __repr__(self):
+        return f"Ticket({self.vid!r}, {self.vtype!r}, vip={self.vip}, entry={self.entry})"
+
+
+def encode_ticket(ticket, key):
+    from urllib.parse import quote
+    # Built-in types travel as their index, custom ones by name
+    vtype = str(VEHICLE_TYPES.index(ticket.vtype)) if ticket.vtype in VEHICLE_TYPES else quote(ticket.vtype, safe="")
+    body = ":".join((VERSION, quote(ticket.vid, safe=""), vtype, "1" if ticket.vip else "0", _base36(ticket.entry)))
+    return f"{body}:{_sign(body, key)}"
+
+
+def decode_ticket(payload, key):
+    """Parse and verify a ticket payload, raising ValueError if it is not a valid ticket."""
+    import hmac
+    from urllib.parse import unquote
+    body, _, signature = payload.rpartition(":")
+    fields = body.split(":")
+    if len(fields) != 5 or fields[0] != VERSION:
+        raise ValueError("Not a parking ticket")
+    if not hmac.compare_digest(signature, _sign(body, key)):
+        raise ValueError("Ticket signature does not match")
+    _, vid, vtype, vip, entry = fields
+    vtype = VEHICLE_TYPES[int(vtype)] if vtype.isdigit() else unquote(vtype)
+    return Ticket(unquote(vid), vtype, vip == "1", int(entry, 36))
+
+
+def image_paths(directory):
+    """Image files in ``directory``, in name order, as exit cameras drop them."""
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.lower().endswith(IMAGE_EXTENSIONS)]
+
+
+class TicketService:
+    """Issues and reads signed QR tickets on a pool of worker threads.
+
+    Callers get futures back, so the Tk thread never waits on qrcode or
+    zbar. Rendered PNGs are kept in an LRU cache keyed by payload, which
+    makes a reprint of the same stay free.
+    """
+
+    def __init__(self, key=None, workers=WORKERS, cache_size=CACHE_SIZE):
+        from concurrent.futures import ThreadPoolExecutor
+        self.key = key or ticket_key()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tickets")
+        self._render = functools.lru_cache(maxsize=cache_size)(qr_png)
+
+    def issue(self, vehicle):
+        """Future of ``(ticket, png_bytes)`` for a parked vehicle."""
+        return self._pool.submit(self._issue, Ticket.for_vehicle(vehicle))
+
+    def _issue(self, ticket):
+        return ticket, self._render(encode_ticket(ticket, self.key))
+
+    def read(self, image):
+        """Future of ``(ticket, msg)`` for one image; ``ticket`` is None if none was valid."""
+        return self._pool.submit(self._read, image)
+
+    def read_many(self, images):
+        """One future per image, in order, for a folder of exit camera shots."""
+        return [self._pool.submit(self._read, image) for image in images]
+
+    def _read(self, image):
+        try:
+            payloads = read_qr(image)
+        except OSError as e:
+            return None, f"Could not read image: {e}"
+        msg = "No QR code found"
+        for payload in payloads:
+            try:
+                return decode_ticket(payload, self.key), "Ticket OK"
+            except ValueError as e:
+                msg = str(e)
+        return None, msg
+
+    def cache_info(self):
+        return self._render.cache_info()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def check_ticket(system, ticket):
+    """``(ok, msg)``: is ``ticket`` for the stay its vehicle is parked for right now?"""
+    entry = system.index.get(ticket.vid)
+    if entry is None or entry.state != PARKED:
+        return False, f"{ticket.vid} is not parked"
+    vehicle = system.lots[entry.lot].bays.get(entry.position)
+    if vehicle is None or int(vehicle.park_time) != ticket.entry:
+        return False, f"Ticket for {ticket.vid} is from an earlier visit"
+    return True, "Ticket OK"
+
+
+def redeem_tickets(system, tickets):
+    """Check each ticket and remove the vehicles with valid ones in one bulk call.
+
+    Returns a ``(vid, success, message)`` tuple per ticket, in order.
+    """
+    results = [None] * len(tickets)
+    slots = {}
+    for i, ticket in enumerate(tickets):
+        if ticket.vid in slots:
+            results[i] = (ticket.vid, False, f"Duplicate ticket for {ticket.vid}")
+            continue
+        ok, msg = check_ticket(system, ticket)
+        if ok:
+            slots[ticket.vid] = i
+        else:
+            results[i] = (ticket.vid, False, msg)
+    for vid, removed, msg in system.remove_vehicles(list(slots)):
+        results[slots[vid]] = (vid, removed, msg)
+    return results
@@ -0,0 +1,86 @@
+import threading
+
+PARKED = "parked"
+WAITING = "waiting"
+# Placeholder while an arrival is being admitted, so no other gate can
+# admit the same vehicle ID at the same time.
+PENDING = "pending"
+
+
+class IndexEntry:
+    __slots__ = ("lot", "state", "position", "vehicle")
+
+    def __init__(self, lot, state, position, vehicle):
+        self.lot = lot
+        self.state = state
+        self.position = position
+        self.vehicle = vehicle
+
+
+class VehicleIndex:
+    """Hash index from vehicle ID to the lot, position and state it is in.
+
+    Lots update it on every park, remove and promotion so lookups never
+    have to scan slots or waiting queues.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def claim(self, vid):
+        """Atomically reserve ``vid`` for an arrival; False if it is already inside."""
+        with self._lock:
+            if vid in self._entries:
+                return False
+            self._entries[vid] = IndexEntry(None, PENDING, None, None)
+            return True
+
+    def claim_many(self, vids):
+        """Claim a batch of IDs under one lock; returns a success flag per ID."""
+        with self._lock:
+            claimed = []
+            for vid in vids:
+                free = vid not in self._entries
+                if free:
+                    self._entries[vid] = IndexEntry(None, PENDING, None, None)
+                claimed.append(free)
+            return claimed
+
+    def unclaim(self, vids):
+        """Drop claims that were never turned into a parked or waiting entry."""
+        with self._lock:
+            for vid in vids:
+                entry = self._entries.get(vid)
+                if entry is not None and entry.state == PENDING:
+                    del self._entries[vid]
+
+    def park(self, vid, lot, position, vehicle):
+        self._entries[vid] = IndexEntry(lot, PARKED, position, vehicle)
+
+    def wait(self, vid, lot, vehicle):
+        self._entries[vid] = IndexEntry(lot, WAITING, None, vehicle)
+
+    def move(self, vid, position):
+        self._entries[vid].position = position
+
+    def get(self, vid):
+        entry = self._entries.get(vid)
+        return None if entry is None or entry.state == PENDING else entry
+
+    def pop(self, vid):
+        return self._entries.pop(vid, None)
+
+    def pop_many(self, vids):
+        with self._lock:
+            for vid in vids:
+                self._entries.pop(vid, None)
+
+    def items(self):
+        return [(vid, entry) for vid, entry in list(self._entries.items()) if entry.state != PENDING]
+
+    def __contains__(self, vid):
+        return vid in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,381 @@
+import asyncio
+import json
+import math
+import os
+import threading
+
+from core.cluster import WORKERS_ENV, ParkingCluster
+from core.facility import load_facilities
+from core.journal import open_event_log
+from core.metrics import open_metrics
+from core.parking import ParkingSystem
+from core.storage import open_storage
+from core.vehicle_index import PARKED
+
+ADDRESS_ENV = "PARKING_GATE_ADDRESS"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# A subscriber that falls this far behind is dropped rather than buffered forever
+MAX_PUSH_BUFFER = 1 << 20
+# How often holds for booked vehicles that never arrived are released
+NO_SHOW_INTERVAL = 30
+# Ops a batch may not contain; every other op in GateProtocol.handlers may be batched
+UNBATCHED_OPS = ("batch", "subscribe", "unsubscribe")
+
+
+def lot_status(system):
+    return {
+        key: {"capacity": lot.capacity, "occupied": lot.occupied(), "waiting": lot.waiting()}
+        for key, lot in system.lots.items()
+    }
+
+
+def vehicle_status(system, vid):
+    return entry_status(vid, system.index.get(vid))
+
+
+def entry_status(vid, entry):
+    if entry is None:
+        return {"vid": vid, "state": None}
+    state = {"vid": vid, "state": "parked" if entry.state == PARKED else "waiting", "lot": entry.lot}
+    if entry.state == PARKED:
+        state["bay"] = entry.position
+    return state
+
+
+class GateProtocol(asyncio.Protocol):
+    """One barrier controller or camera connection.
+
+    Requests and responses are JSON objects, one per line. Requests may be
+    pipelined: every complete line in a read is handled in order and all of
+    their responses go back in a single write. A request's ``id`` is echoed
+    on its response.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.system = server.system
+        # Only a cluster saves round trips by taking runs of batch items in one bulk call
+        self.bulk_runs = isinstance(self.system, ParkingCluster)
+        self.transport = None
+        self.buffer = b""
+        self.handlers = {
+            "park": self.park,
+            "remove": self.remove,
+            "status": self.status,
+            "reserve": self.reserve,
+            "cancel_reservation": self.cancel_reservation,
+            "availability": self.availability,
+            "batch": self.batch,
+            "subscribe": self.subscribe,
+            "unsubscribe": self.unsubscribe,
+        }
+        self.batch_error = "batch items must be one of: " + ", ".join(
+            op for op in self.handlers if op not in UNBATCHED_OPS)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.server.subscribers.discard(self)
+
+    def data_received(self, data):
+        lines = (self.buffer + data).split(b"\n")
+        self.buffer = lines.pop()
+        out = []
+        for line in lines:
+            if line.strip():
+                out.append(json.dumps(self.handle_line(line)).encode())
+        if out:
+            out.append(b"")
+            self.transport.write(b"\n".join(out))
+
+    # Reading stops while the client is not draining its responses
+    def pause_writing(self):
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+    def handle_line(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"ok": False, "error": "invalid JSON"}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "request must be an object"}
+        response = self.handle(request)
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def handle(self, request):
+        handler = self.handlers.get(request.get("op"))
+        if handler is None:
+            return {"ok": False, "error": f"unknown op {request.get('op')!r}"}
+        # Any failure becomes this request's reply, so one bad request never
+        # drops the connection and the responses pipelined after it.
+        try:
+            return handler(request)
+        except Exception as exc:
+            return _failure(exc)
+
+    def park(self, request):
+        vid = _text(request, "vid")
+        inside = vid in self.system.index
+        _, msg, entry = self.system.admit(vid, _text(request, "type"), bool(request.get("vip", False)))
+        return parked(vid, msg, entry, inside)
+
+    def remove(self, request):
+        vid = _text(request, "vid")
+        ok, msg = self.system.remove_vehicle(vid, expired=bool(request.get("expired", False)))
+        return {"ok": ok, "vid": vid, "msg": msg}
+
+    def status(self, request):
+        if "vid" in request:
+            response = vehicle_status(self.system, _text(request, "vid"))
+        else:
+            response = {"lots": lot_status(self.system)}
+        response["ok"] = True
+        return response
+
+    def reserve(self, request):
+        vid = _text(request, "vid")
+        window = _window(request)
+        if window is None:
+            return {"ok": False, "error": "start and end must be epoch seconds"}
+        ok, msg = self.system.reserve(vid, _text(request, "type"), *window, vip=bool(request.get("vip", False)))
+        return {"ok": ok, "vid": vid, "msg": msg}
+
+    def cancel_reservation(self, request):
+        vid = _text(request, "vid")
+        ok, msg = self.system.cancel_reservation(vid)
+        return {"ok": ok, "vid": vid, "msg": msg}
+
+    def availability(self, request):
+        vtype = _text(request, "type")
+        window = _window(request)
+        if window is None:
+            return {"ok": False, "error": "start and end must be epoch seconds"}
+        return {"ok": True, "type": vtype, "free": self.system.availability(vtype, *window)}
+
+    def batch(self, request):
+        requests = request["requests"]
+        if not isinstance(requests, list):
+            return {"ok": False, "error": "requests must be a list"}
+        # On a cluster, runs of parks, or of removes, go through one bulk
+        # call that runs on all its workers at once. A repeated ID starts a
+        # new run, so each item still sees the ones before it.
+        results, run, run_key, run_vids = [], [], None, set()
+        for item in requests:
+            key = _bulk_key(item) if self.bulk_runs else None
+            vid = item.get("vid") if key is not None else None
+            if not isinstance(vid, str):
+                vid = None
+            if run and (key != run_key or vid in run_vids):
+                results.extend(self.bulk(run_key, run))
+                run = []
+                run_vids.clear()
+            run_key = key
+            if key is not None:
+                run.append(item)
+                run_vids.add(vid)
+            elif not isinstance(item, dict) or item.get("op") in UNBATCHED_OPS:
+                results.append({"ok": False, "error": self.batch_error})
+            else:
+                results.append(self.handle(item))
+        if run:
+            results.extend(self.bulk(run_key, run))
+        return {"ok": True, "results": results}
+
+    def bulk(self, key, items):
+        """Responses for a run of park or remove ``items`` with the same ``key`` and distinct IDs, in order."""
+        if len(items) == 1:
+            return [self.handle(items[0])]
+        responses = [None] * len(items)
+        args, positions = [], []
+        for n, item in enumerate(items):
+            try:
+                vid = _text(item, "vid")
+                args.append((vid, _text(item, "type"), bool(item.get("vip", False))) if key == "park" else vid)
+            except Exception as exc:
+                responses[n] = _failure(exc)
+                continue
+            positions.append((n, vid in self.system.index))
+        try:
+            if key == "park":
+                for (n, inside), (vid, _, msg, entry) in zip(positions, self.system.admit_many(args)):
+                    responses[n] = parked(vid, msg, entry, inside)
+            else:
+                for (n, _), (vid, ok, msg) in zip(positions, self.system.remove_vehicles(args, expired=key[1])):
+                    responses[n] = {"ok": ok, "vid": vid, "msg": msg}
+        except Exception as exc:
+            for n, _ in positions:
+                responses[n] = _failure(exc)
+        return responses
+
+    def subscribe(self, request):
+        self.server.subscribers.add(self)
+        return {"ok": True, "subscribed": True, "lots": lot_status(self.system)}
+
+    def unsubscribe(self, request):
+        self.server.subscribers.discard(self)
+        return {"ok": True, "subscribed": False}
+
+    def push(self, line):
+        if self.transport.get_write_buffer_size() > MAX_PUSH_BUFFER:
+            self.server.subscribers.discard(self)
+            self.transport.close()
+            return
+        self.transport.write(line)
+
+
+def parked(vid, msg, entry, inside):
+    """Park response from ``admit()``'s result; ``inside`` is whether ``vid`` was already in."""
+    # A full lot queues the vehicle; that is still an accepted request
+    response = entry_status(vid, entry)
+    response["ok"] = not inside and entry is not None
+    response["msg"] = msg
+    return response
+
+
+def _bulk_key(item):
+    # Batch items that can share a bulk call have the same key
+    if not isinstance(item, dict):
+        return None
+    if item.get("op") == "park":
+        return "park"
+    if item.get("op") == "remove":
+        return ("remove", bool(item.get("expired", False)))
+    return None
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _failure(exc):
+    if isinstance(exc, KeyError):
+        return {"ok": False, "error": f"missing field {exc.args[0]}"}
+    if isinstance(exc, BadRequest):
+        return {"ok": False, "error": str(exc)}
+    return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def _text(request, field):
+    value = request[field]
+    if not isinstance(value, str):
+        raise BadRequest(f"{field} must be a string")
+    return value
+
+
+def _window(request):
+    try:
+        start, end = float(request["start"]), float(request["end"])
+    except (TypeError, ValueError):
+        return None
+    return (start, end) if math.isfinite(start) and math.isfinite(end) else None
+
+
+class GateServer:
+    """asyncio front-end that lets gates drive a ParkingSystem (or ParkingCluster) over TCP.
+
+    Besides request/response traffic, subscribed connections receive every
+    change on the system's feed as an ``{"event": ...}`` line.
+    """
+
+    def __init__(self, system, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.system = system
+        self.host = host
+        self.port = port
+        self.subscribers = set()
+        self.server = None
+        self.loop = None
+        self.loop_thread = None
+        self.sweeper = None
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self.system.feed.subscribe(self.on_change)
+        self.server = await self.loop.create_server(lambda: GateProtocol(self), self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.sweeper = self.loop.create_task(self.sweep_no_shows())
+        return self
+
+    async def sweep_no_shows(self):
+        # Lots release expired holds whenever they park or remove; this
+        # catches lots that go quiet while vehicles wait behind a hold.
+        while True:
+            await asyncio.sleep(NO_SHOW_INTERVAL)
+            self.system.release_no_shows()
+
+    async def close(self):
+        self.sweeper.cancel()
+        self.system.feed.unsubscribe(self.on_change)
+        self.server.close()
+        await self.server.wait_closed()
+
+    def on_change(self, event):
+        if not self.subscribers:
+            return
+        line = json.dumps({"event": event.kind, "lot": event.lot, "vid": event.vid,
+                           "bay": event.bay, "vip": event.vip, "ts": event.ts}).encode() + b"\n"
+        # Changes made by other threads (timers, another front-end) hop onto the loop
+        if threading.get_ident() == self.loop_thread:
+            self.fan_out(line)
+        else:
+            self.loop.call_soon_threadsafe(self.fan_out, line)
+
+    def fan_out(self, line):
+        for subscriber in list(self.subscribers):
+            subscriber.push(line)
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(":")
+    return host or DEFAULT_HOST, int(port)
+
+
+async def serve(system, host, port):
+    server = await GateServer(system, host, port).start()
+    print(f"🚦 Gate server listening on {server.host}:{server.port}")
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+def run_server(config_path=None, data_dir=None, address=None, workers=None):
+    address = address or os.environ.get(ADDRESS_ENV)
+    host, port = parse_address(address) if address else (DEFAULT_HOST, DEFAULT_PORT)
+    workers = workers or int(os.environ.get(WORKERS_ENV) or 1)
+    if workers > 1:
+        # Workers keep their own event logs; storage and metrics read the
+        # lots directly, so they are only attached in a single process.
+        system = ParkingCluster(load_facilities(config_path), workers, data_dir)
+        event_log = storage = metrics = None
+        print(f"🧩 Lots split across {system.workers} worker processes")
+    else:
+        system = ParkingSystem(load_facilities(config_path))
+        event_log = open_event_log(system, data_dir)
+        storage = open_storage(system)
+        metrics = open_metrics(system)
+    try:
+        asyncio.run(serve(system, host, port))
+    except KeyboardInterrupt:
+        print("👋 Gate server stopped.")
+    finally:
+        if metrics:
+            metrics.close()
+        if storage:
+            storage.close()
+        if event_log:
+            event_log.close()
+        if isinstance(system, ParkingCluster):
+            system.close()
+
+
+# Entry point if running directly
+if __name__ == "__main__":
+    run_server()
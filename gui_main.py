@@ -1,9 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import base64
 import datetime
 import time
-from gui.qr_utils import generate_qr, decode_qr
-from gui.timer_utils import schedule_removal, cancel_removal
+from core.events import PARK, QUEUE, PROMOTE, REMOVE, EXPIRE, CANCEL, RESERVE, UNRESERVE
+from core.export import ExportJob, JOURNAL_COLUMNS, LOG_COLUMNS, export_rows, journal_rows, log_rows
+from core.facility import load_facilities
+from core.journal import open_event_log
+from core.metrics import REGISTRY, open_metrics
+from core.parking import ParkingSystem as BaseParkingSystem
+from core.storage import open_storage
+from core.scheduler import TimerWheel, AUTO_REMOVE, OVERSTAY, RESERVATION_EXPIRY
+from core.tickets import TicketService, image_paths, redeem_tickets
+from time_tracker import format_duration
+from slot_grid import VirtualGrid
 
 # Constants for pastel colors per vehicle type
 PASTEL_COLORS = {
@@ -12,97 +22,59 @@ PASTEL_COLORS = {
     "Heavy Vehicle": "#c5cae9"
 }
 VIP_HIGHLIGHT = "#fff9c4"
-MAX_CAPACITY = 25
-
-class Vehicle:
-    def __init__(self, vid, vtype, vip=False):
-        self.id = vid
-        self.type = vtype
-        self.vip = vip
-        self.park_time = time.time()
-
-    def parked_duration(self):
-        return time.time() - self.park_time
-
-    def parked_duration_str(self):
-        secs = int(self.parked_duration())
-        return f"{secs // 3600:02d}:{(secs % 3600) // 60:02d}:{secs % 60:02d}"
-
-class ParkingLot:
-    def __init__(self, vtype):
-        self.type = vtype
-        self.capacity = MAX_CAPACITY
-        self.slots = []
-        self.waiting_queue = []
-
-    def park_vehicle(self, vehicle):
-        if len(self.slots) < self.capacity:
-            self.slots.append(vehicle)
-            return True, "Parked"
-        else:
-            self.waiting_queue.append(vehicle)
-            return False, "Added to waiting queue"
-
-    def remove_vehicle(self, vehicle_id):
-        for i, v in enumerate(self.slots):
-            if v.id == vehicle_id:
-                self.slots.pop(i)
-                if self.waiting_queue:
-                    next_v = self.waiting_queue.pop(0)
-                    self.slots.append(next_v)
-                return True, f"Removed {vehicle_id}"
-        for i, v in enumerate(self.waiting_queue):
-            if v.id == vehicle_id:
-                self.waiting_queue.pop(i)
-                return True, f"Removed {vehicle_id} from waiting"
-        return False, "Vehicle not found"
-
-    def get_parked_vehicles(self):
-        return self.slots
-
-    def get_waiting_vehicles(self):
-        return self.waiting_queue
-
-class ParkingSystem:
-    def __init__(self):
-        self.lots = {
-            "Two-Wheeler": ParkingLot("Two-Wheeler"),
-            "Four-Wheeler": ParkingLot("Four-Wheeler"),
-            "Heavy Vehicle": ParkingLot("Heavy Vehicle"),
-        }
+AUTO_REMOVE_AFTER = 1800
+# Warn five minutes before a vehicle is auto-removed
+OVERSTAY_ALERT_AFTER = 1500
+GUI_REFRESH = REGISTRY.histogram("parking_gui_refresh_seconds", "Time spent redrawing changed cells").labels()
+
+class ParkingSystem(BaseParkingSystem):
+    def __init__(self, facilities=None, clock=time.time):
+        super().__init__(facilities, clock)
         self.logs = []
 
     def add_vehicle(self, vid, vtype, vip):
-        if vtype not in self.lots:
-            return False, "Invalid vehicle type"
-        vehicle = Vehicle(vid, vtype, vip)
-        parked, msg = self.lots[vtype].park_vehicle(vehicle)
+        parked, msg = super().add_vehicle(vid, vtype, vip)
         self.logs.append((datetime.datetime.now(), vid, vtype, "VIP" if vip else "Normal", msg))
         return parked, msg
 
-    def remove_vehicle(self, vid):
-        for lot in self.lots.values():
-            success, msg = lot.remove_vehicle(vid)
-            if success:
-                self.logs.append((datetime.datetime.now(), vid, lot.type, "Removed", msg))
-                return True, msg
-        return False, "Vehicle not found"
-
-    def export_logs(self, filepath):
+    def remove_vehicle(self, vid, expired=False):
+        entry = self.index.get(vid)
+        success, msg = super().remove_vehicle(vid, expired)
+        if entry is not None:
+            status = "Expired" if expired else "Removed"
+            self.logs.append((datetime.datetime.now(), vid, self.lots[entry.lot].type, status, msg))
+        return success, msg
+
+    # Bulk imports are logged batch by batch, so a large file is still
+    # streamed rather than read into memory first.
+    def _add_batch(self, batch):
+        results = super()._add_batch(batch)
+        now = datetime.datetime.now()
+        self.logs.extend((now, vid, vtype, "VIP" if vip else "Normal", msg)
+                         for (vid, vtype, vip), (_, _, msg) in zip(batch, results))
+        return results
+
+    def _remove_batch(self, batch, kind):
+        entries = {vid: self.index.get(vid) for vid in batch}
+        results = super()._remove_batch(batch, kind)
+        now = datetime.datetime.now()
+        status = "Expired" if kind == EXPIRE else "Removed"
+        self.logs.extend((now, vid, self.lots[entries[vid].lot].type, status, msg)
+                         for vid, removed, msg in results if removed)
+        return results
+
+    def export_logs(self, filepath, start=None, end=None):
         try:
-            with open(filepath, "w") as f:
-                f.write("Timestamp,VehicleID,Type,Status,Message\n")
-                for entry in self.logs:
-                    ts, vid, vtype, status, msg = entry
-                    f.write(f"{ts},{vid},{vtype},{status},{msg}\n")
+            export_rows(log_rows(self.logs, start, end), LOG_COLUMNS, filepath)
             return True, "Logs exported successfully"
         except Exception as e:
             return False, str(e)
 
 class ParkingLotGUI(tk.Tk):
-    def __init__(self, system):
+    def __init__(self, system, event_log=None):
         super().__init__()
         self.system = system
+        self.event_log = event_log
         self.title("Smart Parking System")
         self.geometry("800x900")
         self.configure(bg="#f0f4f8")
@@ -125,11 +97,11 @@ class ParkingLotGUI(tk.Tk):
         header.pack(pady=15)
 
         self.lot_frames = {}
-        for vtype in self.system.lots:
-            frame = ttk.LabelFrame(self.scrollable_frame, text=f"{vtype} Parking Lot (Capacity: {MAX_CAPACITY})", padding=15)
+        for key, lot in self.system.lots.items():
+            frame = ttk.LabelFrame(self.scrollable_frame, text=f"{lot.facility}: {lot.type} Parking Lot (Capacity: {lot.capacity})", padding=15)
             frame.pack(padx=20, pady=12, fill="x")
-            self.lot_frames[vtype] = frame
-            self.create_parking_lot_ui(frame, vtype)
+            self.lot_frames[key] = frame
+            self.create_parking_lot_ui(frame, lot)
 
         ctrl_frame = ttk.Frame(self.scrollable_frame)
         ctrl_frame.pack(pady=20, fill="x")
@@ -139,7 +111,7 @@ class ParkingLotGUI(tk.Tk):
         self.vehicle_id_entry.grid(row=0, column=1, padx=8, pady=8)
 
         ttk.Label(ctrl_frame, text="Vehicle Type:", font=("Segoe UI", 11)).grid(row=1, column=0, sticky="e", padx=8, pady=8)
-        self.vehicle_type_cb = ttk.Combobox(ctrl_frame, values=list(self.system.lots.keys()), state="readonly", font=("Segoe UI", 11))
+        self.vehicle_type_cb = ttk.Combobox(ctrl_frame, values=self.system.router.types, state="readonly", font=("Segoe UI", 11))
         self.vehicle_type_cb.current(0)
         self.vehicle_type_cb.grid(row=1, column=1, padx=8, pady=8)
 
@@ -151,53 +123,150 @@ class ParkingLotGUI(tk.Tk):
         ttk.Button(ctrl_frame, text="Remove Vehicle", command=self.remove_vehicle).grid(row=3, column=1, padx=10, pady=12)
         ttk.Button(ctrl_frame, text="Export Logs", command=self.export_logs).grid(row=4, column=0, columnspan=2, pady=12)
         ttk.Button(ctrl_frame, text="Scan QR to Exit", command=self.scan_qr_and_exit).grid(row=5, column=0, columnspan=2, pady=12)
+        ttk.Button(ctrl_frame, text="Exit Camera Folder", command=self.scan_exit_folder).grid(row=6, column=0, columnspan=2, pady=12)
 
         self.timer_label = ttk.Label(self.scrollable_frame, text="", font=("Segoe UI", 12))
         self.timer_label.pack(pady=10)
-
-        self.update_ui()
-        self.update_timer()
-
-    def create_parking_lot_ui(self, parent_frame, vtype):
-        color = PASTEL_COLORS.get(vtype, "#ddd")
-        slots_frame = ttk.Frame(parent_frame)
-        slots_frame.pack(fill="x", pady=8)
-        slot_labels = []
-        for i in range(MAX_CAPACITY):
-            lbl = tk.Label(slots_frame, text=str(i + 1), relief="ridge", width=6, height=4, bg=color, borderwidth=2)
-            lbl.grid(row=i // 10, column=i % 10, padx=5, pady=5)
-            slot_labels.append(lbl)
-        parent_frame.slot_labels = slot_labels
+        self.alert_label = ttk.Label(self.scrollable_frame, text="", font=("Segoe UI", 11), foreground="#b71c1c")
+        self.alert_label.pack(pady=5)
+        # The last ticket issued; rendered off the Tk thread, shown from memory
+        self.ticket_label = ttk.Label(self.scrollable_frame)
+        self.ticket_label.pack(pady=5)
+        self.ticket_image = None
+        self.tickets = TicketService()
+
+        self.scheduler = TimerWheel()
+        self.scheduler.start()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.bind("<Control-plus>", lambda e: self.zoom(1.25))
+        self.bind("<Control-equal>", lambda e: self.zoom(1.25))
+        self.bind("<Control-minus>", lambda e: self.zoom(0.8))
+
+        # Cells are only touched when the change feed says their state
+        # changed; durations are redrawn by the single tick() loop.
+        self.dirty_bays = set()
+        self.dirty_queues = set()
+        self.refresh_pending = False
+        self.system.feed.subscribe(self.on_change)
+        # Vehicles and bookings recovered from the event log still need their timers
+        now = time.time()
+        for lot in self.system.lots.values():
+            for v in lot.bays.values():
+                self.schedule_vehicle_timers(v.id, now - v.park_time)
+            for vid in lot.reservations:
+                self.schedule_reservation_timer(lot, vid)
+
+        self.tick()
+        self.process_timer_events()
+
+    def create_parking_lot_ui(self, parent_frame, lot):
+        # Both grids are virtualized: only bays and queue entries in view are drawn
+        parent_frame.bay_grid = VirtualGrid(parent_frame, count=lambda: lot.capacity,
+                                            describe=lambda first, last: self.describe_bays(lot, first, last))
+        parent_frame.bay_grid.pack(fill="x", pady=8)
         waiting_frame = ttk.LabelFrame(parent_frame, text="Waiting Queue")
         waiting_frame.pack(fill="x", pady=8)
-        waiting_labels = []
-        for i in range(10):
-            lbl = tk.Label(waiting_frame, text="-", relief="groove", width=10, height=2, bg="#eee", borderwidth=1)
-            lbl.grid(row=0, column=i, padx=3, pady=3)
-            waiting_labels.append(lbl)
-        parent_frame.waiting_labels = waiting_labels
-
-    def update_ui(self):
-        for vtype, frame in self.lot_frames.items():
-            lot = self.system.lots[vtype]
-            for idx, lbl in enumerate(frame.slot_labels):
-                if idx < len(lot.slots):
-                    v = lot.slots[idx]
-                    lbl.config(text=f"{v.id}\n{v.parked_duration_str()}", bg=VIP_HIGHLIGHT if v.vip else PASTEL_COLORS[vtype])
-                else:
-                    lbl.config(text=str(idx + 1), bg=PASTEL_COLORS[vtype])
-            for idx, lbl in enumerate(frame.waiting_labels):
-                if idx < len(lot.waiting_queue):
-                    v = lot.waiting_queue[idx]
-                    lbl.config(text=f"{v.id}\n{v.parked_duration_str()}", bg=VIP_HIGHLIGHT if v.vip else "#ddd")
-                else:
-                    lbl.config(text="-", bg="#eee")
-        self.after(1000, self.update_ui)
-
-    def update_timer(self):
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.timer_label.config(text=f"Current Time: {now}")
-        self.after(1000, self.update_timer)
+        parent_frame.waiting_grid = VirtualGrid(waiting_frame, count=lambda: len(lot.waiting_queue),
+                                                describe=lambda first, last: self.describe_waiting(lot, first, last),
+                                                cell_size=(80, 40), rows_visible=2)
+        parent_frame.waiting_grid.pack(fill="x")
+
+    def describe_bays(self, lot, first, last):
+        now = time.time()
+        color = PASTEL_COLORS.get(lot.type, "#ddd")
+        cells = []
+        for bay in range(first + 1, last + 1):
+            v = lot.bays.get(bay)
+            if v is None:
+                cells.append((str(bay), color))
+            else:
+                text = f"{bay}\n{v.id}\n{format_duration(now - v.park_time, with_seconds=False)}"
+                cells.append((text, VIP_HIGHLIGHT if v.vip else color))
+        return cells
+
+    def describe_waiting(self, lot, first, last):
+        now = time.time()
+        return [(f"{v.id}\n{format_duration(now - v.park_time)}", VIP_HIGHLIGHT if v.vip else "#ddd")
+                for v in lot.get_waiting_vehicles(last)[first:]]
+
+    def on_change(self, event):
+        if event.kind in (PARK, PROMOTE):
+            self.schedule_vehicle_timers(event.vid)
+        elif event.kind in (REMOVE, EXPIRE, CANCEL):
+            self.cancel_vehicle_timers(event.vid)
+        elif event.kind == RESERVE:
+            self.schedule_reservation_timer(self.system.lots[event.lot], event.vid)
+        elif event.kind == UNRESERVE:
+            self.scheduler.cancel(RESERVATION_EXPIRY, event.vid)
+        if event.kind in (PARK, QUEUE) and self.system.booked_lot(event.vid) is None:
+            # The arrival claimed its booking
+            self.scheduler.cancel(RESERVATION_EXPIRY, event.vid)
+        if event.bay is not None:
+            self.dirty_bays.add((event.lot, event.bay))
+        if event.kind in (QUEUE, PROMOTE, CANCEL):
+            self.dirty_queues.add(event.lot)
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.after_idle(self.refresh)
+
+    def refresh(self):
+        self.refresh_pending = False
+        with GUI_REFRESH.time():
+            for key, bay in self.dirty_bays:
+                self.lot_frames[key].bay_grid.redraw_cell(bay - 1)
+            for key in self.dirty_queues:
+                self.lot_frames[key].waiting_grid.redraw()
+        self.dirty_bays.clear()
+        self.dirty_queues.clear()
+
+    def zoom(self, factor):
+        for frame in self.lot_frames.values():
+            frame.bay_grid.zoom(factor)
+
+    def tick(self):
+        now = datetime.datetime.now()
+        self.timer_label.config(text=f"Current Time: {now:%Y-%m-%d %H:%M:%S}")
+        # Durations only change for cells in view, so the cost is bounded by
+        # the viewport size rather than the number of bays.
+        for frame in self.lot_frames.values():
+            frame.bay_grid.redraw()
+            frame.waiting_grid.redraw()
+        self.after(1000, self.tick)
+
+    def process_timer_events(self):
+        # Timer events are produced on the scheduler thread and handled here,
+        # on the Tk thread, so ParkingSystem is never touched concurrently.
+        for kind, vid, payload in self.scheduler.drain():
+            if kind == AUTO_REMOVE:
+                self.system.remove_vehicle(vid, expired=True)
+            elif kind == OVERSTAY:
+                self.alert_label.config(text=f"Overstay: {vid} will be auto-removed in {(AUTO_REMOVE_AFTER - OVERSTAY_ALERT_AFTER) // 60} min")
+            elif kind == RESERVATION_EXPIRY:
+                # Also reports holds a park or removal already dropped
+                for reservation in self.system.release_no_shows():
+                    self.alert_label.config(text=f"Reservation expired: {reservation.vid}")
+        self.after(200, self.process_timer_events)
+
+    def schedule_vehicle_timers(self, vid, elapsed=0):
+        self.scheduler.schedule(AUTO_REMOVE, vid, AUTO_REMOVE_AFTER - elapsed)
+        if elapsed < OVERSTAY_ALERT_AFTER:
+            self.scheduler.schedule(OVERSTAY, vid, OVERSTAY_ALERT_AFTER - elapsed)
+
+    def schedule_reservation_timer(self, lot, vid):
+        # One tick late, since the wheel may fire up to a tick early
+        reservation = lot.reservations.get(vid)
+        delay = reservation.deadline - self.system.clock() + self.scheduler.tick
+        self.scheduler.schedule(RESERVATION_EXPIRY, vid, delay)
+
+    def cancel_vehicle_timers(self, vid):
+        self.scheduler.cancel(AUTO_REMOVE, vid)
+        self.scheduler.cancel(OVERSTAY, vid)
+
+    def on_close(self):
+        self.scheduler.stop()
+        self.tickets.close()
+        self.destroy()
 
     def add_vehicle(self):
         vid = self.vehicle_id_entry.get().strip()
@@ -209,68 +278,99 @@ class ParkingLotGUI(tk.Tk):
         success, msg = self.system.add_vehicle(vid, vtype, vip)
         messagebox.showinfo("Add Vehicle", msg)
         if success:
-            qr_path = generate_qr(vid, datetime.datetime.now().isoformat(), vtype)
-            schedule_removal(vid, 1800, lambda v=vid: self.system.remove_vehicle(v))
+            entry = self.system.index.get(vid)
+            self.poll_ticket(self.tickets.issue(self.system.lots[entry.lot].bays[entry.position]))
             self.vehicle_id_entry.delete(0, tk.END)
-        self.update_ui()
 
     def remove_vehicle(self):
         vid = self.vehicle_id_entry.get().strip()
         if not vid:
             messagebox.showwarning("Input Error", "Please enter a vehicle ID")
             return
-        cancel_removal(vid)
         success, msg = self.system.remove_vehicle(vid)
         messagebox.showinfo("Remove Vehicle", msg)
         if success:
             self.vehicle_id_entry.delete(0, tk.END)
-        self.update_ui()
 
     def export_logs(self):
         fpath = filedialog.asksaveasfilename(defaultextension=".csv",
-                                             filetypes=[("CSV files", "*.csv"), ("Text files", "*.txt"), ("All files", "*.*")])
+                                             filetypes=[("CSV files", "*.csv"), ("JSON Lines", "*.jsonl"),
+                                                        ("Parquet (needs pyarrow)", "*.parquet"),
+                                                        ("Text files", "*.txt"), ("All files", "*.*")])
         if not fpath:
             return
-        success, msg = self.system.export_logs(fpath)
-        if success:
-            messagebox.showinfo("Export Logs", msg)
+        # The full journal when there is one, otherwise this session's logs
+        if self.event_log is not None:
+            self.event_log.journal.commit()
+            job = ExportJob(journal_rows(self.event_log.journal_path), JOURNAL_COLUMNS, fpath)
+        else:
+            job = ExportJob(log_rows(self.system.logs), LOG_COLUMNS, fpath)
+        job.start()
+        self.poll_export(job)
+
+    def poll_export(self, job):
+        if not job.done:
+            self.after(100, self.poll_export, job)
+        elif job.error is not None:
+            messagebox.showerror("Export Logs", str(job.error))
         else:
-            messagebox.showerror("Export Logs", msg)
+            messagebox.showinfo("Export Logs", f"Exported {job.count} entries")
+
+    def poll_ticket(self, future):
+        if not future.done():
+            self.after(50, self.poll_ticket, future)
+        elif future.exception() is not None:
+            self.alert_label.config(text=str(future.exception()))
+        else:
+            ticket, png = future.result()
+            self.ticket_image = tk.PhotoImage(data=base64.b64encode(png))
+            self.ticket_label.config(image=self.ticket_image, text=f"Ticket {ticket.vid}", compound="top")
 
     def scan_qr_and_exit(self):
         file_path = filedialog.askopenfilename(title="Select QR Code Image")
         if file_path:
-            decoded = decode_qr(file_path)
-            if decoded:
-                vehicle_id, entry_time, vehicle_type = decoded
-                cancel_removal(vehicle_id)
-                success, msg = self.system.remove_vehicle(vehicle_id)
-                self.update_ui()
-                messagebox.showinfo("Exit Success", f"{msg}")
-            else:
-                messagebox.showerror("Invalid QR", "Could not decode QR code.")
+            self.poll_scans([self.tickets.read(file_path)], single=True)
 
+    def scan_exit_folder(self):
+        directory = filedialog.askdirectory(title="Select Exit Camera Folder")
+        if directory:
+            self.poll_scans(self.tickets.read_many(image_paths(directory)))
 
-def main():
-    system = ParkingSystem()
-    app = ParkingLotGUI(system)
+    def poll_scans(self, futures, single=False):
+        if not all(f.done() for f in futures):
+            self.after(50, self.poll_scans, futures, single)
+            return
+        errors = [f.exception() for f in futures if f.exception() is not None]
+        if errors:
+            messagebox.showerror("Scan QR", str(errors[0]))
+            return
+        scans = [f.result() for f in futures]
+        tickets = [ticket for ticket, _ in scans if ticket is not None]
+        results = redeem_tickets(self.system, tickets)
+        if single:
+            if results:
+                messagebox.showinfo("Exit", results[0][2])
+            else:
+                messagebox.showerror("Invalid QR", scans[0][1])
+            return
+        exited = sum(1 for _, ok, _ in results if ok)
+        messagebox.showinfo("Exit Camera Folder",
+                            f"{exited} of {len(scans)} images exited a vehicle, "
+                            f"{len(scans) - len(tickets)} had no valid ticket")
+
+def main(config_path=None, data_dir=None):
+    system = ParkingSystem(load_facilities(config_path))
+    event_log = open_event_log(system, data_dir)
+    storage = open_storage(system)
+    metrics = open_metrics(system)
+    app = ParkingLotGUI(system, event_log)
     app.mainloop()
+    if metrics:
+        metrics.close()
+    if storage:
+        storage.close()
+    if event_log:
+        event_log.close()
 
 if __name__ == "__main__":
     main()
-# qr_utils.py
-
-import qrcode
-from pyzbar.pyzbar import decode
-from PIL import Image
-
-def generate_qr(data, filename):
-    qr = qrcode.make(data)
-    qr.save(filename)
-
-def decode_qr(image_path):
-    img = Image.open(image_path)
-    decoded_objects = decode(img)
-    if decoded_objects:
-        return decoded_objects[0].data.decode("utf-8")
-    return None
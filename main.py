@@ -1,19 +1,48 @@
-def main():
+import argparse
+
+# Front-ends are imported only once one is chosen, so a headless gate node
+# never loads tkinter and the CLI never loads asyncio.
+MODES = {'1': "cli", '2': "gui", '3': "gate"}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Smart Parking System")
+    parser.add_argument("mode", nargs="?", choices=sorted(MODES.values()),
+                        help="front-end to start; asks interactively when omitted")
+    parser.add_argument("--config", help="facility layout JSON (default: $PARKING_CONFIG)")
+    parser.add_argument("--data-dir", help="journal directory (default: $PARKING_DATA_DIR)")
+    parser.add_argument("--address", help="gate server host:port (default: $PARKING_GATE_ADDRESS)")
+    parser.add_argument("--workers", type=int,
+                        help="split the gate server's lots across this many processes (default: $PARKING_WORKERS or 1)")
+    return parser.parse_args(argv)
+
+
+def choose_mode():
     print("Smart Parking System")
     print("1. CLI")
     print("2. GUI")
-    choice = input("Enter choice (1/2): ").strip()
+    print("3. Gate server")
+    choice = input("Enter choice (1/2/3): ").strip()
+
+    while choice not in MODES:
+        print("Invalid choice. Please enter 1, 2 or 3.")
+        choice = input("Enter choice (1/2/3): ").strip()
+    return MODES[choice]
+
 
-    while choice not in ('1', '2'):
-        print("Invalid choice. Please enter 1 or 2.")
-        choice = input("Enter choice (1/2): ").strip()
+def main(argv=None):
+    args = parse_args(argv)
+    mode = args.mode or choose_mode()
 
-    if choice == '1':
-        from cli.cli_interface import run_cli
-        run_cli()
+    if mode == "cli":
+        from cli_interface import run_cli
+        run_cli(args.config, args.data_dir)
+    elif mode == "gate":
+        from gate_server import run_server
+        run_server(args.config, args.data_dir, args.address, args.workers)
     else:
-        from gui.gui_main import main as run_gui_main
-        run_gui_main()
+        from gui_main import main as run_gui_main
+        run_gui_main(args.config, args.data_dir)
 
 if __name__ == "__main__":
     main()
@@ -1,76 +1,130 @@
+import threading
 import time
 from core.models.vehicle import Vehicle
+from core.allocator import BayAllocator
+from core.export import format_ts
+from core.facility import DEFAULT_CAPACITY, VEHICLE_TYPES
+from core.vehicle_index import VehicleIndex, WAITING
+from waiting_queue import WaitingQueue
 
 class ParkingLot:
-    def __init__(self):
-        self.capacity = 25
-        # Separate stacks for each vehicle type
-        self.two_wheeler_stack = []
-        self.four_wheeler_stack = []
-        self.heavy_vehicle_stack = []
+    def __init__(self, capacity=DEFAULT_CAPACITY, clock=time.time):
+        # One bay count for every type, or a {vehicle type: bays} mapping
+        if isinstance(capacity, dict):
+            self.capacities = {vtype: capacity.get(vtype, 0) for vtype in VEHICLE_TYPES}
+        else:
+            self.capacities = dict.fromkeys(VEHICLE_TYPES, capacity)
+        # Separate bay allocator and bay -> vehicle map for each vehicle type
+        self.allocators = {vtype: BayAllocator(cap) for vtype, cap in self.capacities.items()}
+        self.bays = {vtype: {} for vtype in VEHICLE_TYPES}
+        self.clock = clock
+        self.waiting_queues = {vtype: WaitingQueue(clock=clock) for vtype in VEHICLE_TYPES}
+        # vehicle number -> vehicle type and bay, kept in sync with the bays
+        self.index = VehicleIndex()
+        # Gates may call in from several threads; every change holds this
+        self.lock = threading.RLock()
 
     def park_vehicle(self, vehicle: Vehicle):
-        stack = self.get_stack(vehicle.type)
-        if len(stack) < self.capacity:
-            vehicle.entry_time = time.time()
-            stack.append(vehicle)
+        vtype = self.lot_type(vehicle.type)
+        with self.lock:
+            if vehicle.id in self.index:
+                return False
+            bay = self.allocators[vtype].allocate()
+            if bay is None:
+                return False
+            self._occupy(vtype, bay, vehicle)
+            return True
+
+    def _occupy(self, vtype, bay, vehicle):
+        vehicle.park_time = int(self.clock())
+        self.bays[vtype][bay] = vehicle
+        self.index.park(vehicle.id, vtype, bay, vehicle)
+
+    def add_to_waiting(self, vehicle: Vehicle):
+        vtype = self.lot_type(vehicle.type)
+        with self.lock:
+            if vehicle.id in self.index:
+                return False
+            vehicle.park_time = int(self.clock())
+            self.waiting_queues[vtype].add_vehicle(vehicle)
+            self.index.wait(vehicle.id, vtype, vehicle)
             return True
-        else:
-            return False
 
     def remove_vehicle(self, vehicle_number: str):
-        for stack in [self.two_wheeler_stack, self.four_wheeler_stack, self.heavy_vehicle_stack]:
-            idx = self.find_vehicle_in_stack(stack, vehicle_number)
-            if idx != -1:
-                vehicle = stack.pop(idx)
-                return vehicle
-        return None
-
-    def find_vehicle_in_stack(self, stack, vehicle_number):
-        for i in range(len(stack)-1, -1, -1):
-            if stack[i].number == vehicle_number:
-                return i
-        return -1
+        with self.lock:
+            entry = self.index.pop(vehicle_number)
+            if entry is None:
+                return None
+            if entry.state == WAITING:
+                return self.waiting_queues[entry.lot].remove(vehicle_number)
+            del self.bays[entry.lot][entry.position]
+            self.allocators[entry.lot].release(entry.position)
+            # The freed bay goes straight to the head of that type's queue
+            next_v = self.waiting_queues[entry.lot].next_vehicle()
+            if next_v is not None:
+                self._occupy(entry.lot, self.allocators[entry.lot].allocate(), next_v)
+            return entry.vehicle
+
+    def find_vehicle(self, vehicle_number: str):
+        entry = self.index.get(vehicle_number)
+        return entry.vehicle if entry else None
+
+    def find_bay(self, vehicle_number: str):
+        entry = self.index.get(vehicle_number)
+        return entry.position if entry else None
+
+    def lot_type(self, vehicle_type):
+        return vehicle_type if vehicle_type in self.bays else "Heavy Vehicle"
 
     def get_stack(self, vehicle_type):
-        if vehicle_type == "Two-Wheeler":
-            return self.two_wheeler_stack
-        elif vehicle_type == "Four-Wheeler":
-            return self.four_wheeler_stack
-        else:
-            return self.heavy_vehicle_stack
+        # parked vehicles of one type, nearest bay first
+        bays = self.bays[self.lot_type(vehicle_type)]
+        with self.lock:
+            return [bays[bay] for bay in sorted(bays)]
+
+    @property
+    def two_wheeler_stack(self):
+        return self.get_stack("Two-Wheeler")
+
+    @property
+    def four_wheeler_stack(self):
+        return self.get_stack("Four-Wheeler")
+
+    @property
+    def heavy_vehicle_stack(self):
+        return self.get_stack("Heavy Vehicle")
 
     def get_all_vehicles(self):
         # return all parked vehicles in order (any order you like)
         return self.two_wheeler_stack + self.four_wheeler_stack + self.heavy_vehicle_stack
 
+    @classmethod
+    def from_facility(cls, facility, clock=time.time):
+        return cls({vtype: facility.capacity_for(vtype) for vtype in VEHICLE_TYPES}, clock)
+
     def get_status(self):
-        return {
-            "Two-Wheeler": len(self.two_wheeler_stack),
-            "Four-Wheeler": len(self.four_wheeler_stack),
-            "Heavy Vehicle": len(self.heavy_vehicle_stack)
-        }
+        return {vtype: allocator.in_use for vtype, allocator in self.allocators.items()}
 
-def export_logs(parking_lot, waiting_queues, filename="parking_log.csv"):
+def export_logs(parking_lot, waiting_queues=None, filename="parking_log.csv"):
     import csv
+    if waiting_queues is None:
+        waiting_queues = parking_lot.waiting_queues
     with open(filename, "w", newline='') as f:
         writer = csv.writer(f)
         writer.writerow(["Parked Vehicles"])
-        writer.writerow(["Type", "Number", "VIP", "Entry Time"])
-        for vtype, stack in zip(
-            ["Two-Wheeler", "Four-Wheeler", "Heavy Vehicle"],
-            [parking_lot.two_wheeler_stack, parking_lot.four_wheeler_stack, parking_lot.heavy_vehicle_stack]
-        ):
-            for v in stack:
-                et = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(v.entry_time)) if v.entry_time else "N/A"
-                writer.writerow([vtype, v.number, "Yes" if v.is_vip else "No", et])
+        writer.writerow(["Type", "Bay", "Number", "VIP", "Entry Time"])
+        for vtype, bays in parking_lot.bays.items():
+            for bay in sorted(bays):
+                v = bays[bay]
+                et = format_ts(v.park_time) if v.park_time else "N/A"
+                writer.writerow([vtype, bay, v.id, "Yes" if v.vip else "No", et])
         writer.writerow([])
         writer.writerow(["Waiting Queues"])
         for vtype, queue in waiting_queues.items():
             writer.writerow([f"{vtype} Queue"])
             writer.writerow(["Number", "VIP", "Arrival Time"])
             for v in queue:
-                at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(v.entry_time)) if v.entry_time else "N/A"
-                writer.writerow([v.number, "Yes" if v.is_vip else "No", at])
+                at = format_ts(v.park_time) if v.park_time else "N/A"
+                writer.writerow([v.id, "Yes" if v.vip else "No", at])
             writer.writerow([])
 
@@ -0,0 +1,96 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualGrid(ttk.Frame):
+    """Scrollable, zoomable grid of cells drawn on one canvas.
+
+    Only the cells inside the viewport exist as canvas items, and those
+    items are reused as the view scrolls, so a lot with 50,000 bays costs
+    the same widgets as one with 25. ``count()`` returns the number of
+    cells and ``describe(first, last)`` returns ``(text, fill)`` for cells
+    ``first`` to ``last - 1``.
+    """
+
+    MIN_SCALE = 0.5
+    MAX_SCALE = 2.5
+
+    def __init__(self, master, count, describe, columns=10, cell_size=(64, 60), rows_visible=3, **kwargs):
+        super().__init__(master, **kwargs)
+        self.count = count
+        self.describe = describe
+        self.columns = columns
+        self.base_cell = cell_size
+        self.scale = 1.0
+        self.pool = []
+        self.shown = {}
+
+        self.canvas = tk.Canvas(self, height=cell_size[1] * rows_visible, width=cell_size[0] * columns,
+                                bg="#f7f9fb", highlightthickness=0)
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.yview("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.yview("scroll", 1, "units"))
+        self.canvas.bind("<Control-MouseWheel>", lambda e: self.zoom(1.1 if e.delta > 0 else 1 / 1.1))
+
+    @property
+    def cell(self):
+        return self.base_cell[0] * self.scale, self.base_cell[1] * self.scale
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.redraw()
+
+    def on_wheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+
+    def zoom(self, factor):
+        self.scale = min(self.MAX_SCALE, max(self.MIN_SCALE, self.scale * factor))
+        self.redraw()
+
+    def visible_range(self):
+        _, cell_h = self.cell
+        top = self.canvas.canvasy(0)
+        bottom = top + max(self.canvas.winfo_height(), int(self.canvas["height"]))
+        first = int(top // cell_h) * self.columns
+        last = min(self.count(), (int(bottom // cell_h) + 1) * self.columns)
+        return first, max(first, last)
+
+    def redraw(self):
+        cell_w, cell_h = self.cell
+        total = self.count()
+        rows = (total + self.columns - 1) // self.columns
+        self.canvas.configure(scrollregion=(0, 0, cell_w * self.columns, max(rows * cell_h, 1)),
+                              yscrollincrement=cell_h)
+        first, last = self.visible_range()
+        while len(self.pool) < last - first:
+            rect = self.canvas.create_rectangle(0, 0, 0, 0, outline="#90a4ae")
+            text = self.canvas.create_text(0, 0, justify="center")
+            self.pool.append((rect, text))
+        self.shown = {}
+        font = ("Segoe UI", max(6, int(8 * self.scale)))
+        for slot, (index, (label, fill)) in enumerate(zip(range(first, last), self.describe(first, last))):
+            rect, text = self.pool[slot]
+            x = (index % self.columns) * cell_w
+            y = (index // self.columns) * cell_h
+            self.canvas.coords(rect, x + 2, y + 2, x + cell_w - 2, y + cell_h - 2)
+            self.canvas.coords(text, x + cell_w / 2, y + cell_h / 2)
+            self.canvas.itemconfigure(rect, fill=fill, state="normal")
+            self.canvas.itemconfigure(text, text=label, font=font, state="normal")
+            self.shown[index] = (rect, text)
+        for rect, text in self.pool[last - first:]:
+            self.canvas.itemconfigure(rect, state="hidden")
+            self.canvas.itemconfigure(text, state="hidden")
+
+    def redraw_cell(self, index):
+        items = self.shown.get(index)
+        if items is None:
+            return
+        label, fill = self.describe(index, index + 1)[0]
+        self.canvas.itemconfigure(items[0], fill=fill)
+        self.canvas.itemconfigure(items[1], text=label)
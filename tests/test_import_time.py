@@ -0,0 +1,29 @@
+"""Runs the import checks from benchmarks/check_import_time.py under pytest.
+
+The forbidden-import checks always apply. Wall-clock budgets depend on the
+machine, so they are only asserted when PARKING_IMPORT_BUDGET_SCALE is set
+(to 1 for the budgets as written); otherwise check_import_time.py owns them.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from check_import_time import BUDGETS, check  # noqa: E402
+
+SCALE = os.environ.get("PARKING_IMPORT_BUDGET_SCALE")
+RUNS = 3
+
+
+@pytest.mark.parametrize("module, budget_ms, forbidden", BUDGETS, ids=[budget[0] for budget in BUDGETS])
+def test_import_budget(module, budget_ms, forbidden):
+    try:
+        ms, bad = check(module, forbidden, RUNS)
+    except RuntimeError as e:
+        pytest.skip(f"{module} cannot be imported here: {e}")
+    assert not bad, f"{module} imports {', '.join(bad)}"
+    if SCALE:
+        budget_ms *= float(SCALE)
+        assert ms <= budget_ms, f"{module} took {ms:.1f} ms, budget {budget_ms:.0f} ms"
@@ -0,0 +1,43 @@
+"""Snapshots written while another snapshot is in progress."""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.facility import Facility, Level, Zone  # noqa: E402
+from core.journal import SNAPSHOT_FILE, EventLog  # noqa: E402
+from core.parking import ParkingSystem  # noqa: E402
+
+
+def make_system():
+    return ParkingSystem([Facility("S", [Level("L", [Zone("A", "Four-Wheeler", 50)])])])
+
+
+def test_overlapping_snapshots(tmp_path):
+    system = make_system()
+    log = EventLog(system, str(tmp_path))
+    for i in range(60):
+        system.add_vehicle(f"V{i}", "Four-Wheeler", False)
+    errors = []
+
+    def snapshots():
+        try:
+            for _ in range(25):
+                log.snapshot()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=snapshots) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.close()
+    assert errors == []
+    assert SNAPSHOT_FILE in os.listdir(tmp_path)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+    recovered = make_system()
+    EventLog(recovered, str(tmp_path)).close()
+    assert recovered.snapshot_state() == system.snapshot_state()
@@ -0,0 +1,35 @@
+"""Reads that count bays held for bookings."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.events import NO_SHOW  # noqa: E402
+from core.facility import Facility, Level, Zone  # noqa: E402
+from core.parking import ParkingSystem  # noqa: E402
+
+HOUR = 3600
+START = 1_700_000_000 - 1_700_000_000 % 900
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_overdue_hold_is_not_counted():
+    clock = Clock(START)
+    system = ParkingSystem([Facility(name, [Level("L", [Zone("Z", "Four-Wheeler", 1)])]) for name in "AB"], clock)
+    kinds = []
+    system.feed.subscribe(lambda e: kinds.append(e.kind))
+    assert system.reserve("R", "Four-Wheeler", START + HOUR, START + 2 * HOUR)[0]
+    booked = system.booked_lot("R")
+    clock.now = START + 2 * HOUR - 1
+
+    assert system.availability("Four-Wheeler", clock.now, clock.now + 600) == 2
+    assert kinds.count(NO_SHOW) == 1
+    assert booked.taken() == 0
+    assert system.router.route("Four-Wheeler") is system.lots["A/Four-Wheeler"]
@@ -0,0 +1,77 @@
+"""Storage attached to systems that already have queued vehicles."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.facility import Facility, Level, Zone  # noqa: E402
+from core.journal import EventLog  # noqa: E402
+from core.parking import ParkingSystem  # noqa: E402
+from core.storage import WAITING, MemoryStorage, SQLiteStorage  # noqa: E402
+from waiting_queue import NORMAL, RESERVED  # noqa: E402
+
+HOUR = 3600
+START = 1_700_000_000 - 1_700_000_000 % 900
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_system(clock):
+    return ParkingSystem([Facility("S", [Level("L", [Zone("A", "Four-Wheeler", 1)])])], clock)
+
+
+def fill(system, clock):
+    """One parked vehicle, then a walk-in and a booked arrival queued behind it."""
+    system.reserve("R", "Four-Wheeler", START + HOUR, START + 2 * HOUR)
+    system.add_vehicle("A", "Four-Wheeler", False)
+    clock.now = START + HOUR
+    system.add_vehicle("W", "Four-Wheeler", False)
+    system.add_vehicle("R", "Four-Wheeler", False)
+
+
+def tiers(system):
+    queue = system.lots["S/Four-Wheeler"].waiting_queue
+    return [(v.id, queue.tier(v.id)) for v in queue]
+
+
+def test_attach_to_recovered_system_with_queue(tmp_path):
+    clock = Clock(START)
+    system = make_system(clock)
+    log = EventLog(system, str(tmp_path))
+    fill(system, clock)
+    log.close()
+
+    recovered = make_system(clock)
+    EventLog(recovered, str(tmp_path)).close()
+    storage = MemoryStorage().attach(recovered)
+    assert storage.vehicle("R")[1] == WAITING
+    assert storage.vehicle("R")[5] == RESERVED
+    assert storage.occupancy() == {"S/Four-Wheeler": (1, 2)}
+
+
+@pytest.mark.parametrize("engine", ["memory", "sqlite"])
+def test_queue_tier_survives_storage_restore(tmp_path, engine):
+    clock = Clock(START)
+    system = make_system(clock)
+    storage = MemoryStorage() if engine == "memory" else SQLiteStorage(str(tmp_path / "parking.db"))
+    storage.attach(system)
+    fill(system, clock)
+    assert tiers(system) == [("R", RESERVED), ("W", NORMAL)]
+    if engine == "sqlite":
+        storage.close()
+        storage = SQLiteStorage(str(tmp_path / "parking.db"))
+    else:
+        storage.detach()
+
+    restored = make_system(clock)
+    storage.attach(restored)
+    assert tiers(restored) == [("R", RESERVED), ("W", NORMAL)]
+    storage.close()
@@ -1,6 +1,12 @@
 import time
 
-def parked_duration(entry_time):
-    elapsed = time.time() - entry_time
+def parked_duration(entry_time, now=None):
+    # Pass ``now`` when rendering many vehicles so the clock is read once
+    elapsed = (time.time() if now is None else now) - entry_time
     minutes = int(elapsed // 60)
     return f"{minutes} mins"
+
+def format_duration(seconds, with_seconds=True):
+    secs = max(0, int(seconds))
+    hm = f"{secs // 3600:02d}:{(secs % 3600) // 60:02d}"
+    return f"{hm}:{secs % 60:02d}" if with_seconds else hm
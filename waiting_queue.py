@@ -1,20 +1,108 @@
-from collections import deque
+import heapq
+import itertools
+import time
+
+# Priority tiers, lowest to highest
+NORMAL = 0
+VIP = 1
+EMERGENCY = 2
+# Booked arrivals that found no free bay; their bay was promised
+RESERVED = 3
+
+# Seconds of waiting time each tier is credited with on arrival. Ordering is
+# by (arrival - head start), so vehicles stay FIFO within a tier, and a normal
+# vehicle that has waited longer than the VIP head start is served before
+# newly arriving VIPs, which keeps the lower tiers from starving.
+TIER_HEAD_START = {
+    NORMAL: 0,
+    VIP: 15 * 60,
+    EMERGENCY: 60 * 60,
+    RESERVED: 24 * 3600,
+}
+
+_REMOVED = object()
+
 
 class WaitingQueue:
-    def __init__(self):
-        self.queue = deque()
+    """Priority waiting queue shared by every front-end.
 
-    def add_vehicle(self, vehicle):
-        if vehicle.is_vip:
-            self.queue.appendleft(vehicle)
-        else:
-            self.queue.append(vehicle)
+    A binary heap keyed on aged priority. Cancelled entries are only marked
+    and skipped when they reach the top, so enqueue, dequeue and cancel are
+    all O(log n) amortized.
+    """
+
+    def __init__(self, head_start=None, clock=time.time):
+        self.head_start = dict(TIER_HEAD_START if head_start is None else head_start)
+        self.clock = clock
+        self._heap = []
+        self._entries = {}
+        self._seq = itertools.count()
+
+    def add_vehicle(self, vehicle, tier=None, enqueued_at=None):
+        vid = vehicle.id
+        self.remove(vid)
+        if tier is None:
+            tier = VIP if vehicle.vip else NORMAL
+        if enqueued_at is None:
+            enqueued_at = self.clock()
+        entry = [enqueued_at - self.head_start[tier], next(self._seq), vid, vehicle, tier]
+        self._entries[vid] = entry
+        heapq.heappush(self._heap, entry)
 
     def next_vehicle(self):
-        return self.queue.popleft() if self.queue else None
+        while self._heap:
+            _, _, vid, vehicle, _ = heapq.heappop(self._heap)
+            if vehicle is not _REMOVED:
+                del self._entries[vid]
+                return vehicle
+        return None
+
+    def peek(self):
+        while self._heap and self._heap[0][3] is _REMOVED:
+            heapq.heappop(self._heap)
+        return self._heap[0][3] if self._heap else None
+
+    def remove(self, vehicle_id):
+        entry = self._entries.pop(vehicle_id, None)
+        if entry is None:
+            return None
+        vehicle = entry[3]
+        entry[3] = _REMOVED
+        # Rebuild once dead entries dominate so the heap can't grow unbounded
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [e for e in self._heap if e[3] is not _REMOVED]
+            heapq.heapify(self._heap)
+        return vehicle
+
+    def __iter__(self):
+        # Walk the heap in priority order without popping: the next entry is
+        # always a child of one already visited.
+        heap = self._heap
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            entry, i = heapq.heappop(frontier)
+            if entry[3] is not _REMOVED:
+                yield entry[3]
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+    def head(self, n):
+        return list(itertools.islice(self, n))
 
     def get_all(self):
-        return list(self.queue)
+        return list(self)
+
+    def tier(self, vehicle_id):
+        """The tier ``vehicle_id`` was queued in, or None if it is not waiting."""
+        entry = self._entries.get(vehicle_id)
+        return entry[4] if entry is not None else None
 
     def size(self):
-        return len(self.queue)
+        return len(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, vehicle_id):
+        return vehicle_id in self._entries